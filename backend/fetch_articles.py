@@ -1,39 +1,58 @@
+import os
 import requests
 import feedparser
 
-# fetch_articles retrieves recent RSS entries from Yahoo Finance for a given ticker
-# and returns only those entries whose title or summary contains the provided keyword.
-def fetch_articles(ticker, keyword):
+# Overridable so the provider stand-in (services/standin_api) can serve the feed
+YAHOO_RSS_URL = os.getenv("YAHOO_RSS_URL", "https://finance.yahoo.com/rss/headline")
+
+# Share the context API's per-ticker feed cache when the repo root is importable,
+# so the feed is downloaded and parsed once per ticker per TTL for every keyword
+try:
+    from services.context_api.providers_yahoo import feed_entries, matching
+except Exception:
+    feed_entries = None
+    matching = None
+
+# Streaming RSS reader (feedparser fallback built in) when available
+try:
+    from services.context_api.rss import parse_entries
+except Exception:
+    parse_entries = None
+
+# Download and parse the feed (used only when the shared cache is unavailable)
+def _download_entries(ticker):
 
     # Build the Yahoo Finance RSS URL for the specified ticker
-    rss_url = f"https://finance.yahoo.com/rss/headline?s={ticker}"
-    
+    rss_url = f"{YAHOO_RSS_URL}?s={ticker}"
+
     # Requests RSS feed
     resp = requests.get(rss_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
     resp.raise_for_status()
-    
-    # Parse the feed content into a feedparser object
+
+    if parse_entries is not None:
+        return parse_entries(resp.content)
+
+    # Parse the feed content into a feedparser object and normalize entries into dicts
     feed = feedparser.parse(resp.content)
+    return [{
+        "title": (entry.get("title") or "").strip(),
+        "link": (entry.get("link") or "").strip(),
+        "published": (entry.get("published") or "").strip(),
+        "summary": (entry.get("summary") or "").strip(),
+    } for entry in feed.entries]
+
+# fetch_articles retrieves recent RSS entries from Yahoo Finance for a given ticker
+# and returns only those entries whose title or summary contains the provided keyword.
+def fetch_articles(ticker, keyword):
 
-    # Helper function that checks whether an entry's title or summary contains the keyword
-    def contains_keyword(entry) -> bool:
-        # Extract title and summary
-        title = (entry.get("title") or "")
-        summary = (entry.get("summary") or "")
-        kw = keyword.lower()
-        # Case-insensitive keyword check
-        return kw in title.lower() or kw in summary.lower()
+    if feed_entries is not None:
+        # Cached, already-parsed entries; keyword filtering is local
+        return [dict(e) for e in matching(feed_entries(ticker), [keyword])]
 
     articles = []
-    # Iterate over the feed entries and collect ones matching the keyword
-    for entry in feed.entries:
-        if not contains_keyword(entry):
-            continue
-        # Normalize entries into a dict
-        articles.append({
-            "title": (entry.get("title") or "").strip(),
-            "link": (entry.get("link") or "").strip(),
-            "published": (entry.get("published") or "").strip(),
-            "summary": (entry.get("summary") or "").strip(),
-        })
-    return articles
\ No newline at end of file
+    kw = keyword.lower()
+    # Iterate over the feed entries and collect ones matching the keyword (case-insensitive)
+    for entry in _download_entries(ticker):
+        if kw in entry["title"].lower() or kw in entry["summary"].lower():
+            articles.append(entry)
+    return articles
@@ -113,6 +113,44 @@ async function fetchRun(ticker){
   return res.json();
 }
 
+// Push updates: the gateway computes each ticker once per change and sends
+// only the changed fields (SSE), so the HUD does not re-run /api/run.
+let source = null;
+let lastPayload = null;
+
+function mergeChanges(target, changes){
+  for (const [k, v] of Object.entries(changes || {})) {
+    const isObj = v && typeof v === "object" && !Array.isArray(v);
+    const cur = target[k];
+    if (isObj && cur && typeof cur === "object" && !Array.isArray(cur)) mergeChanges(cur, v);
+    else target[k] = v;
+  }
+  return target;
+}
+
+function unsubscribe(){
+  if (source) source.close();
+  source = null;
+  lastPayload = null;
+}
+
+function subscribe(ticker, payload){
+  unsubscribe();
+  lastPayload = payload;
+  source = new EventSource(`${GATEWAY_URL}/api/subscribe?tickers=${encodeURIComponent(ticker)}`);
+  source.addEventListener("snapshot", (ev) => {
+    const p = JSON.parse(ev.data);
+    if (p.ticker !== currentTicker) return;
+    lastPayload = p;
+    render(p);
+  });
+  source.addEventListener("update", (ev) => {
+    const u = JSON.parse(ev.data);
+    if (u.ticker !== currentTicker || !lastPayload) return;
+    render(mergeChanges(lastPayload, u.changes));
+  });
+}
+
 // ---------- HUD helpers ----------
 function clearHud(){
   [["last","—"],["ba","B/A"],["m1","—"],["m5","—"],["sma","SMA20"],
@@ -221,6 +259,7 @@ async function handleEnter(){
     showValidationMessage(v.msg, true);
     el.ticker.classList.add("invalid");
     clearHud();
+    unsubscribe();
     currentTicker = null;
     return;
   }
@@ -236,10 +275,12 @@ async function handleEnter(){
     isFetching = true;
     const payload = await fetchRun(currentTicker);
     render(payload);
+    subscribe(currentTicker, payload);
   } catch (err) {
     console.error(err);
     showValidationMessage("*Unable to fetch data. Is the gateway running on 8015?", true);
     clearHud();
+    unsubscribe();
     currentTicker = null;
   } finally {
     isFetching = false;
@@ -20,6 +20,8 @@ pip install -r requirements.txt
 export LIVE_PROVIDERS=1
 export CTX_URL=http://127.0.0.1:8012
 export REC_URL=http://127.0.0.1:8014
+# warm-start cache snapshot shared by the context and sentiment APIs
+export SNAPSHOT_PATH=${SNAPSHOT_PATH:-.cache/midas_snapshot.sqlite}
 
 # 4. Run all services concurrently
 echo "Starting all APIs..."
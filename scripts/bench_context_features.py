@@ -0,0 +1,82 @@
+"""
+Cold-path benchmark for services.context_api.features.build_features_for.
+
+Providers are replaced by in-process mocks that sleep for a jittered latency,
+so the numbers show the cost of the fetch stage itself (sequential vs fan-out)
+without tokens or network access.
+
+    python scripts/bench_context_features.py [n]
+"""
+import os, sys, time, random, pathlib, statistics as stats
+
+# ensure repo root on sys.path
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ["LIVE_PROVIDERS"] = "1"
+
+from services.context_api import features, cache  # noqa: E402
+from services.context_api.providers import Bars  # noqa: E402
+
+# median latency per mocked provider call (seconds)
+LATENCY = {
+    "finnhub_news": 0.120,
+    "yahoo_news":   0.120,   # hedge leg (CONTEXT_HEDGE=1, the default)
+    "sentiment":    0.080,
+    "tiingo_quote": 0.060,
+    "tiingo_bars":  0.150,
+}
+rng = random.Random(7)
+
+def _sleep(name: str) -> None:
+    time.sleep(LATENCY[name] * rng.lognormvariate(0.0, 0.25))
+
+def _headlines(ticker, limit=5):
+    _sleep("finnhub_news")
+    return [{"title": f"{ticker} beats estimates", "publisher": "Mock", "ts": features.iso_now(), "url": "https://example.com/a"}]
+
+def _headlines_yahoo(ticker, limit=5):
+    _sleep("yahoo_news")
+    return [{"title": f"{ticker} beats estimates", "publisher": "Yahoo", "ts": features.iso_now(), "url": "https://example.com/y"}]
+
+def _sent(headlines):
+    _sleep("sentiment")
+    return 0.1, 0.05
+
+def _quote(ticker):
+    _sleep("tiingo_quote")
+    return {"last": 100.0, "bid": 99.98, "ask": 100.02, "ts": features.iso_now()}
+
+def _candles(ticker, lookback_minutes=120, freq="1min"):
+    _sleep("tiingo_bars")
+    n = 120
+    return Bars(range(n), [100.0] * n, [100.5 + i % 3 for i in range(n)], [99.5] * n,
+                [100.0 + (i % 5) * 0.1 for i in range(n)], [1200] * n)
+
+features.fetch_headlines = _headlines
+features.fetch_headlines_yahoo = _headlines_yahoo
+features._sent_from_headlines = _sent
+features.fetch_quote_tiingo = _quote
+features.fetch_candles_tiingo = _candles
+
+def run(parallel: bool, n: int) -> list[float]:
+    features.FANOUT = parallel
+    xs = []
+    for i in range(n):
+        cache._CACHE.clear()
+        t0 = time.perf_counter_ns()
+        out = features.build_features_for(f"T{i}")
+        xs.append((time.perf_counter_ns() - t0) / 1e6)
+        if out.get("error"):
+            raise SystemExit(f"unexpected error: {out['error']}")
+    xs.sort()
+    return xs
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+print(f"mocked provider medians (ms): " + ", ".join(f"{k}={v*1e3:.0f}" for k, v in LATENCY.items()))
+for label, parallel in (("sequential", False), ("fan-out", True)):
+    xs = run(parallel, n)
+    p50 = stats.median(xs)
+    p95 = xs[max(0, int(0.95 * n) - 1)]
+    print(f"{label:<10} p50={p50:.1f} ms  p95={p95:.1f} ms")
@@ -0,0 +1,68 @@
+"""
+Headline relevance scoring: per-call regex building (the old provider code)
+vs the shared precompiled matcher in services.context_api.relevance.
+
+    python scripts/bench_relevance.py [n_headlines]
+"""
+import re, sys, time, random, pathlib, statistics as stats
+
+# ensure repo root on sys.path
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.context_api import relevance  # noqa: E402
+
+def legacy_score(title: str, ticker: str) -> int:
+    """The pre-relevance.py scorer: alias table rebuilt, two regexes per alias, every call."""
+    if not title:
+        return -10_000
+    table = {t: list(a) for t, a in relevance.ALIASES.items()}
+    aliases = list(dict.fromkeys([ticker.upper()] + table.get(ticker.upper(), [])))
+    score = 0
+    for i, key in enumerate(aliases, start=1):
+        if re.search(rf"\b{re.escape(key)}\b", title, flags=re.IGNORECASE):
+            score += 15 * (50 - i)
+        elif re.search(re.escape(key), title, flags=re.IGNORECASE):
+            score += 4
+    if ":" in title or "—" in title or "-" in title:
+        score += 1
+    return score
+
+WORDS = ("shares rally after earnings beat; analysts raise targets as demand for chips and cloud "
+         "services grows - guidance cut: regulators probe deal while investors weigh outlook").split()
+
+def headlines(n: int, rng: random.Random):
+    names = [a for t, al in relevance.ALIASES.items() for a in [t] + al]
+    out = []
+    for _ in range(n):
+        words = rng.sample(WORDS, 8)
+        if rng.random() < 0.7:
+            words.insert(rng.randrange(len(words)), rng.choice(names))
+        out.append(" ".join(words))
+    return out
+
+def run(fn, items, tickers, reps=5):
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        for h in items:
+            for t in tickers:
+                fn(h, t)
+        times.append(time.perf_counter() - t0)
+    return stats.median(times)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(7)
+    items = headlines(n, rng)
+    tickers = ["AAPL", "NVDA", "QQQ", "TSMC"]
+    relevance.score_title("warm up", "AAPL")
+    old = run(legacy_score, items, tickers)
+    new = run(relevance.score_title, items, tickers)
+    calls = n * len(tickers)
+    print(f"{calls} scores  legacy {old*1000:8.1f} ms ({old/calls*1e6:6.2f} us/call)")
+    print(f"{calls} scores  shared {new*1000:8.1f} ms ({new/calls*1e6:6.2f} us/call)  x{old/new:.1f}")
+
+if __name__ == "__main__":
+    main()
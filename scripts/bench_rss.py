@@ -0,0 +1,70 @@
+"""
+Yahoo RSS parsing: the streaming reader in services.context_api.rss vs
+feedparser, on a synthetic feed shaped like finance.yahoo.com/rss/headline.
+Reports median parse time and tracemalloc peak / allocated blocks per feed.
+
+    python scripts/bench_rss.py [items] [reps]
+"""
+import sys, time, pathlib, tracemalloc, statistics as stats
+from email.utils import formatdate
+
+# ensure repo root on sys.path
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import feedparser  # noqa: E402
+from services.context_api import rss  # noqa: E402
+
+def make_feed(n: int) -> bytes:
+    items = []
+    for i in range(n):
+        items.append(
+            f"<item><title>Apple shares move as analysts weigh outlook number {i}</title>"
+            f"<link>https://finance.yahoo.com/news/apple-story-{i}.html</link>"
+            f"<description>Apple Inc. (AAPL) traded higher on Monday after a report on story {i} "
+            f"lifted sentiment across the sector.</description>"
+            f"<guid isPermaLink=\"false\">apple-story-{i}</guid>"
+            f"<pubDate>{formatdate(1_760_000_000 - i * 600, usegmt=True)}</pubDate></item>"
+        )
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            "<title>Yahoo! Finance: AAPL News</title><link>https://finance.yahoo.com/</link>"
+            "<description>Latest Financial News for AAPL</description>"
+            + "".join(items) + "</channel></rss>").encode()
+
+def fp(content: bytes):
+    return rss._parse_feedparser(content)
+
+def timed(fn, content, reps):
+    fn(content)
+    ts = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn(content)
+        ts.append(time.perf_counter() - t0)
+    return stats.median(ts)
+
+def allocs(fn, content):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    fn(content)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+    return peak, blocks
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    content = make_feed(n)
+    assert [e["link"] for e in rss.parse_fast(content)] == [e["link"] for e in fp(content)]
+    print(f"feed: {n} items, {len(content)/1024:.1f} KiB")
+    for name, fn in (("feedparser", fp), ("streaming", rss.parse_fast)):
+        t = timed(fn, content, reps)
+        peak, blocks = allocs(fn, content)
+        print(f"{name:10s}  p50 {t*1000:7.2f} ms   peak {peak/1024:8.1f} KiB   blocks held after parse {blocks}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Tick-to-feature latency for the streaming ingestion mode.
+
+Trades come from the provider stand-in's Finnhub websocket (served in-process
+through Starlette's TestClient, so no network or `websockets` package is
+needed). Each trade message is applied with TradeStream.handle and the
+features of every ticker in it are rebuilt; latency is measured from the
+trade's exchange timestamp to the moment the rebuilt payload carries that
+price. News is mocked (it is served from provider caches in steady state) and
+Tiingo must not be called. Polling mode, for comparison, serves quotes up to
+2 s and minute candles up to 60 s old.
+
+    python scripts/bench_stream.py [messages] [tickers]
+"""
+import os, sys, json, time, pathlib, statistics as stats
+
+# ensure repo root on sys.path
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ["LIVE_PROVIDERS"] = "1"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from services.context_api import features, cache  # noqa: E402
+from services.context_api.stream import TradeStream  # noqa: E402
+from services.standin_api import app as standin  # noqa: E402
+
+def _no_poll(*a, **k):
+    raise SystemExit("Tiingo was polled for a streamed ticker")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    tickers = ["AAPL", "NVDA", "MSFT", "TSLA", "AMD", "META", "AMZN", "GOOGL"][:int(sys.argv[2]) if len(sys.argv) > 2 else 4]
+
+    st = TradeStream()
+    # 30 minutes of history so candles come from the stream too
+    now_m = int(time.time()) // 60
+    for t in tickers:
+        for i in range(30):
+            st.handle(json.dumps({"type": "trade", "data": [
+                {"s": t, "p": 100.0 + i * 0.1, "t": (now_m - 30 + i) * 60_000, "v": 100}]}))
+
+    features.STREAM = st
+    features._fetch_news = lambda t: {"headlines": [], "sent": (0.0, 0.05), "error": None}
+    features.fetch_quote_tiingo = _no_poll
+    features.fetch_candles_tiingo = _no_poll
+    standin.WS_TICK_MS = 5
+
+    tick_to_feat, handle_ms, build_ms = [], [], []
+    with TestClient(standin.app).websocket_connect("/finnhub/ws?token=bench") as ws:
+        for t in tickers:
+            ws.send_text(json.dumps({"type": "subscribe", "symbol": t}))
+        while len(tick_to_feat) < n:
+            raw = ws.receive_text()
+            t0 = time.perf_counter()
+            if not st.handle(raw):
+                continue
+            t1 = time.perf_counter()
+            for tr in json.loads(raw)["data"]:
+                cache._CACHE.pop(tr["s"], None)      # the payload TTL for streamed tickers is ~1 s
+                out = features.build_features_for(tr["s"])
+                if out["quote"]["last"] != tr["p"] or out.get("error"):
+                    raise SystemExit(f"stale or failed build: {out}")
+                tick_to_feat.append(time.time() * 1000 - tr["t"])
+            build_ms.append((time.perf_counter() - t1) * 1000 / len(tickers))
+            handle_ms.append((t1 - t0) * 1000)
+
+    def pct(xs, q):
+        xs = sorted(xs)
+        return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+    print(f"{len(tick_to_feat)} trades, {len(tickers)} tickers, stand-in tick {standin.WS_TICK_MS:g} ms")
+    for label, xs in (("tick->features", tick_to_feat), ("handle/msg", handle_ms), ("build/ticker", build_ms)):
+        print(f"{label:<15} p50={stats.median(xs):7.3f} ms  p95={pct(xs, 0.95):7.3f} ms  p99={pct(xs, 0.99):7.3f} ms")
+    print("polling baseline: quote up to 2000 ms old, r_1m/r_5m candles up to 60000 ms old")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import sys, time, threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# --------------------------------------------------------------------
+# BoundedCache: in-process LRU + TTL cache with an entry cap and an
+# approximate byte budget. Shared by the context, sentiment and provider
+# modules so no cache grows with every distinct key ever seen.
+# --------------------------------------------------------------------
+
+_REGISTRY: Dict[str, "BoundedCache"] = {}
+_MISSING = object()
+
+def approx_size(obj: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of JSON-like data (dict/list/tuple/str/numbers)."""
+    n = sys.getsizeof(obj)
+    if _depth > 6:
+        return n
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            n += approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            n += approx_size(v, _depth + 1)
+    return n
+
+class BoundedCache:
+    """
+    LRU cache with per-entry TTL, a max entry count and an optional byte budget.
+    Expired entries are dropped when read and swept periodically on writes, so
+    keys that are never read again do not pile up. Thread-safe.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_s: Optional[float] = None,
+                 max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = approx_size):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        # key -> (stored_at, expires_at|None, size, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, Optional[float], int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        _REGISTRY[name] = self
+
+    # ----- reads
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            ent = self._data.get(key)
+            if ent is None:
+                self._stats["misses"] += 1
+                return default
+            if ent[1] is not None and ent[1] <= time.time():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return ent[3]
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since `key` was stored, or None if absent."""
+        with self._lock:
+            ent = self._data.get(key)
+            return None if ent is None else time.time() - ent[0]
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until `key` expires; None if absent or stored without a TTL."""
+        with self._lock:
+            ent = self._data.get(key)
+            return None if ent is None or ent[1] is None else max(0.0, ent[1] - time.time())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ----- writes
+    def put(self, key: Hashable, value: Any, ttl_s: Optional[float] = None) -> None:
+        ttl = self.ttl_s if ttl_s is None else ttl_s
+        now = time.time()
+        size = self._sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (now, (now + ttl) if ttl is not None else None, size, value)
+            self._bytes += size
+            self._writes += 1
+            if self._writes % 64 == 0:
+                self.purge_expired()
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes and len(self._data) > 1):
+                _, ent = self._data.popitem(last=False)
+                self._bytes -= ent[2]
+                self._stats["evictions"] += 1
+
+    def restore(self, key: Hashable, value: Any, stored_at: float, expires_at: Optional[float]) -> bool:
+        """Re-insert an entry with its original timestamps (warm start); skips expired ones and existing keys."""
+        if expires_at is not None and expires_at <= time.time():
+            return False
+        size = self._sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data:
+                return False
+            self._data[key] = (stored_at, expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes and len(self._data) > 1):
+                _, ent = self._data.popitem(last=False)
+                self._bytes -= ent[2]
+                self._stats["evictions"] += 1
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            ent = self._data.get(key)
+            if ent is None:
+                return default
+            self._drop(key)
+            return ent[3]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            dead = [k for k, e in self._data.items() if e[1] is not None and e[1] <= now]
+            for k in dead:
+                self._drop(k)
+            self._stats["expirations"] += len(dead)
+            return len(dead)
+
+    def _drop(self, key: Hashable) -> None:
+        ent = self._data.pop(key)
+        self._bytes -= ent[2]
+
+    # ----- introspection
+    def items(self) -> List[Tuple[Hashable, float, Optional[float], Any]]:
+        """Live entries as (key, stored_at, expires_at, value), oldest first."""
+        now = time.time()
+        with self._lock:
+            return [(k, e[0], e[1], e[3]) for k, e in self._data.items() if e[1] is None or e[1] > now]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter([k for k, *_ in self.items()])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._data),
+                "bytes": self._bytes if self.max_bytes else None,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+def get_cache(name: str) -> Optional[BoundedCache]:
+    return _REGISTRY.get(name)
+
+def all_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: c.stats() for name, c in sorted(_REGISTRY.items())}
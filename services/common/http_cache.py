@@ -0,0 +1,64 @@
+from __future__ import annotations
+import json
+from email.utils import formatdate
+from hashlib import blake2b
+from typing import Any, Iterable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# --------------------------------------------------------------------
+# HTTP validators for JSON responses. The ETag is a hash of the payload
+# minus per-response fields (timestamps, counters), so identical data gets
+# the same tag across requests; a GET whose If-None-Match matches is
+# answered 304 with no body. Cache-Control max-age is the time the data is
+# known to stay the same (the remaining server-side cache TTL), so clients
+# can skip the request entirely until then.
+# --------------------------------------------------------------------
+
+def etag_for(payload: Any, exclude: Iterable[str] = ()) -> str:
+    """Strong ETag: hash of the canonical JSON of `payload` without the `exclude` keys."""
+    skip = set(exclude)
+    data = {k: v for k, v in payload.items() if k not in skip} if isinstance(payload, dict) else payload
+    body = json.dumps(jsonable_encoder(data), sort_keys=True, separators=(",", ":"))
+    return '"' + blake2b(body.encode(), digest_size=12).hexdigest() + '"'
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match test (weak comparison, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    want = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == want:
+            return True
+    return False
+
+def max_age_of(cache_control: Optional[str]) -> Optional[int]:
+    """max-age from a Cache-Control header, or None."""
+    for part in (cache_control or "").split(","):
+        k, _, v = part.strip().partition("=")
+        if k.lower() == "max-age":
+            try:
+                return int(v)
+            except ValueError:
+                return None
+    return None
+
+def cache_headers(etag: str, max_age: float, last_modified: Optional[float] = None) -> dict:
+    h = {"ETag": etag, "Cache-Control": f"max-age={max(0, int(max_age))}"}
+    if last_modified:
+        h["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return h
+
+def cached_json(request: Request, payload: dict, *, max_age: float, last_modified: Optional[float] = None,
+                exclude: Iterable[str] = ()) -> Response:
+    """JSON response with ETag / Cache-Control / Last-Modified; 304 for a matching conditional GET."""
+    etag = etag_for(payload, exclude)
+    headers = cache_headers(etag, max_age, last_modified)
+    if request.method in ("GET", "HEAD") and matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(jsonable_encoder(payload), headers=headers)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import json, logging, os, sqlite3, threading, time
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.common.bounded_cache import BoundedCache, get_cache
+
+# --------------------------------------------------------------------
+# Warm-start snapshots: BoundedCache contents are written to a local
+# SQLite file every SNAPSHOT_INTERVAL_S (and on shutdown) and restored on
+# startup with their original stored/expiry times, so a restart does not
+# hit the providers and FinBERT with an empty cache. Each cache is saved in
+# one transaction (delete + insert), so readers never see a half-written
+# snapshot. Several services may share the file; rows are keyed by cache name.
+# Keys and values are stored as JSON (tuple keys as arrays), never pickled,
+# so restoring a tampered file cannot run code; entries that are not plain
+# JSON are skipped. Disabled unless SNAPSHOT_PATH is set.
+# --------------------------------------------------------------------
+
+log = logging.getLogger("common.snapshot")
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+SNAPSHOT_INTERVAL_S = float(os.getenv("SNAPSHOT_INTERVAL_S", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache      TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    stored_at  REAL NOT NULL,
+    expires_at REAL,
+    value      TEXT NOT NULL,
+    PRIMARY KEY (cache, key)
+)
+"""
+
+def _key_from_json(k: Any) -> Any:
+    """JSON arrays back to (hashable) tuples, recursively."""
+    return tuple(_key_from_json(x) for x in k) if isinstance(k, list) else k
+
+class Snapshotter:
+    def __init__(self, path: str, cache_names: Sequence[str], interval_s: float = SNAPSHOT_INTERVAL_S):
+        self.path = path
+        self.cache_names = list(cache_names)
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"saves": 0, "saved_entries": 0, "restored_entries": 0, "errors": 0, "last_save_ms": 0.0}
+
+    def _connect(self) -> sqlite3.Connection:
+        d = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(d, exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=10.0)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(_SCHEMA)
+        return con
+
+    def _caches(self) -> Dict[str, BoundedCache]:
+        out = {}
+        for name in self.cache_names:
+            c = get_cache(name)
+            if c is not None:
+                out[name] = c
+        return out
+
+    def save(self) -> int:
+        """Write every registered cache's live entries; returns the number saved."""
+        t0 = time.perf_counter()
+        n = 0
+        con = self._connect()
+        try:
+            for name, c in self._caches().items():
+                rows = []
+                for key, stored_at, expires_at, value in c.items():
+                    try:
+                        rows.append((name, json.dumps(key), stored_at, expires_at,
+                                     json.dumps(value, allow_nan=False)))
+                    except (TypeError, ValueError):
+                        continue   # not plain JSON: skip it, keep the rest
+                with con:          # one transaction per cache
+                    con.execute("DELETE FROM cache_entries WHERE cache = ?", (name,))
+                    con.executemany("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)", rows)
+                n += len(rows)
+        finally:
+            con.close()
+        self._stats["saves"] += 1
+        self._stats["saved_entries"] = n
+        self._stats["last_save_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        return n
+
+    def restore(self) -> int:
+        """Load unexpired entries back into the registered caches; returns the number restored."""
+        if not os.path.exists(self.path):
+            return 0
+        n = 0
+        con = self._connect()
+        try:
+            now = time.time()
+            for name, c in self._caches().items():
+                cur = con.execute(
+                    "SELECT key, stored_at, expires_at, value FROM cache_entries "
+                    "WHERE cache = ? AND (expires_at IS NULL OR expires_at > ?) ORDER BY stored_at",
+                    (name, now),
+                )
+                for key, stored_at, expires_at, value in cur:
+                    try:
+                        if c.restore(_key_from_json(json.loads(key)), json.loads(value), stored_at, expires_at):
+                            n += 1
+                    except (TypeError, ValueError):
+                        continue   # undecodable row (older format, corrupt, unhashable key): skip it
+        finally:
+            con.close()
+        self._stats["restored_entries"] += n
+        return n
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.save()
+            except Exception:
+                self._stats["errors"] += 1
+                log.exception("snapshot save failed")
+
+    def start(self) -> None:
+        """Restore, then save periodically in a daemon thread."""
+        try:
+            n = self.restore()
+            log.info("restored %d cache entries from %s", n, self.path)
+        except Exception:
+            self._stats["errors"] += 1
+            log.exception("snapshot restore failed")
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            self.save()
+        except Exception:
+            self._stats["errors"] += 1
+            log.exception("final snapshot save failed")
+
+    def stats(self) -> dict:
+        return {**self._stats, "path": self.path, "caches": self.cache_names,
+                "enabled": bool(self._thread and self._thread.is_alive())}
+
+def snapshotter_for(cache_names: List[str]) -> Optional[Snapshotter]:
+    """A Snapshotter over `cache_names` when SNAPSHOT_PATH is set, else None."""
+    return Snapshotter(SNAPSHOT_PATH, cache_names) if SNAPSHOT_PATH else None
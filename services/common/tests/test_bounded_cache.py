@@ -0,0 +1,29 @@
+import time
+from services.common.bounded_cache import BoundedCache
+
+def test_lru_eviction_by_entry_count():
+    c = BoundedCache("test.lru", max_entries=3)
+    for k in "abc":
+        c.put(k, k.upper())
+    assert c.get("a") == "A"          # a becomes most recent
+    c.put("d", "D")                   # evicts b
+    assert c.get("b") is None
+    assert [k for k in c] == ["c", "a", "d"]
+    assert c.stats()["evictions"] == 1
+
+def test_ttl_expiry_and_sentinel_default():
+    c = BoundedCache("test.ttl", ttl_s=0.05)
+    c.put("k", None)
+    miss = object()
+    assert c.get("k", miss) is None   # cached None is a hit
+    time.sleep(0.06)
+    assert c.get("k", miss) is miss
+    assert c.stats()["expirations"] == 1
+
+def test_byte_budget_evicts_oldest():
+    c = BoundedCache("test.bytes", max_entries=100, max_bytes=3000)
+    for i in range(10):
+        c.put(i, "x" * 500)
+    st = c.stats()
+    assert st["bytes"] <= 3000 and st["entries"] < 10
+    assert c.get(9) is not None and c.get(0) is None
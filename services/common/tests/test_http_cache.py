@@ -0,0 +1,30 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.common.http_cache import cached_json, etag_for, matches, max_age_of
+
+def test_etag_ignores_excluded_fields_and_key_order():
+    a = etag_for({"x": 1, "y": [1, 2], "ts": "t1"}, exclude=("ts",))
+    assert a == etag_for({"y": [1, 2], "ts": "t2", "x": 1}, exclude=("ts",))
+    assert a != etag_for({"x": 2, "y": [1, 2]})
+
+def test_if_none_match_parsing():
+    assert matches('"a", W/"b"', '"b"') and matches("*", '"z"')
+    assert not matches('"a"', '"b"') and not matches(None, '"a"')
+    assert max_age_of("public, max-age=12") == 12 and max_age_of("no-store") is None
+
+def test_conditional_get_returns_304_with_headers():
+    app = FastAPI()
+
+    @app.get("/x")
+    def x(request: Request):
+        return cached_json(request, {"v": 1, "ts": "now"}, max_age=9.7, last_modified=1_760_000_000,
+                           exclude=("ts",))
+
+    c = TestClient(app)
+    r = c.get("/x")
+    assert r.status_code == 200 and r.json()["v"] == 1
+    assert r.headers["cache-control"] == "max-age=9"
+    assert r.headers["last-modified"].endswith("GMT")
+    r2 = c.get("/x", headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304 and r2.content == b"" and r2.headers["etag"] == r.headers["etag"]
@@ -0,0 +1,69 @@
+import pickle, sqlite3, time
+
+from services.common.bounded_cache import BoundedCache
+from services.common.snapshot import Snapshotter
+
+
+def test_roundtrip_keeps_original_ttl(tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    c = BoundedCache("snap.test.a", max_entries=10, ttl_s=60)
+    c.put(("AAPL", 5), [{"title": "x"}])
+    c.put("short", 1, ttl_s=0.05)
+    c.put("none", None)
+    stored_at = c.items()[0][1]
+    snap = Snapshotter(path, ["snap.test.a"])
+    assert snap.save() == 3
+
+    time.sleep(0.1)          # "short" expires while the service is down
+    c.clear()
+    assert snap.restore() == 2
+    assert c.get(("AAPL", 5)) == [{"title": "x"}]
+    assert "none" in c and "short" not in c
+    key, st, exp, _ = [e for e in c.items() if e[0] == ("AAPL", 5)][0]
+    assert st == stored_at and exp == stored_at + 60
+
+
+def test_restore_does_not_clobber_fresher_entries(tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    c = BoundedCache("snap.test.b", max_entries=10, ttl_s=60)
+    c.put("k", "old")
+    snap = Snapshotter(path, ["snap.test.b"])
+    snap.save()
+    c.put("k", "new")
+    assert snap.restore() == 0
+    assert c.get("k") == "new"
+
+
+def test_save_replaces_previous_snapshot(tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    c = BoundedCache("snap.test.c", max_entries=10, ttl_s=60)
+    c.put("a", 1)
+    snap = Snapshotter(path, ["snap.test.c"])
+    snap.save()
+    c.pop("a")
+    c.put("b", 2)
+    snap.save()
+    c.clear()
+    snap.restore()
+    assert list(c) == ["b"]
+
+
+def test_snapshot_is_json_and_skips_foreign_rows(tmp_path):
+    path = str(tmp_path / "snap.sqlite")
+    c = BoundedCache("snap.test.d", max_entries=10, ttl_s=60)
+    c.put("ok", (1.5, {"a": [1, 2]}))
+    c.put("obj", object())              # not JSON: left out of the snapshot
+    snap = Snapshotter(path, ["snap.test.d"])
+    assert snap.save() == 1
+
+    con = sqlite3.connect(path)
+    assert con.execute("SELECT key, value FROM cache_entries").fetchall() == [('"ok"', '[1.5, {"a": [1, 2]}]')]
+    exp = time.time() + 60
+    with con:
+        con.execute("INSERT INTO cache_entries VALUES ('snap.test.d', ?, 1.0, ?, 'x')",
+                    (pickle.dumps("evil"), exp))
+        con.execute("INSERT INTO cache_entries VALUES ('snap.test.d', '{\"k\": 1}', 1.0, ?, '1')", (exp,))
+    con.close()
+    c.clear()
+    assert snap.restore() == 1
+    assert c.get("ok") == [1.5, {"a": [1, 2]}]
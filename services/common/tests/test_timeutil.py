@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from services.common import timeutil
+from services.common.timeutil import iso_z, normalize_iso, to_epoch
+
+E = int(datetime(2025, 10, 6, 14, 0, 0, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.mark.parametrize("raw", [
+    E, float(E), E * 1000, str(E),
+    "2025-10-06T14:00:00Z", "2025-10-06T14:00:00.000Z", "2025-10-06T14:00:00.123456+00:00",
+    "2025-10-06T16:00:00+02:00", "2025-10-06T09:00:00-0500", "2025-10-06 14:00:00", "2025-10-06T14:00Z",
+    "Mon, 06 Oct 2025 14:00:00 GMT", "Mon, 06 Oct 2025 14:00:00 +0000", "Mon, 06 Oct 2025 10:00:00 -0400",
+])
+def test_provider_formats(raw):
+    assert to_epoch(raw) == E
+
+
+def test_bare_date_and_garbage():
+    assert to_epoch("2025-10-06") == E - 14 * 3600
+    assert to_epoch("not a date") is None and to_epoch("", default=5) == 5 and to_epoch(None) is None
+    assert to_epoch("2025-13-45T00:00:00Z") is None
+
+
+def test_iso_output_and_memoization():
+    assert iso_z(E) == "2025-10-06T14:00:00Z"
+    assert normalize_iso("Mon, 06 Oct 2025 14:00:00 GMT") == "2025-10-06T14:00:00Z"
+    before = timeutil.cache_info()["hits"]
+    to_epoch("2025-10-06T14:00:00Z")
+    assert timeutil.cache_info()["hits"] == before + 1
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_tz, mktime_tz
+from functools import lru_cache
+from typing import Optional, Union
+
+# --------------------------------------------------------------------
+# Timestamp parsing for provider data. Fast paths for what the providers
+# actually send: epoch seconds/ms (Finnhub), ISO-8601 with "Z", fractional
+# seconds or an offset (Tiingo, our own payloads), bare dates (earnings) and
+# RFC 822 dates (RSS pubDate). String results are memoized, so a headline or
+# bar timestamp seen again costs a dict lookup. Hot paths take int epochs.
+# --------------------------------------------------------------------
+
+Stamp = Union[str, int, float, None]
+
+def iso_z(epoch: float) -> str:
+    """Epoch seconds -> 'YYYY-MM-DDTHH:MM:SSZ'."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(int(epoch)))
+
+def iso_now() -> str:
+    return iso_z(time.time())
+
+@lru_cache(maxsize=16384)
+def _parse_str(s: str) -> Optional[int]:
+    s = s.strip()
+    if not s:
+        return None
+    c = s[0]
+    if c.isdigit():
+        if s.isdigit():
+            v = int(s)
+            return v // 1000 if v > 10**11 else v
+        # ISO-8601: the C parser takes "Z", fractions and offsets on 3.11+;
+        # older interpreters need "Z" spelled as an offset
+        try:
+            d = datetime.fromisoformat(s)
+        except ValueError:
+            try:
+                d = datetime.fromisoformat(s.replace("Z", "+00:00").replace("z", "+00:00"))
+            except ValueError:
+                return None
+        if d.tzinfo is None:
+            d = d.replace(tzinfo=timezone.utc)
+        return int(d.timestamp())
+    tup = parsedate_tz(s)              # RFC 822 / 2822 ("Mon, 06 Oct 2025 14:00:00 GMT")
+    return int(mktime_tz(tup)) if tup is not None else None
+
+def to_epoch(value: Stamp, default: Optional[int] = None) -> Optional[int]:
+    """Epoch seconds (UTC) for an epoch number (s or ms) or a date string; `default` when unparseable."""
+    if value is None or isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        v = int(value)
+        return v // 1000 if v > 10**11 else v
+    r = _parse_str(str(value))
+    return default if r is None else r
+
+def parse_dt(value: Stamp) -> datetime:
+    """Aware UTC datetime; now when `value` is missing or unparseable."""
+    e = to_epoch(value)
+    if e is None:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(e, timezone.utc)
+
+def normalize_iso(value: Stamp) -> str:
+    """ISO-Z string for any supported stamp; now when missing or unparseable."""
+    e = to_epoch(value)
+    return iso_z(time.time() if e is None else e)
+
+def cache_info() -> dict:
+    ci = _parse_str.cache_info()
+    return {"hits": ci.hits, "misses": ci.misses, "size": ci.currsize, "max": ci.maxsize}
@@ -1,8 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timezone
 from pydantic import BaseModel
-from .features import build_features_stub, build_features_for
-import logging
+from typing import List
+from .features import build_features_stub, build_features_for, build_features_batch, HEADLINE_HEDGE
+from . import transport
+from .cache import cache_stats, freshness
+from .providers_tiingo import CANDLES
+from . import prefetch, dedupe, rss
+from .earnings_calendar import EARNINGS
+from .stream import STREAM, ENABLED as STREAM_ENABLED
+from .governor import GOVERNOR
+from services.common.snapshot import snapshotter_for
+from services.common.http_cache import cached_json
+import json, logging, os
 
 app = FastAPI(title="MIDAS Context API", version="v1")
 log = logging.getLogger("context_api")
@@ -14,30 +25,88 @@ def ts_utc_now() -> str:
 def healthz():
     return {"status": "ok", "service": "context", "version": "v1"}
 
+# warm-start snapshot (SNAPSHOT_PATH); restored before the calendar and prefetcher start
+SNAPSHOT = snapshotter_for(["context.payload", "finnhub.news", "finnhub.earnings_calendar", "yahoo.feed",
+                            "context.sent_scores"])
+
+@app.on_event("startup")
+def _start_prefetch():
+    if SNAPSHOT:
+        SNAPSHOT.start()
+    if os.getenv("LIVE_PROVIDERS") == "1":
+        EARNINGS.start()
+        if STREAM_ENABLED:
+            STREAM.start(prefetch.WATCHLIST)
+        if prefetch.ENABLED:
+            prefetch.PREFETCHER.start()
+
+@app.on_event("shutdown")
+def _close_transport():
+    prefetch.PREFETCHER.stop()
+    EARNINGS.stop()
+    STREAM.stop()
+    if SNAPSHOT:
+        SNAPSHOT.stop()
+    transport.close_all()
+
+@app.get("/api/stats")
+def stats():
+    return {
+        "transport": transport.stats(),
+        "cache": cache_stats(),
+        "candles": CANDLES.stats(),
+        "prefetch": prefetch.PREFETCHER.stats(),
+        "governor": GOVERNOR.stats(),
+        "earnings_calendar": EARNINGS.stats(),
+        "stream": STREAM.stats(),
+        "headline_hedge": HEADLINE_HEDGE.stats(),
+        "headline_dedupe": dedupe.stats(),
+        "rss_parser": rss.stats(),
+        "snapshot": SNAPSHOT.stats() if SNAPSHOT else None,
+        "ts": ts_utc_now(),
+    }
+
 @app.get("/api/features")
 def features_stub(ticker: str):
     if not ticker or not ticker.strip():
         raise HTTPException(status_code=422, detail="ticker is required")
     return {"features": build_features_stub(), "ticker": ticker, "ts": ts_utc_now()}
 
+def _v2_resp(ticker: str, bundle: dict) -> dict:
+    resp = {
+        "features": bundle.get("features", {}),
+        "ticker": ticker,
+        "ts": ts_utc_now(),
+    }
+    if bundle.get("top_headline"):
+        resp["top_headline"] = bundle["top_headline"]
+    if bundle.get("quote"):
+        resp["quote"] = bundle["quote"]
+    if bundle.get("error"):
+        resp["error"] = bundle["error"]
+    meta = bundle.get("_cache") or {}
+    if meta.get("stale"):
+        # served inside the stale-while-revalidate window; refresh is running
+        resp["stale"] = True
+        resp["age_s"] = meta.get("age_s")
+    return resp
+
+# per-response fields left out of the ETag
+_V2_VOLATILE = ("ts", "age_s")
+
 @app.get("/api/features/v2")
-def features_v2(ticker: str):
+def features_v2(ticker: str, request: Request):
+    """ETag + If-None-Match -> 304; max-age is the cached payload's remaining TTL."""
     if not ticker or not ticker.strip():
         raise HTTPException(status_code=422, detail="ticker is required")
+    prefetch.PREFETCHER.note_request(ticker)
+    if STREAM_ENABLED:
+        STREAM.track([ticker])
     try:
         bundle = build_features_for(ticker)  # {"features":..., "top_headline":..., "quote":..., "error":...}
-        resp = {
-            "features": bundle.get("features", {}),
-            "ticker": ticker,
-            "ts": ts_utc_now(),
-        }
-        if bundle.get("top_headline"):
-            resp["top_headline"] = bundle["top_headline"]
-        if bundle.get("quote"):
-            resp["quote"] = bundle["quote"]
-        if bundle.get("error"):
-            resp["error"] = bundle["error"]
-        return resp
+        max_age, built = freshness(ticker)
+        return cached_json(request, _v2_resp(ticker, bundle), max_age=max_age, last_modified=built,
+                           exclude=_V2_VOLATILE)
     except Exception as e:
         log.exception("features_v2 failed for %s", ticker)
         return {
@@ -47,6 +116,33 @@ def features_v2(ticker: str):
             "error": str(e),
         }
 
+BATCH_MAX = int(os.getenv("CONTEXT_BATCH_MAX", "500"))
+
+class BatchIn(BaseModel):
+    tickers: List[str]
+
+def _batch_items(tickers: List[str]):
+    try:
+        for t, bundle in build_features_batch(tickers):
+            yield _v2_resp(t, bundle)
+    except Exception as e:
+        log.exception("features_v2 batch failed")
+        yield {"error": f"batch failed: {e!r}", "ts": ts_utc_now()}
+
+@app.post("/api/features/v2/batch")
+def features_v2_batch(x: BatchIn, stream: bool = False):
+    """Watchlist refresh. stream=true returns NDJSON, one v2 object per line as tickers complete."""
+    tickers = [t for t in x.tickers if t and t.strip()]
+    if not tickers:
+        raise HTTPException(status_code=422, detail="tickers is required")
+    if len(tickers) > BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"at most {BATCH_MAX} tickers per batch")
+    if stream:
+        return StreamingResponse((json.dumps(r) + "\n" for r in _batch_items(tickers)),
+                                 media_type="application/x-ndjson")
+    results = list(_batch_items(tickers))
+    return {"results": results, "n": len(results), "ts": ts_utc_now()}
+
 class OneLinerIn(BaseModel):
     class_: str
     confidence: float
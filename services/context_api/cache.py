@@ -1,59 +1,202 @@
 from __future__ import annotations
-import os, time
-from typing import Dict, Tuple, Optional
+import os, time, threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Callable
 
-# Simple in-proc cache: ticker -> (epoch_secs, payload_dict)
-_CACHE: Dict[str, Tuple[float, dict]] = {}
+from services.common.bounded_cache import BoundedCache, all_stats
+
+# Single-flight: ticker -> Future of the build currently running for it
+_INFLIGHT: Dict[str, Future] = {}
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "builds": 0, "coalesced": 0, "stale_served": 0, "revalidations": 0}
 
 # Default 45s; override with CONTEXT_TTL_S
 TTL_S = float(os.getenv("CONTEXT_TTL_S", "45"))
+# Stale-while-revalidate window past TTL_S (0 = off). Inside it, get_or_build
+# serves the previous payload flagged stale and refreshes in the background.
+SWR_S = float(os.getenv("CONTEXT_SWR_S", "0"))
+# Synthetic/fallback payloads (providers failed or throttled) live only this long
+ERROR_TTL_S = float(os.getenv("CONTEXT_ERROR_TTL_S", "5"))
+
+# In-proc payload cache: ticker -> (epoch_secs, payload_dict); LRU-bounded,
+# entries expire at the hard TTL (TTL_S + SWR_S)
+_CACHE = BoundedCache(
+    "context.payload",
+    max_entries=int(os.getenv("CONTEXT_CACHE_MAX_ENTRIES", "2048")),
+    max_bytes=int(os.getenv("CONTEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_s=TTL_S + SWR_S,
+)
+
+def _key(ticker: str) -> str:
+    return (ticker or "").upper().strip()
 
-def get_cached(ticker: str) -> Optional[dict]:
-    """Return cached payload if fresh, else None."""
-    key = (ticker or "").upper().strip()
+def _annotate(payload: dict, age: float, stale: bool) -> dict:
+    meta = payload.setdefault("_cache", {})
+    meta["age_s"] = int(age)
+    meta["ttl_s"] = int(TTL_S)
+    meta["hit"] = True
+    meta["stale"] = stale
+    return payload
+
+def get_cached(ticker: str, allow_stale: bool = False) -> Optional[dict]:
+    """Return cached payload if fresh (or, with allow_stale, inside the SWR window), else None."""
+    key = _key(ticker)
     if not key:
         return None
     hit = _CACHE.get(key)
     if not hit:
+        _STATS["misses"] += 1
         return None
     ts_epoch, payload = hit
-    if (time.time() - ts_epoch) <= TTL_S:
-        # annotate (optional)
-        payload.setdefault("_cache", {})["age_s"] = int(time.time() - ts_epoch)
-        payload["_cache"]["ttl_s"] = int(TTL_S)
-        payload["_cache"]["hit"] = True
-        return payload
-    # stale
-    _CACHE.pop(key, None)
+    age = time.time() - ts_epoch
+    if age <= TTL_S:
+        _STATS["hits"] += 1
+        return _annotate(payload, age, stale=False)
+    if age <= TTL_S + SWR_S:
+        if allow_stale:
+            _STATS["stale_served"] += 1
+            return _annotate(payload, age, stale=True)
+    else:
+        # past the hard TTL
+        _CACHE.pop(key, None)
+    _STATS["misses"] += 1
     return None
 
-def put_cached(ticker: str, payload: dict) -> None:
-    key = (ticker or "").upper().strip()
+def put_cached(ticker: str, payload: dict, ttl_s: Optional[float] = None) -> None:
+    """Store a payload; `ttl_s` shortens its lifetime (e.g. ERROR_TTL_S for fallbacks)."""
+    key = _key(ticker)
     if not key or not isinstance(payload, dict):
         return
-    _CACHE[key] = (time.time(), payload)
+    _CACHE.put(key, (time.time(), payload), ttl_s=ttl_s)
+
+def _fresh(key: str) -> bool:
+    hit = _CACHE.get(key)
+    return bool(hit) and (time.time() - hit[0]) <= TTL_S
+
+def _run_build(key: str, fut: Future, build: Callable[[], dict]) -> dict:
+    try:
+        payload = build()
+        fut.set_result(payload)
+        return payload
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _LOCK:
+            _INFLIGHT.pop(key, None)
+
+def _revalidate(key: str, build: Callable[[], dict]) -> None:
+    """Start a background build for `key` unless one is already in flight."""
+    with _LOCK:
+        if key in _INFLIGHT:
+            return
+        fut = _INFLIGHT[key] = Future()
+        _STATS["revalidations"] += 1
+    def run():
+        try:
+            _run_build(key, fut, build)
+        except Exception:
+            pass  # stale entry stays until the hard TTL; next caller retries
+    threading.Thread(target=run, name=f"ctx-swr-{key}", daemon=True).start()
+
+def get_or_build(ticker: str, build: Callable[[], dict]) -> dict:
+    """
+    Cached payload for `ticker`, else run `build()` (which is expected to
+    put_cached its result). Concurrent misses for the same ticker wait on the
+    one in-flight build and share its result (or its exception). Inside the
+    SWR window the stale payload is returned at once and rebuilt in the
+    background.
+    """
+    key = _key(ticker)
+    cached = get_cached(key, allow_stale=SWR_S > 0)
+    if cached:
+        if cached["_cache"]["stale"]:
+            _revalidate(key, build)
+        return cached
+    while True:
+        with _LOCK:
+            if _fresh(key):
+                leader, fut = False, None       # a build finished since our miss
+            else:
+                fut = _INFLIGHT.get(key)
+                leader = fut is None
+                if leader:
+                    fut = _INFLIGHT[key] = Future()
+                    _STATS["builds"] += 1
+                else:
+                    _STATS["coalesced"] += 1
+        if fut is not None:
+            break
+        cached = get_cached(key)
+        if cached:
+            return cached
+        # expired or evicted between the check and the read: back through the
+        # lock so the rebuild stays single-flight
+    if not leader:
+        return fut.result()
+    return _run_build(key, fut, build)
+
+def age_of(ticker: str) -> Optional[float]:
+    """Seconds since the cached payload for `ticker` was built, or None."""
+    hit = _CACHE.get(_key(ticker))
+    return None if not hit else time.time() - hit[0]
+
+def freshness(ticker: str) -> tuple[float, Optional[float]]:
+    """(seconds the cached payload stays fresh, epoch it was built); (0, None) if not cached."""
+    key = _key(ticker)
+    hit = _CACHE.get(key)
+    if not hit:
+        return 0.0, None
+    left = TTL_S - (time.time() - hit[0])
+    exp = _CACHE.expires_in(key)     # shorter for fallback / streamed payloads
+    if exp is not None:
+        left = min(left, exp)
+    return max(0.0, left), hit[0]
+
+def refresh(ticker: str, build: Callable[[], dict]) -> bool:
+    """
+    Rebuild `ticker` now, in the caller's thread, regardless of freshness
+    (prefetch path). Returns False if a build is already in flight; callers
+    arriving meanwhile coalesce onto this one.
+    """
+    key = _key(ticker)
+    with _LOCK:
+        if key in _INFLIGHT:
+            return False
+        fut = _INFLIGHT[key] = Future()
+    _run_build(key, fut, build)
+    return True
+
+def cache_stats() -> dict:
+    with _LOCK:
+        out = {**_STATS, "entries": len(_CACHE), "inflight": len(_INFLIGHT), "ttl_s": TTL_S, "swr_s": SWR_S,
+               "error_ttl_s": ERROR_TTL_S}
+    out["bounded"] = all_stats()
+    return out
 
 # --------------------------------------------------------------------
 # Simple TTL decorator used by providers_tiingo and others
 # --------------------------------------------------------------------
 import functools
 
-def ttl_cache(ttl_seconds=60):
-    """Basic in-memory time-based cache decorator."""
+_MISS = object()
+
+def ttl_cache(ttl_seconds=60, maxsize=1024):
+    """Basic in-memory time-based cache decorator (LRU-bounded to `maxsize` keys)."""
     def decorator(func):
-        cache = {}
+        cache = BoundedCache(f"{func.__module__}.{func.__qualname__}", max_entries=maxsize, ttl_s=ttl_seconds)
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             key = (args, tuple(sorted(kwargs.items())))
-            now = time.time()
-            if key in cache:
-                value, ts = cache[key]
-                if now - ts < ttl_seconds:
-                    return value
+            value = cache.get(key, _MISS)
+            if value is not _MISS:
+                return value
             value = func(*args, **kwargs)
-            cache[key] = (value, now)
+            cache.put(key, value)
             return value
 
+        wrapper.cache = cache
+
         return wrapper
     return decorator
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import os, threading, time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .indicators import RollingIndicators
+from .providers import Bars
+from services.common.bounded_cache import BoundedCache
+
+# --------------------------------------------------------------------
+# Incremental minute-candle store. Bars already seen are kept per
+# (ticker, freq) in preallocated columns; a refresh only parses rows newer
+# than the last stored bar and merges them in place (the last bar is
+# replaced while its minute is still forming). Windows are served from memory.
+# With rolling=True each series also keeps RollingIndicators in step with its
+# bars (append / update_last), so indicators() is O(1) instead of a pass
+# over the window.
+# --------------------------------------------------------------------
+
+MAX_BARS = int(os.getenv("CANDLE_STORE_MAX_BARS", "600"))
+
+# parsed row: (ts_epoch, open, high, low, close, volume)
+Row = Tuple[int, float, float, float, float, float]
+
+class _Series:
+    __slots__ = ("ts", "cols", "n", "lock", "roll")
+
+    def __init__(self, cap: int, rolling: bool = False):
+        self.ts = np.zeros(cap, dtype=np.int64)
+        self.cols = np.zeros((5, cap), dtype=np.float64)  # open, high, low, close, volume
+        self.n = 0
+        self.lock = threading.Lock()
+        self.roll: Optional[RollingIndicators] = RollingIndicators() if rolling else None
+
+    def bars(self, start: int, stop: int) -> Bars:
+        c = self.cols[:, start:stop].copy()
+        return Bars(self.ts[start:stop].copy(), c[0], c[1], c[2], c[3], c[4])
+
+class CandleStore:
+    def __init__(self, name: str = "candles", max_bars: int = MAX_BARS, max_tickers: int = 1024,
+                 rolling: bool = False):
+        self.max_bars = max_bars
+        self.rolling = rolling
+        self._series = BoundedCache(name, max_entries=max_tickers)  # (ticker, freq) -> _Series
+        self._lock = threading.Lock()
+        self._stats = {"refreshes": 0, "rows_received": 0, "rows_parsed": 0, "bars_appended": 0, "bars_replaced": 0}
+
+    def _get(self, ticker: str, freq: str) -> _Series:
+        key = (ticker.upper(), freq)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = _Series(self.max_bars, self.rolling)
+                self._series.put(key, s)
+            return s
+
+    def last_ts(self, ticker: str, freq: str = "1min") -> Optional[int]:
+        """Epoch seconds of the newest stored bar, or None."""
+        s = self._get(ticker, freq)
+        return int(s.ts[s.n - 1]) if s.n else None
+
+    def merge(self, ticker: str, freq: str, rows: list, parse_row: Callable[[dict], Row]) -> int:
+        """
+        Merge provider rows (oldest first) into the series. Rows are walked from
+        the newest end and parsing stops at the first one older than the last
+        stored bar. Returns the number of new or updated bars.
+        """
+        s = self._get(ticker, freq)
+        parsed = 0
+        with s.lock:
+            last = int(s.ts[s.n - 1]) if s.n else None
+            fresh = []
+            for row in reversed(rows):
+                bar = parse_row(row)
+                parsed += 1
+                if last is not None and bar[0] < last:
+                    break
+                fresh.append(bar)
+                if len(fresh) >= self.max_bars:
+                    break
+            fresh.reverse()
+            replaced = 0
+            if fresh and last is not None and fresh[0][0] == last:
+                self._replace_last(s, fresh.pop(0))  # in-progress minute updated
+                replaced = 1
+            self._append(s, fresh)
+        with self._lock:
+            st = self._stats
+            st["refreshes"] += 1
+            st["rows_received"] += len(rows)
+            st["rows_parsed"] += parsed
+            st["bars_appended"] += len(fresh)
+            st["bars_replaced"] += replaced
+        return len(fresh) + replaced
+
+    def put_bar(self, ticker: str, freq: str, bar: Row) -> None:
+        """Append `bar`, or overwrite the last bar when it has the same timestamp."""
+        s = self._get(ticker, freq)
+        with s.lock:
+            if s.n and int(s.ts[s.n - 1]) == bar[0]:
+                self._replace_last(s, bar)
+            elif not s.n or bar[0] > int(s.ts[s.n - 1]):
+                self._append(s, [bar])
+
+    @staticmethod
+    def _write(s: _Series, i: int, bar: Row) -> None:
+        s.ts[i] = bar[0]
+        s.cols[:, i] = bar[1:]
+
+    @classmethod
+    def _replace_last(cls, s: _Series, bar: Row) -> None:
+        cls._write(s, s.n - 1, bar)
+        if s.roll is not None:
+            s.roll.update_last(bar[2], bar[3], bar[4])
+
+    def _append(self, s: _Series, bars: list) -> None:
+        if not bars:
+            return
+        if s.roll is not None:
+            for bar in bars:
+                s.roll.append(bar[2], bar[3], bar[4])
+        cap = s.ts.shape[0]
+        k = len(bars)
+        if s.n + k > cap:
+            keep = max(0, cap - k)
+            s.ts[:keep] = s.ts[s.n - keep:s.n]
+            s.cols[:, :keep] = s.cols[:, s.n - keep:s.n]
+            s.n = keep
+        for j, bar in enumerate(bars):
+            self._write(s, s.n + j, bar)
+        s.n += k
+
+    def window(self, ticker: str, freq: str = "1min", lookback_minutes: int = 120) -> Bars:
+        """
+        Bars from the last ~lookback_minutes (UTC). Relaxed: if that yields too
+        few bars (closed market), fall back to the latest N stored bars.
+        """
+        s = self._get(ticker, freq)
+        cutoff = int(time.time()) - (lookback_minutes + 5) * 60
+        with s.lock:
+            i = int(np.searchsorted(s.ts[:s.n], cutoff, side="left"))
+            if s.n - i < 6:
+                i = max(0, s.n - max(60, lookback_minutes))
+            return s.bars(i, s.n)
+
+    def indicators(self, ticker: str, freq: str = "1min") -> Optional[Dict[str, Any]]:
+        """r_1m / r_5m / rv20 / above_sma20 from the rolling state (rolling stores with 21+ bars), else None."""
+        s = self._get(ticker, freq)
+        with s.lock:
+            roll = s.roll
+            if roll is None or roll.count < roll.window + 1:
+                return None
+            return {"r_1m": roll.ret(1), "r_5m": roll.ret(5), "rv20": roll.rv20, "above_sma20": roll.above_sma20}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "series": len(self._series)}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import os, re, threading
+from hashlib import blake2b
+from typing import Callable, Dict, List, Sequence, TypeVar
+
+# --------------------------------------------------------------------
+# Near-duplicate headline collapsing. Syndicated stories reach us several
+# times (Finnhub sources, Yahoo RSS) with small edits: a trailing
+# " - Reuters", different quotes/case, a word changed. Titles are
+# normalized, split into character 4-gram shingles and reduced to a 64-bit
+# SimHash; two titles within CONTEXT_DUP_HAMMING bits are the same story.
+# The first item of each story is kept, so callers pass items in order of
+# preference (e.g. Finnhub before Yahoo, best-ranked first).
+# --------------------------------------------------------------------
+
+MAX_HAMMING = int(os.getenv("CONTEXT_DUP_HAMMING", "10"))
+SHINGLE = 4
+MIN_TOKENS = 4   # shorter titles only collapse on an exact normalized match
+
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+_STATS = {"seen": 0, "collapsed": 0}
+_lock = threading.Lock()
+
+T = TypeVar("T")
+
+def normalize(title: str) -> str:
+    """Lowercase, drop a trailing " - Publisher" tag and punctuation, collapse spaces."""
+    t = _SOURCE_SUFFIX.sub("", (title or "").strip())
+    return _NON_WORD.sub(" ", t.lower()).strip()
+
+def _h64(s: str) -> int:
+    return int.from_bytes(blake2b(s.encode(), digest_size=8).digest(), "big")
+
+def simhash(norm: str) -> int:
+    if not norm:
+        return 0
+    grams = [norm[i:i + SHINGLE] for i in range(max(1, len(norm) - SHINGLE + 1))]
+    acc = [0] * 64
+    for g in grams:
+        h = _h64(g)
+        for b in range(64):
+            acc[b] += 1 if (h >> b) & 1 else -1
+    return sum(1 << b for b in range(64) if acc[b] > 0)
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def collapse(items: Sequence[T], title: Callable[[T], str] = lambda h: h.get("title", ""),
+             max_distance: int = MAX_HAMMING) -> List[T]:
+    """Drop items whose title is a near-duplicate of an earlier item's; order is kept."""
+    kept: List[T] = []
+    seen_norm: Dict[str, int] = {}
+    sigs: List[int] = []
+    for it in items:
+        norm = normalize(title(it))
+        if norm in seen_norm:
+            continue
+        sig = simhash(norm) if len(norm.split()) >= MIN_TOKENS else None
+        if sig is not None and any(hamming(sig, s) <= max_distance for s in sigs):
+            continue
+        seen_norm[norm] = 1
+        if sig is not None:
+            sigs.append(sig)
+        kept.append(it)
+    with _lock:
+        _STATS["seen"] += len(items)
+        _STATS["collapsed"] += len(items) - len(kept)
+    return kept
+
+def stats() -> dict:
+    with _lock:
+        return {**_STATS, "max_hamming": MAX_HAMMING}
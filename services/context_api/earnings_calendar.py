@@ -0,0 +1,115 @@
+from __future__ import annotations
+import os, threading, logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from . import governor
+from .providers_finnhub import fetch_earnings_calendar
+from services.common.bounded_cache import BoundedCache
+
+# --------------------------------------------------------------------
+# Earnings calendar. One Finnhub /calendar/earnings call covers every
+# symbol reporting in the next EARNINGS_HORIZON_DAYS; it is refreshed in the
+# background every EARNINGS_REFRESH_S and kept as a symbol -> next-date
+# index, so feature builds answer "earnings soon?" with a dict lookup and
+# no provider call. The index lives in a BoundedCache so warm-start
+# snapshots carry it across restarts. Until the first download succeeds
+# (no token, provider down) lookups return None -> earnings_soon False.
+# --------------------------------------------------------------------
+
+log = logging.getLogger("context_api.earnings_calendar")
+
+HORIZON_DAYS = int(os.getenv("EARNINGS_HORIZON_DAYS", "30"))
+REFRESH_S    = float(os.getenv("EARNINGS_REFRESH_S", "21600"))   # 6 h
+RETRY_S      = float(os.getenv("EARNINGS_RETRY_S", "60"))        # after a failed download
+
+_INDEX_KEY = "index"
+
+class EarningsCalendar:
+    def __init__(self, horizon_days: int = HORIZON_DAYS, refresh_s: float = REFRESH_S,
+                 retry_s: float = RETRY_S):
+        self.horizon_days = horizon_days
+        self.refresh_s = refresh_s
+        self.retry_s = retry_s
+        # single entry: symbol -> date; kept for two refresh periods so a few
+        # failed refreshes serve the previous calendar instead of nothing
+        self._store = BoundedCache("finnhub.earnings_calendar", max_entries=1, ttl_s=2 * refresh_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"refreshes": 0, "errors": 0, "lookups": 0, "hits": 0}
+
+    # ----- index
+    def _index(self) -> Dict[str, str]:
+        return self._store.get(_INDEX_KEY) or {}
+
+    def refresh(self) -> int:
+        """Download [today, today + horizon] for all symbols; returns the number of symbols indexed."""
+        today = datetime.now(timezone.utc).date()
+        with governor.priority(governor.PREFETCH):
+            rows = fetch_earnings_calendar(today.isoformat(), (today + timedelta(days=self.horizon_days)).isoformat())
+        # ISO strings, not dates: the index must stay JSON for snapshots
+        index: Dict[str, str] = {}
+        for sym, ds in rows.items():
+            try:
+                index[sym] = date.fromisoformat(ds).isoformat()
+            except (TypeError, ValueError):
+                continue
+        self._store.put(_INDEX_KEY, index)
+        self._stats["refreshes"] += 1
+        return len(index)
+
+    def age_s(self) -> Optional[float]:
+        return self._store.age(_INDEX_KEY) if _INDEX_KEY in self._store else None
+
+    def next_date(self, ticker: str) -> Optional[date]:
+        """Next earnings date on or after today from the in-memory index; never calls the provider."""
+        self._stats["lookups"] += 1
+        ds = self._index().get((ticker or "").upper().strip())
+        d = date.fromisoformat(ds) if ds else None
+        if d is None or d < datetime.now(timezone.utc).date():
+            return None
+        self._stats["hits"] += 1
+        return d
+
+    def days_until(self, ticker: str) -> Optional[int]:
+        d = self.next_date(ticker)
+        return None if d is None else (d - datetime.now(timezone.utc).date()).days
+
+    # ----- schedule
+    def _due_in(self) -> float:
+        age = self.age_s()
+        return 0.0 if age is None else max(0.0, self.refresh_s - age)
+
+    def _run(self) -> None:
+        wait = self._due_in()          # a restored snapshot may still be fresh
+        while not self._stop.wait(wait):
+            try:
+                n = self.refresh()
+                log.info("earnings calendar: %d symbols in the next %d days", n, self.horizon_days)
+                wait = self.refresh_s
+            except Exception:
+                self._stats["errors"] += 1
+                log.exception("earnings calendar refresh failed")
+                wait = self.retry_s
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ctx-earnings", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        age = self.age_s()
+        return {
+            **self._stats,
+            "enabled": bool(self._thread and self._thread.is_alive()),
+            "symbols": len(self._index()),
+            "age_s": None if age is None else round(age, 1),
+            "horizon_days": self.horizon_days,
+        }
+
+EARNINGS = EarningsCalendar()
@@ -1,53 +1,49 @@
 from __future__ import annotations
-import os
-from collections import deque
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, List
+import os, time, math, contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Optional, Dict, Any, List, Callable, Iterator, Sequence
 
-import httpx
+import numpy as np
 
-from .cache import get_cached, put_cached
-from .indicators import atr_normalized, ret_pct, above_sma20
+from . import transport
+from .cache import get_cached, put_cached, get_or_build, refresh, ERROR_TTL_S
+from services.common.bounded_cache import BoundedCache
+from services.common.timeutil import iso_now, to_epoch
+from .indicators import atr_normalized, ret_pct, above_sma20, atr_normalized_batch, ret_pct_batch, sma_batch
 from .providers_finnhub import (
     fetch_headlines, FHError,
-    fetch_earnings_date as fetch_earnings_finnhub,
     fetch_quote_finnhub,
 )
-from .providers_tiingo import fetch_candles_tiingo, fetch_quote_tiingo, TiError
+from .providers_tiingo import fetch_candles_tiingo, fetch_quote_tiingo, fetch_quotes_tiingo, TiError
 from .providers_yahoo import fetch_headlines_yahoo
-
-_QUOTE_RING: dict[str, deque[tuple[datetime, float]]] = {}
+from .earnings_calendar import EARNINGS
+from .stream import STREAM, PAYLOAD_TTL_S as STREAM_PAYLOAD_TTL_S
+from .hedge import Hedge
+from .news import merge_rank_headlines
+from .dedupe import collapse
+from .providers import Bars
+from .quote_ring import QuoteRing
+
+# ticker -> QuoteRing (fixed ~9.9 KB each, see quote_ring.py); LRU-bounded,
+# idle tickers age out after 10 min
+_QUOTE_RING = BoundedCache("context.quote_ring", max_entries=int(os.getenv("CONTEXT_RING_MAX_TICKERS", "1024")), ttl_s=600)
 SENT_URL = os.getenv("SENT_URL", "http://127.0.0.1:8016")
-
-def iso_now() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00","Z")
-
-def _parse_iso_aware(s: str) -> datetime:
-    if not s: return datetime.now(timezone.utc)
-    s2 = s.replace("Z", "+00:00")
-    try: d = datetime.fromisoformat(s2)
-    except Exception: return datetime.now(timezone.utc)
-    if d.tzinfo is None: d = d.replace(tzinfo=timezone.utc)
-    return d.astimezone(timezone.utc)
+# title -> sentiment sample; a title's score does not change, so the context API
+# only sends titles it has not had scored yet
+_SENT_SCORES = BoundedCache("context.sent_scores", max_entries=int(os.getenv("CONTEXT_SENT_CACHE_MAX", "8192")),
+                            ttl_s=float(os.getenv("CONTEXT_SENT_TTL_S", "3600")))
 
 def _note_quote(ticker: str, last: float) -> None:
-    ring = _QUOTE_RING.setdefault(ticker, deque(maxlen=600))
-    ring.append((datetime.now(timezone.utc), float(last)))
-    cut = datetime.now(timezone.utc) - timedelta(minutes=10)
-    while ring and ring[0][0] < cut:
-        ring.popleft()
+    ring = _QUOTE_RING.get(ticker)
+    if ring is None:
+        ring = QuoteRing()
+    _QUOTE_RING.put(ticker, ring)  # refresh LRU position and TTL
+    ring.append(int(time.time()), float(last), keep_s=600)
 
 def _ret_from_ring(ticker: str, minutes: int) -> float:
     ring = _QUOTE_RING.get(ticker)
     if not ring: return 0.0
-    cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
-    base = None
-    for ts, px in reversed(ring):
-        base = px
-        if ts <= cutoff: break
-    if base is None or base == 0.0: return 0.0
-    last = ring[-1][1]
-    return (last - base) / base if base else 0.0
+    return ring.ret_since(int(time.time()) - minutes * 60)
 
 def _synthetic_feats() -> dict:
     closes = [100,101,102,103,103,104,105,104,103,102,103,104,103,102,101,100,99,99,100,101,102]
@@ -68,66 +64,231 @@ def _synthetic_feats() -> dict:
 def build_features_stub() -> dict:
     return _synthetic_feats()
 
-def _sent_from_headlines(headlines: List[dict]) -> tuple[float, float]:
+def _titles(headlines: List[dict]) -> List[str]:
+    """Titles to score, one per story: near-duplicates would weight sent_mean toward syndicated news."""
     titles = [h.get("title","").strip() for h in (headlines or []) if h.get("title")]
-    titles = [t for t in titles if t]
-    if not titles: return 0.0, 0.05
+    return collapse([t for t in titles if t], title=lambda t: t)[:8]
+
+def _mean_std(xs: List[float]) -> tuple[float, float]:
+    n = len(xs)
+    mean = sum(xs) / n
+    return mean, math.sqrt(sum((v - mean) ** 2 for v in xs) / n)
+
+def _score_titles(titles: Sequence[str], timeout: float) -> Dict[str, float]:
+    """
+    Sentiment sample per title. Titles scored before come from _SENT_SCORES;
+    only the rest are POSTed. Titles the service could not score are absent.
+    """
+    out: Dict[str, float] = {}
+    unseen: List[str] = []
+    for t in dict.fromkeys(titles):
+        v = _SENT_SCORES.get(t)
+        if v is None:
+            unseen.append(t)
+        else:
+            out[t] = v
+    if not unseen:
+        return out
     try:
-        with httpx.Client(timeout=6.0, trust_env=False) as cli:
-            r = cli.post(f"{SENT_URL}/api/sentiment", json={"texts": titles[:8]})
-            r.raise_for_status()
-            d = r.json()
-            return float(d.get("mean", 0.0)), float(d.get("std", 0.05))
+        r = transport.post(f"{SENT_URL}/api/sentiment", json={"texts": unseen}, timeout=timeout)
+        r.raise_for_status()
+        samples = r.json().get("samples") or []
     except Exception:
-        return 0.0, 0.05
+        return out
+    if len(samples) == len(unseen):
+        for t, v in zip(unseen, samples):
+            out[t] = float(v)
+            _SENT_SCORES.put(t, float(v))
+    return out
 
-def build_features_for(ticker: str) -> Dict[str, Any]:
-    live = os.getenv("LIVE_PROVIDERS") == "1"
+def _sent_of(titles: List[str], scores: Dict[str, float]) -> tuple[float, float]:
+    xs = [scores[t] for t in titles if t in scores]
+    return _mean_std(xs) if xs else (0.0, 0.05)
+
+def _sent_from_headlines(headlines: List[dict]) -> tuple[float, float]:
+    titles = _titles(headlines)
+    if not titles: return 0.0, 0.05
+    return _sent_of(titles, _score_titles(titles, timeout=6.0))
+
+def _sent_batch(headlines_by_ticker: Dict[str, List[dict]]) -> Dict[str, tuple[float, float]]:
+    """One sentiment POST (unseen titles only) for many tickers; per-ticker mean/std from the samples."""
+    titles = {t: _titles(hs) for t, hs in headlines_by_ticker.items()}
+    scores = _score_titles([x for ts in titles.values() for x in ts], timeout=10.0)
+    return {t: _sent_of(ts, scores) for t, ts in titles.items()}
+
+# ----- Hedged headline stage
+# With CONTEXT_HEDGE=1, Yahoo starts as soon as Finnhub has been slower than
+# its own CONTEXT_HEDGE_PCTL-th percentile latency (or failed / came back
+# empty); the first usable answer wins and is ranked via merge_rank_headlines.
+HEDGE = os.getenv("CONTEXT_HEDGE", "1") == "1"
+HEADLINE_HEDGE = Hedge(
+    "headlines",
+    pctl=float(os.getenv("CONTEXT_HEDGE_PCTL", "90")),
+    min_delay_s=float(os.getenv("CONTEXT_HEDGE_MIN_DELAY_S", "0.05")),
+    default_delay_s=float(os.getenv("CONTEXT_HEDGE_DEFAULT_DELAY_S", "0.5")),
+)
+
+def _fetch_headlines_hedged(ticker: str) -> tuple[List[dict], Optional[str]]:
+    winner, results, errors = HEADLINE_HEDGE.run(
+        lambda: fetch_headlines(ticker, limit=5),
+        lambda: fetch_headlines_yahoo(ticker, limit=5),
+    )
+    if winner is None:
+        notes = []
+        if "primary" in errors:
+            notes.append(f"news: {errors['primary']}")
+        if "secondary" in errors:
+            notes.append(f"yahoo: {errors['secondary']}")
+        return [], "; ".join(notes) or None
+    # a failed losing leg is not an error of this payload; it shows in HEADLINE_HEDGE.stats()
+    headlines = merge_rank_headlines(ticker, results.get("primary") or [], limit=5,
+                                     yahoo_items=results.get("secondary") or [])
+    return headlines, None
+
+def _fetch_headlines_any(ticker: str) -> tuple[List[dict], Optional[str]]:
+    if HEDGE:
+        return _fetch_headlines_hedged(ticker)
     error: Optional[str] = None
-    top_headline: Optional[dict] = None
+    headlines: List[dict] = []
+    try:
+        headlines = fetch_headlines(ticker, limit=5)
+    except FHError as e:
+        error = f"news: {e}"
+    if not headlines:
+        try:
+            headlines = fetch_headlines_yahoo(ticker, limit=5)
+        except Exception as e:
+            error = (error + f"; yahoo: {e}") if error else f"yahoo: {e}"
+    return headlines, error
+
+def _fetch_news(ticker: str) -> Dict[str, Any]:
+    """Headlines (Finnhub -> Yahoo fallback) followed by sentiment; one fan-out input."""
+    headlines, error = _fetch_headlines_any(ticker)
+    sent_mean, sent_std = _sent_from_headlines(headlines)
+    return {"headlines": headlines, "sent": (sent_mean, sent_std), "error": error}
+
+# ----- Concurrent fetch stage
+# Every independent provider input starts at once; each has its own deadline
+# measured from the start of the stage. Inputs that fail or miss their deadline
+# are reported in `errors` and the assembler falls back per input (see
+# build_features_for). Timed-out calls keep running in the pool and still warm
+# the provider caches for the next request.
+FANOUT = os.getenv("CONTEXT_FANOUT", "1") == "1"
+FANOUT_WORKERS = int(os.getenv("CONTEXT_FANOUT_WORKERS", "16"))
+INPUT_TIMEOUTS_S: Dict[str, float] = {
+    "news":     float(os.getenv("CONTEXT_NEWS_TIMEOUT_S", "8")),
+    "quote":    float(os.getenv("CONTEXT_QUOTE_TIMEOUT_S", "5")),
+    "candles":  float(os.getenv("CONTEXT_CANDLES_TIMEOUT_S", "8")),
+}
+_POOL = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="ctx-fetch")
+# pool the fan-out submits to; batch builds switch it to their own (see build_features_batch)
+_fanout_pool: contextvars.ContextVar[ThreadPoolExecutor] = contextvars.ContextVar("fanout_pool", default=_POOL)
+
+def _input_tasks(ticker: str) -> Dict[str, Callable[[], Any]]:
+    return {
+        "news":     lambda: _fetch_news(ticker),
+        "quote":    lambda: fetch_quote_tiingo(ticker),
+        "candles":  lambda: fetch_candles_tiingo(ticker, lookback_minutes=120, freq="1min"),
+    }
 
-    # TTL cache (live only)
-    if live:
-        cached = get_cached(ticker)
-        if cached:
-            return cached
+def _fetch_inputs(ticker: str, parallel: Optional[bool] = None,
+                  prefetched: Optional[Dict[str, Any]] = None) -> tuple[Dict[str, Any], Dict[str, BaseException]]:
+    """Run all provider inputs for `ticker`; returns (results, errors) keyed by input name.
+    Inputs already present in `prefetched` (batch path) are not fetched again."""
+    prefetched = prefetched or {}
+    tasks = {k: fn for k, fn in _input_tasks(ticker).items() if k not in prefetched}
+    results: Dict[str, Any] = dict(prefetched)
+    errors: Dict[str, BaseException] = {}
+    if not (FANOUT if parallel is None else parallel):
+        # sequential path (CONTEXT_FANOUT=0): same policy, no deadlines
+        for name, fn in tasks.items():
+            try:
+                results[name] = fn()
+            except Exception as e:
+                errors[name] = e
+        return results, errors
+
+    t0 = time.monotonic()
+    # copy the caller's context so the governor sees its priority in the workers
+    pool = _fanout_pool.get()
+    futs = {name: pool.submit(contextvars.copy_context().run, fn) for name, fn in tasks.items()}
+    for name, fut in futs.items():
+        remaining = INPUT_TIMEOUTS_S.get(name, 8.0) - (time.monotonic() - t0)
+        try:
+            results[name] = fut.result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            errors[name] = TimeoutError(f"timed out after {INPUT_TIMEOUTS_S.get(name, 8.0):g}s")
+        except Exception as e:
+            errors[name] = e
+    return results, errors
+
+def _input_error(name: str, e: BaseException) -> str:
+    if isinstance(e, TiError):
+        return f"tiingo: {e}"
+    return f"{name}: {e}"
+
+def build_features_for(ticker: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the v2 feature bundle for `ticker`. `prefetched` holds fan-out inputs
+    (same keys/shapes as _input_tasks) already fetched by the caller.
+
+    Partial-result policy for the fetch stage:
+      - news missing      -> no headline, neutral sentiment, mins_since_news capped
+      - quote missing     -> last from candles, then Finnhub quote
+      - streamed ticker   -> quote (and candles + rolling indicators once
+                             enough bars) from the trade stream, no Tiingo
+                             call; spread estimated
+      - candles missing   -> r_1m/r_5m from the quote ring, rv20 floor
+      - earnings not in the calendar index -> earnings_soon False
+      - quote AND candles missing -> synthetic features with the error
+    """
+    live = os.getenv("LIVE_PROVIDERS") == "1"
 
     if not live:
         feats = _synthetic_feats()
         payload = {
             "features": feats,
-            "top_headline": top_headline,
-            "error": error,
+            "top_headline": None,
+            "error": None,
             "quote": {"last": 0.0, "bid": None, "ask": None, "quality": "unknown"},
             "ts": iso_now(),
         }
         return payload
 
+    # TTL cache (live only); concurrent misses for a ticker share one build
+    return get_or_build(ticker, lambda: _build_live(ticker, prefetched))
+
+def refresh_features(ticker: str) -> bool:
+    """Force a live rebuild of `ticker` into the cache (used by the prefetcher)."""
+    return refresh(ticker, lambda: _build_live(ticker))
+
+def _build_live(ticker: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    error: Optional[str] = None
+    top_headline: Optional[dict] = None
+    streamed = STREAM.inputs(ticker)
     try:
-        # ----- Headlines: Finnhub -> Yahoo fallback
-        headlines: List[dict] = []
-        try:
-            headlines = fetch_headlines(ticker, limit=5)
-        except FHError as e:
-            error = f"news: {e}"
-        if not headlines:
-            try:
-                headlines = fetch_headlines_yahoo(ticker, limit=5)
-            except Exception as e:
-                error = (error + f"; yahoo: {e}") if error else f"yahoo: {e}"
+        results, errors = _fetch_inputs(ticker, prefetched={**streamed, **(prefetched or {})})
+        notes = [_input_error(n, e) for n, e in errors.items()]
+
+        if "quote" in errors and "candles" in errors:
+            raise errors["quote"]
+
+        # ----- Headlines + Sentiment
+        news = results.get("news") or {}
+        headlines: List[dict] = news.get("headlines") or []
+        if news.get("error"):
+            notes.insert(0, news["error"])
         if headlines:
             top_headline = headlines[0]
-
-        # ----- Sentiment
-        sent_mean, sent_std = _sent_from_headlines(headlines)
+        sent_mean, sent_std = news.get("sent") or (0.0, 0.05)
 
         # ----- Quotes + Candles (Tiingo primary)
-        quote_ti = fetch_quote_tiingo(ticker)
-        candles  = fetch_candles_tiingo(ticker, lookback_minutes=120, freq="1min")
+        quote_ti = results.get("quote") or {}
+        candles: Bars = results.get("candles") or Bars.empty()
 
         last_px = float(quote_ti.get("last") or 0.0)
-        if last_px == 0.0 and candles:
-            last_px = float(candles[-1]["close"])
+        if last_px == 0.0 and len(candles):
+            last_px = float(candles.close[-1])
 
         bid_disp = float(quote_ti.get("bid") or 0.0) or None
         ask_disp = float(quote_ti.get("ask") or 0.0) or None
@@ -156,30 +317,29 @@ def build_features_for(ticker: str) -> Dict[str, Any]:
 
         # ----- mins since news (cap 240)
         mins_since_news = 9999
-        if headlines:
-            latest = max(_parse_iso_aware(h.get("ts","")) for h in headlines if h.get("ts"))
-            mins_since_news = int((datetime.now(timezone.utc) - latest).total_seconds() // 60)
+        stamps = [to_epoch(h.get("ts")) for h in headlines if h.get("ts")]
+        stamps = [s for s in stamps if s is not None]
+        if stamps:
+            mins_since_news = int((time.time() - max(stamps)) // 60)
         mins_since_news = min(int(mins_since_news), 240)
 
         # ----- Returns & rv20 with padding
-        if candles and len(candles) >= 2:
-            closes = [c["close"] for c in candles]
-            highs  = [c["high"]  for c in candles]
-            lows   = [c["low"]   for c in candles]
-            r_1m = ret_pct(closes, 1) if len(closes) >= 2 else _ret_from_ring(ticker, 1)
+        inds = results.get("indicators")   # batch: one vectorised pass; stream: rolling state
+        if inds:
+            r_1m, r_5m, rv20, above = inds["r_1m"], inds["r_5m"], inds["rv20"], inds["above_sma20"]
+        elif len(candles) >= 2:
+            closes = candles.close
+            r_1m = ret_pct(closes, 1)
             r_5m = ret_pct(closes, 5) if len(closes) >= 6 else _ret_from_ring(ticker, 5)
-            def _pad(series: list[float], n: int, pad_val: float) -> list[float]:
-                return series + [pad_val] * max(0, n - len(series))
-            series = closes[-120:] if closes else []
+            tail = candles[-120:]
+            series, hseg, lseg = tail.close, tail.high, tail.low
             if len(series) < 21:
-                pad_val = series[-1] if series else last_px
-                series = _pad(series, 21, pad_val)
-            else:
-                pad_val = series[-1]
-            hseg = (highs or [pad_val])[-len(series):]
-            lseg = (lows  or [pad_val])[-len(series):]
+                pad = np.full(21 - len(series), series[-1])
+                series = np.concatenate([series, pad])
+                hseg   = np.concatenate([hseg, pad])
+                lseg   = np.concatenate([lseg, pad])
             rv20 = atr_normalized(hseg, lseg, series, 20)
-            above = bool(series[-1] > sum(series[-20:]) / 20.0)
+            above = bool(series[-1] > series[-20:].mean())
         else:
             r_1m = _ret_from_ring(ticker, 1)
             r_5m = _ret_from_ring(ticker, 5)
@@ -188,22 +348,15 @@ def build_features_for(ticker: str) -> Dict[str, Any]:
 
         rv20 = float(min(max(rv20, 0.02), 0.80))
 
-        # ----- Earnings soon (≤14 days)
-        earnings_soon = False
-        try:
-            earn_iso = fetch_earnings_finnhub(ticker)
-            if earn_iso:
-                ed = _parse_iso_aware(earn_iso).date()
-                today = datetime.now(timezone.utc).date()
-                earnings_soon = 0 <= (ed - today).days <= 14
-        except FHError:
-            pass
+        # ----- Earnings soon (≤14 days); in-memory calendar lookup, no provider call
+        days = EARNINGS.days_until(ticker)
+        earnings_soon = days is not None and days <= 14
 
         # ----- Liquidity (IEX-friendly)
         spread_bps = abs(ask_disp - bid_disp) / last_px * 1e4 if last_px else 9999
-        if candles:
-            vol_1m = int(candles[-1]["volume"])
-            vol_5m = sum(int(c["volume"]) for c in candles[-5:])
+        if len(candles):
+            vol_1m = int(candles.volume[-1])
+            vol_5m = int(candles.volume[-5:].sum())
         else:
             vol_1m = 0; vol_5m = 0
         liquidity_flag = (spread_bps <= 30.0) or (vol_1m >= 1_000) or (vol_5m >= 5_000)
@@ -221,13 +374,13 @@ def build_features_for(ticker: str) -> Dict[str, Any]:
         payload = {
             "features": feats,
             "top_headline": top_headline,
-            "error": error,
+            "error": "; ".join(notes) or None,
             "quote": {"last": float(last_px), "bid": float(bid_disp), "ask": float(ask_disp), "quality": quality},
             "ts": iso_now(),
         }
 
-        # store to TTL cache
-        put_cached(ticker, payload)
+        # store to TTL cache; streamed tickers only briefly, the next build is I/O-free
+        put_cached(ticker, payload, ttl_s=STREAM_PAYLOAD_TTL_S if streamed else None)
         return payload
 
     except TiError as e:
@@ -242,5 +395,102 @@ def build_features_for(ticker: str) -> Dict[str, Any]:
         "quote": {"last": 0.0, "bid": None, "ask": None, "quality": "unknown"},
         "ts": iso_now(),
     }
-    put_cached(ticker, payload)
+    put_cached(ticker, payload, ttl_s=ERROR_TTL_S)
     return payload
+
+# ----- Batch (watchlist) builds
+# Quotes come from one multi-symbol IEX request per chunk and sentiment from
+# one POST for all tickers; headlines and candles are fetched per ticker
+# concurrently and the candle indicators are computed for all tickers in one
+# vectorised pass. Cached tickers are served without provider work.
+# Batch provider calls run on their own bounded pools, never on the
+# interactive fan-out pool, so a large watchlist cannot queue ahead of live
+# /api/features/v2 requests; at most BATCH_WORKERS tickers assemble at once.
+BATCH_WORKERS = int(os.getenv("CONTEXT_BATCH_WORKERS", "8"))
+BATCH_FETCH_WORKERS = int(os.getenv("CONTEXT_BATCH_FETCH_WORKERS", "16"))
+_BATCH_POOL = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="ctx-batch")
+_BATCH_FETCH_POOL = ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS, thread_name_prefix="ctx-batch-fetch")
+
+def _submit_each(fn: Callable[[str], Any], tickers: Sequence[str]) -> Dict[str, Future]:
+    # copy the caller's context so the governor sees its priority in the workers
+    return {t: _BATCH_FETCH_POOL.submit(contextvars.copy_context().run, fn, t) for t in tickers}
+
+def _await_each(futs: Dict[str, Future], t0: float, timeout_s: float) -> Dict[str, tuple[Any, Optional[BaseException]]]:
+    """{ticker: (result, None) | (None, error)}, waiting at most `timeout_s` from `t0` overall."""
+    out: Dict[str, tuple[Any, Optional[BaseException]]] = {}
+    for t, fut in futs.items():
+        try:
+            out[t] = fut.result(timeout=max(0.0, timeout_s - (time.monotonic() - t0))), None
+        except FutureTimeout:
+            fut.cancel()   # not started yet: free the slot for the rest of the batch
+            out[t] = None, TimeoutError(f"timed out after {timeout_s:g}s")
+        except Exception as e:
+            out[t] = None, e
+    return out
+
+def _indicators_batch(bars: Dict[str, Bars]) -> Dict[str, Dict[str, Any]]:
+    """r_1m / r_5m / rv20 / above_sma20 for every ticker with 21+ bars in one vectorised pass.
+    Only the last 21 bars enter these indicators, so the values equal _build_live's per-ticker ones."""
+    full = [t for t, b in bars.items() if len(b) >= 21]
+    if not full:
+        return {}
+    tails = [bars[t][-21:] for t in full]
+    H = np.stack([b.high for b in tails]); L = np.stack([b.low for b in tails]); C = np.stack([b.close for b in tails])
+    r1, r5 = ret_pct_batch(C, 1), ret_pct_batch(C, 5)
+    rv = atr_normalized_batch(H, L, C, 20)
+    above = C[:, -1] > sma_batch(C, 20)
+    return {t: {"r_1m": float(r1[i]), "r_5m": float(r5[i]), "rv20": float(rv[i]), "above_sma20": bool(above[i])}
+            for i, t in enumerate(full)}
+
+def build_features_batch(tickers: Sequence[str]) -> Iterator[tuple[str, Dict[str, Any]]]:
+    """Yield (ticker, bundle) for each distinct ticker, in completion order."""
+    uniq = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))
+    live = os.getenv("LIVE_PROVIDERS") == "1"
+    misses: List[str] = []
+    for t in uniq:
+        cached = get_cached(t) if live else None
+        if cached:
+            yield t, cached
+        elif not live:
+            yield t, build_features_for(t)
+        else:
+            misses.append(t)
+    if not misses:
+        return
+
+    quotes: Dict[str, Any] = {}
+    polled = [t for t in misses if not STREAM.live(t)]
+    try:
+        if polled:
+            quotes = fetch_quotes_tiingo(polled)
+    except Exception:
+        pass  # per-ticker fan-out fetches the quote itself
+
+    # headlines and candles start together and share the per-ticker fan-out
+    # deadlines; a stalled provider leaves that ticker without the input
+    # instead of holding the batch (candles it misses are retried by the fan-out)
+    t0 = time.monotonic()
+    bar_tickers = [t for t in misses if "candles" not in STREAM.inputs(t)]
+    head_futs = _submit_each(_fetch_headlines_any, misses)
+    bar_futs = _submit_each(lambda t: fetch_candles_tiingo(t, lookback_minutes=120, freq="1min"), bar_tickers)
+    heads: Dict[str, tuple[List[dict], Optional[str]]] = {}
+    for t, (res, e) in _await_each(head_futs, t0, INPUT_TIMEOUTS_S["news"]).items():
+        heads[t] = res if e is None else ([], _input_error("news", e))
+    bars = {t: res for t, (res, e) in _await_each(bar_futs, t0, INPUT_TIMEOUTS_S["candles"]).items() if e is None}
+    sents = _sent_batch({t: h for t, (h, _) in heads.items()})
+    inds = _indicators_batch(bars)
+
+    def one(t: str) -> tuple[str, Dict[str, Any]]:
+        _fanout_pool.set(_BATCH_FETCH_POOL)   # inputs still missing are fetched off the interactive pool
+        headlines, err = heads[t]
+        pre: Dict[str, Any] = {"news": {"headlines": headlines, "sent": sents[t], "error": err}}
+        if t in quotes:
+            pre["quote"] = quotes[t]
+        if t in bars:
+            pre["candles"] = bars[t]
+        if t in inds:
+            pre["indicators"] = inds[t]
+        return t, build_features_for(t, prefetched=pre)
+
+    for fut in as_completed([_BATCH_POOL.submit(contextvars.copy_context().run, one, t) for t in misses]):
+        yield fut.result()
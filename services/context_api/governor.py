@@ -0,0 +1,182 @@
+from __future__ import annotations
+import os, time, threading, contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# --------------------------------------------------------------------
+# Provider governor: token buckets per provider (and optionally per
+# endpoint) plus a circuit breaker per provider. Every governed upstream
+# call goes through acquire() before it is sent and record() after, so
+# quota exhaustion and repeated 429/5xx responses turn into fast local
+# rejections instead of more upstream traffic.
+# --------------------------------------------------------------------
+
+INTERACTIVE = "interactive"
+PREFETCH = "prefetch"
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("provider_priority", default=INTERACTIVE)
+
+@contextmanager
+def priority(level: str):
+    """Run the enclosed provider calls at `level` (INTERACTIVE or PREFETCH)."""
+    tok = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(tok)
+
+def current_priority() -> str:
+    return _priority.get()
+
+def _parse_limits(s: str, defaults: Dict[str, float]) -> Dict[str, float]:
+    out = dict(defaults)
+    for part in s.split(","):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            try:
+                out[k.strip().lower()] = float(v)
+            except ValueError:
+                pass
+    return out
+
+# requests/minute per provider; per-endpoint buckets are opt-in ("finnhub:/quote=30")
+LIMITS = _parse_limits(os.getenv("PROVIDER_LIMITS", ""), {"finnhub": 60.0, "tiingo": 500.0, "yahoo": 60.0})
+ENDPOINT_LIMITS = _parse_limits(os.getenv("PROVIDER_ENDPOINT_LIMITS", ""), {})
+# share of each bucket held back for interactive calls; prefetch cannot dip below it
+RESERVE = float(os.getenv("PROVIDER_INTERACTIVE_RESERVE", "0.3"))
+
+BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_S = float(os.getenv("PROVIDER_BREAKER_COOLDOWN_S", "30"))
+
+class Throttled(RuntimeError):
+    """Raised instead of sending a request the governor will not allow."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} {reason}")
+        self.provider = provider
+        self.reason = reason
+
+class TokenBucket:
+    def __init__(self, per_min: float):
+        self.capacity = max(1.0, per_min)
+        self.rate = per_min / 60.0
+        self.tokens = self.capacity
+        self.t = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate)
+        self.t = now
+
+    def can_take(self, level: str, n: float = 1.0) -> bool:
+        self._refill()
+        floor = self.capacity * RESERVE if level == PREFETCH else 0.0
+        return self.tokens - n >= floor
+
+    def take(self, n: float = 1.0) -> None:
+        self.tokens -= n
+
+    def remaining(self) -> float:
+        self._refill()
+        return self.tokens
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after cooldown (one probe) -> closed."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S):
+        self.threshold = failures
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_for = cooldown_s
+        self.opens = 0
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.open_for:
+                return False
+            self.state, self.probing = "half_open", False
+        if self.state == "half_open":
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    def success(self) -> None:
+        self.state, self.failures, self.probing = "closed", 0, False
+
+    def failure(self, retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.open_for = max(self.cooldown_s, retry_after or 0.0)
+            self.probing = False
+            self.opens += 1
+
+class Governor:
+    def __init__(self, limits: Dict[str, float] = LIMITS, endpoint_limits: Dict[str, float] = ENDPOINT_LIMITS):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {p: TokenBucket(n) for p, n in limits.items()}
+        self._endpoint_buckets: Dict[str, TokenBucket] = {k: TokenBucket(n) for k, n in endpoint_limits.items()}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def _count(self, provider: str, what: str) -> None:
+        k = (provider, what)
+        self._counts[k] = self._counts.get(k, 0) + 1
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        br = self._breakers.get(provider)
+        if br is None:
+            br = self._breakers[provider] = CircuitBreaker()
+        return br
+
+    def acquire(self, provider: str, endpoint: str = "") -> None:
+        """Admit one call or raise Throttled. Interactive calls may use the reserve."""
+        level = current_priority()
+        with self._lock:
+            if not self._breaker(provider).allow():
+                self._count(provider, "rejected_open")
+                raise Throttled(provider, "circuit open")
+            buckets = [b for b in (self._endpoint_buckets.get(f"{provider}:{endpoint}"),
+                                    self._buckets.get(provider)) if b is not None]
+            if not all(b.can_take(level) for b in buckets):
+                self._count(provider, f"rejected_budget_{level}")
+                self._breaker(provider).probing = False
+                raise Throttled(provider, f"budget exhausted ({level})")
+            for b in buckets:
+                b.take()
+            self._count(provider, f"admitted_{level}")
+
+    def record(self, provider: str, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """Report the outcome: an HTTP status, or None for a transport error."""
+        with self._lock:
+            br = self._breaker(provider)
+            if status is None or status == 429 or status >= 500:
+                self._count(provider, f"failure_{status or 'error'}")
+                br.failure(retry_after if status == 429 else None)
+            else:
+                br.success()
+
+    def stats(self) -> dict:
+        with self._lock:
+            providers = set(self._buckets) | set(self._breakers) | {p for p, _ in self._counts}
+            out = {}
+            for p in sorted(providers):
+                b = self._buckets.get(p)
+                br = self._breakers.get(p)
+                out[p] = {
+                    "budget_remaining": round(b.remaining(), 1) if b else None,
+                    "budget_per_min": b.capacity if b else None,
+                    "circuit": br.state if br else "closed",
+                    "consecutive_failures": br.failures if br else 0,
+                    "circuit_opens": br.opens if br else 0,
+                    **{what: n for (pp, what), n in self._counts.items() if pp == p},
+                }
+            eps = {k: round(b.remaining(), 1) for k, b in self._endpoint_buckets.items()}
+        return {"providers": out, "endpoints": eps, "interactive_reserve": RESERVE}
+
+GOVERNOR = Governor()
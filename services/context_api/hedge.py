@@ -0,0 +1,112 @@
+from __future__ import annotations
+import contextvars, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# --------------------------------------------------------------------
+# Hedged requests: start the primary call; if it has not answered within
+# the p-th percentile of its own recent latencies, start the secondary as
+# well and take whichever usable result arrives first. A primary that fails
+# or comes back empty starts the secondary immediately (plain fallback).
+# --------------------------------------------------------------------
+
+class Hedge:
+    def __init__(self, name: str, pctl: float = 90.0, min_delay_s: float = 0.05,
+                 default_delay_s: float = 0.5, window: int = 200, min_samples: int = 20,
+                 workers: int = 8):
+        self.name = name
+        self.pctl = pctl
+        self.min_delay_s = min_delay_s
+        self.default_delay_s = default_delay_s
+        self.min_samples = min_samples
+        self._lat: Deque[float] = deque(maxlen=window)   # primary latencies (successful calls)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"hedge-{name}")
+        self._stats = {"requests": 0, "hedged": 0, "fallback": 0,
+                       "primary_wins": 0, "secondary_wins": 0, "no_result": 0,
+                       "primary_errors": 0, "secondary_errors": 0}
+
+    def delay_s(self) -> float:
+        """Current hedge delay: the pctl-th primary latency (default until enough samples)."""
+        with self._lock:
+            lat = sorted(self._lat)
+        if len(lat) < self.min_samples:
+            return self.default_delay_s
+        k = min(len(lat) - 1, int(len(lat) * self.pctl / 100.0))
+        return max(self.min_delay_s, lat[k])
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        return self._pool.submit(contextvars.copy_context().run, fn)
+
+    def _bump(self, what: str) -> None:
+        with self._lock:
+            self._stats[what] += 1
+
+    def run(self, primary: Callable[[], Any], secondary: Callable[[], Any],
+            usable: Callable[[Any], bool] = bool
+            ) -> Tuple[Optional[str], Dict[str, Any], Dict[str, BaseException]]:
+        """
+        Returns (winner, results, errors). `winner` is "primary", "secondary" or
+        None; `results` holds every usable result finished by the time the
+        winner is known (so a near-tie yields both), `errors` every failure.
+        """
+        self._bump("requests")
+        t0 = time.monotonic()
+        futs: Dict[str, Future] = {"primary": self._submit(primary)}
+
+        def _timed(f: Future) -> None:
+            if f.exception() is None:
+                with self._lock:
+                    self._lat.append(time.monotonic() - t0)
+        futs["primary"].add_done_callback(_timed)
+
+        done, _ = wait([futs["primary"]], timeout=self.delay_s())
+        if not done:
+            self._bump("hedged")
+            futs["secondary"] = self._submit(secondary)
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        winner: Optional[str] = None
+        pending = dict(futs)
+        while pending:
+            done, _ = wait(list(pending.values()), return_when=FIRST_COMPLETED)
+            for name in [n for n, f in pending.items() if f in done]:
+                f = pending.pop(name)
+                e = f.exception()
+                if e is not None:
+                    errors[name] = e
+                    self._bump(f"{name}_errors")
+                elif usable(f.result()):
+                    results[name] = f.result()
+                    if winner is None:
+                        winner = name
+            if winner is not None:
+                # pick up a leg that finished in the same instant, never wait for it;
+                # a loser that fails later is only counted in stats()
+                for name, f in pending.items():
+                    if f.done() and f.exception() is None and usable(f.result()):
+                        results[name] = f.result()
+                    elif not f.done():
+                        f.add_done_callback(lambda f, n=name: f.exception() is not None and self._bump(f"{n}_errors"))
+                break
+            if "secondary" not in futs:
+                self._bump("fallback")
+                futs["secondary"] = pending["secondary"] = self._submit(secondary)
+
+        self._bump(f"{winner}_wins" if winner else "no_result")
+        return winner, results, errors
+
+    def stats(self) -> dict:
+        with self._lock:
+            st = dict(self._stats)
+            n = len(self._lat)
+        wins = st["primary_wins"] + st["secondary_wins"]
+        return {
+            **st,
+            "secondary_win_rate": round(st["secondary_wins"] / wins, 3) if wins else 0.0,
+            "delay_s": round(self.delay_s(), 3),
+            "pctl": self.pctl,
+            "samples": n,
+        }
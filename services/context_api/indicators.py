@@ -14,8 +14,10 @@ def true_range(high: float, low: float, prev_close: float) -> float:
 def atr_normalized(highs: Sequence[float], lows: Sequence[float], closes: Sequence[float], window: int = 20) -> float:
     if len(highs) < window + 1 or len(lows) < window + 1 or len(closes) < window + 1:
         raise ValueError("not enough data for ATR")
-    trs = [true_range(h, l, pc) for h, l, pc in zip(highs[-window:], lows[-window:], closes[-window-1:-1])]
-    atr = float(np.mean(trs))
+    h = np.asarray(highs[-window:], dtype=float)
+    l = np.asarray(lows[-window:], dtype=float)
+    pc = np.asarray(closes[-window-1:-1], dtype=float)
+    atr = float(np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc))).mean())
     last = float(closes[-1])
     return float(atr / last) if last else 0.0
 
@@ -27,3 +29,129 @@ def ret_pct(closes: Sequence[float], delta: int) -> float:
 
 def above_sma20(closes: Sequence[float]) -> bool:
     return float(closes[-1]) > sma(closes, 20)
+
+# --------------------------------------------------------------------
+# Batched API: 2-D inputs shaped (tickers, bars), oldest bar first.
+# One call computes the indicator for every row; results are shape (tickers,).
+# Used by the batch (watchlist) build in features.py.
+# --------------------------------------------------------------------
+
+def _as_matrix(a) -> np.ndarray:
+    m = np.asarray(a, dtype=float)
+    return m.reshape(1, -1) if m.ndim == 1 else m
+
+def sma_batch(values, window: int) -> np.ndarray:
+    v = _as_matrix(values)
+    if v.shape[1] < window:
+        raise ValueError("not enough data for SMA")
+    return v[:, -window:].mean(axis=1)
+
+def atr_normalized_batch(highs, lows, closes, window: int = 20) -> np.ndarray:
+    h, l, c = _as_matrix(highs), _as_matrix(lows), _as_matrix(closes)
+    if min(h.shape[1], l.shape[1], c.shape[1]) < window + 1:
+        raise ValueError("not enough data for ATR")
+    hw, lw, pc = h[:, -window:], l[:, -window:], c[:, -window-1:-1]
+    atr = np.maximum(hw - lw, np.maximum(np.abs(hw - pc), np.abs(lw - pc))).mean(axis=1)
+    last = c[:, -1]
+    return np.divide(atr, last, out=np.zeros_like(atr), where=last != 0)
+
+def ret_pct_batch(closes, delta: int) -> np.ndarray:
+    c = _as_matrix(closes)
+    if c.shape[1] <= delta:
+        raise ValueError("not enough data for return")
+    c0, c1 = c[:, -delta-1], c[:, -1]
+    return np.divide(c1 - c0, c0, out=np.zeros_like(c0), where=c0 != 0)
+
+# --------------------------------------------------------------------
+# Incremental API: O(1) work per bar for one ticker. `append` adds a closed
+# or new bar; `update_last` rewrites the bar that is still forming.
+# --------------------------------------------------------------------
+
+class RollingIndicators:
+    """
+    Rolling rv20 (ATR/last), SMA20 and short returns kept bar by bar.
+    Matches atr_normalized / sma / ret_pct over the same trailing bars.
+    Running sums are rebuilt from the rings every `resync` appends to bound
+    floating-point drift.
+    """
+
+    def __init__(self, window: int = 20, max_delta: int = 5, resync: int = 1024):
+        self.window = window
+        self._ncl = max(window + 1, max_delta + 1)
+        self._closes = np.zeros(self._ncl, dtype=float)   # ring of recent closes, bar i at i % _ncl
+        self._trs = np.zeros(window, dtype=float)          # ring of true ranges, bar i (>= 1) at i % window
+        self._n = 0                                        # bars seen
+        self._sum_c = 0.0                                  # closes of the last `window` bars
+        self._sum_tr = 0.0                                 # TRs of the last `window` bars (bar 0 has none)
+        self._resync = resync
+
+    def _close(self, i: int) -> float:
+        return float(self._closes[i % self._ncl])
+
+    def append(self, high: float, low: float, close: float) -> None:
+        i = self._n
+        if i:
+            pc = self._close(i - 1)
+            tr = max(high - low, abs(high - pc), abs(low - pc))
+            k = i % self.window
+            if i - self.window >= 1:
+                self._sum_tr -= self._trs[k]
+            self._trs[k] = tr
+            self._sum_tr += tr
+        if i >= self.window:
+            self._sum_c -= self._close(i - self.window)
+        self._closes[i % self._ncl] = close
+        self._sum_c += close
+        self._n += 1
+        if self._n % self._resync == 0:
+            self._rebuild_sums()
+
+    def update_last(self, high: float, low: float, close: float) -> None:
+        """Replace the newest bar (its minute is still forming)."""
+        if not self._n:
+            return self.append(high, low, close)
+        i = self._n - 1
+        self._sum_c += close - self._close(i)
+        self._closes[i % self._ncl] = close
+        if i:
+            pc = self._close(i - 1)
+            tr = max(high - low, abs(high - pc), abs(low - pc))
+            k = i % self.window
+            self._sum_tr += tr - self._trs[k]
+            self._trs[k] = tr
+
+    def _rebuild_sums(self) -> None:
+        n = self._n
+        self._sum_c = float(sum(self._close(i) for i in range(max(0, n - self.window), n)))
+        self._sum_tr = float(sum(self._trs[i % self.window] for i in range(max(1, n - self.window), n)))
+
+    @property
+    def count(self) -> int:
+        return self._n
+
+    @property
+    def last(self) -> float:
+        return self._close(self._n - 1) if self._n else 0.0
+
+    @property
+    def sma20(self) -> float:
+        if self._n < self.window:
+            raise ValueError("not enough data for SMA")
+        return self._sum_c / self.window
+
+    @property
+    def rv20(self) -> float:
+        if self._n < self.window + 1:
+            raise ValueError("not enough data for ATR")
+        last = self.last
+        return (self._sum_tr / self.window) / last if last else 0.0
+
+    def ret(self, delta: int) -> float:
+        if self._n <= delta or delta >= self._ncl:
+            raise ValueError("not enough data for return")
+        c0, c1 = self._close(self._n - 1 - delta), self.last
+        return (c1 - c0) / c0 if c0 else 0.0
+
+    @property
+    def above_sma20(self) -> bool:
+        return self.last > self.sma20
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import os, time, threading, logging
+from collections import Counter
+from typing import Dict, List, Optional
+
+from . import cache, governor
+from .features import refresh_features
+
+# --------------------------------------------------------------------
+# Background watchlist prefetch. Keeps the configured watchlist plus the
+# most-requested tickers warm by rebuilding each one shortly before its
+# cached payload expires, within a per-provider request budget so the
+# interactive /api/features/v2 path keeps its share of provider quota.
+# --------------------------------------------------------------------
+
+log = logging.getLogger("context_api.prefetch")
+
+ENABLED  = os.getenv("CONTEXT_PREFETCH", "0") == "1"
+WATCHLIST = [t.strip().upper() for t in os.getenv("CONTEXT_WATCHLIST", "").split(",") if t.strip()]
+TOP_N    = int(os.getenv("CONTEXT_PREFETCH_TOP_N", "20"))      # learned: most-requested tickers
+TICK_S   = float(os.getenv("CONTEXT_PREFETCH_TICK_S", "2"))
+LEAD_S   = float(os.getenv("CONTEXT_PREFETCH_LEAD_S", "10"))   # refresh this long before TTL expiry
+DECAY_S  = float(os.getenv("CONTEXT_PREFETCH_DECAY_S", "1800"))  # halve request counts this often
+
+# Provider calls one feature build may cost, and the per-minute share of each
+# provider's quota the prefetcher may spend ("finnhub=30,tiingo=60,sentiment=120").
+BUILD_COST: Dict[str, int] = {"finnhub": 1, "tiingo": 2, "sentiment": 1}
+
+def _parse_budget(s: str) -> Dict[str, float]:
+    out = {"finnhub": 30.0, "tiingo": 60.0, "sentiment": 120.0}
+    for part in s.split(","):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            try:
+                out[k.strip().lower()] = float(v)
+            except ValueError:
+                pass
+    return out
+
+BUDGET_PER_MIN = _parse_budget(os.getenv("CONTEXT_PREFETCH_BUDGET", ""))
+
+class Prefetcher:
+    def __init__(self, watchlist: List[str] = WATCHLIST, top_n: int = TOP_N,
+                 budget_per_min: Dict[str, float] = BUDGET_PER_MIN):
+        self.watchlist = list(dict.fromkeys(watchlist))
+        self.top_n = top_n
+        # the prefetcher's own share, so no interactive reserve applies inside it
+        self.budget = {k: governor.TokenBucket(v) for k, v in budget_per_min.items()}
+        self._demand: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_decay = time.monotonic()
+        self._stats = {"refreshed": 0, "skipped_budget": 0, "skipped_inflight": 0, "errors": 0}
+
+    # ----- demand tracking (learned watchlist)
+    def note_request(self, ticker: str) -> None:
+        t = (ticker or "").upper().strip()
+        if not t:
+            return
+        with self._lock:
+            self._demand[t] += 1
+            if len(self._demand) > 4096:
+                for k, _ in self._demand.most_common()[2048:]:
+                    del self._demand[k]
+
+    def _decay(self) -> None:
+        if time.monotonic() - self._last_decay < DECAY_S:
+            return
+        self._last_decay = time.monotonic()
+        with self._lock:
+            self._demand = Counter({k: v // 2 for k, v in self._demand.items() if v // 2})
+
+    def targets(self) -> List[str]:
+        with self._lock:
+            learned = [t for t, _ in self._demand.most_common(self.top_n)]
+        return list(dict.fromkeys(self.watchlist + learned))
+
+    # ----- scheduling
+    def due(self) -> List[str]:
+        """Targets whose payload is missing or within LEAD_S of expiry: stalest first, then most requested."""
+        with self._lock:
+            demand = dict(self._demand)
+        rows = []
+        for t in self.targets():
+            age = cache.age_of(t)
+            if age is None or age >= cache.TTL_S - LEAD_S:
+                rows.append((-(age if age is not None else 1e9), -demand.get(t, 0), t))
+        rows.sort(key=lambda r: r[:2])   # stable: ties keep target order
+        return [t for _, _, t in rows]
+
+    def _take_budget(self, cost: Dict[str, int]) -> bool:
+        buckets = [(self.budget.get(k), n) for k, n in cost.items()]
+        if any(b is None or not b.can_take(governor.INTERACTIVE, n) for b, n in buckets):
+            return False
+        for b, n in buckets:
+            b.take(n)
+        return True
+
+    def tick(self) -> int:
+        self._decay()
+        n = 0
+        for t in self.due():
+            if not self._take_budget(BUILD_COST):
+                self._stats["skipped_budget"] += 1
+                break
+            try:
+                with governor.priority(governor.PREFETCH):
+                    ok = refresh_features(t)
+                if ok:
+                    self._stats["refreshed"] += 1
+                    n += 1
+                else:
+                    self._stats["skipped_inflight"] += 1
+            except Exception:
+                self._stats["errors"] += 1
+                log.exception("prefetch failed for %s", t)
+        return n
+
+    def _run(self) -> None:
+        while not self._stop.wait(TICK_S):
+            try:
+                self.tick()
+            except Exception:
+                log.exception("prefetch tick failed")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ctx-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "enabled": bool(self._thread and self._thread.is_alive()),
+            "targets": self.targets(),
+            "budget_remaining": {k: round(b.remaining(), 1) for k, b in self.budget.items()},
+        }
+
+PREFETCHER = Prefetcher()
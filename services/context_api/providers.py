@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import TypedDict, Optional, List
+from datetime import datetime, timezone
+from typing import TypedDict, Optional, List, Sequence
+import numpy as np
 
 class Headline(TypedDict):
     title: str
@@ -15,6 +17,46 @@ class Candle(TypedDict):
     close: float
     volume: int
 
+class Bars:
+    """
+    Columnar OHLCV candles: `ts` is int64 epoch seconds (UTC), the price and
+    volume columns are float64, all the same length and oldest first.
+    Slicing returns Bars over the same rows (numpy views).
+    """
+    __slots__ = ("ts", "open", "high", "low", "close", "volume")
+
+    def __init__(self, ts: Sequence[int], open: Sequence[float], high: Sequence[float],
+                 low: Sequence[float], close: Sequence[float], volume: Sequence[float]):
+        self.ts     = np.asarray(ts, dtype=np.int64)
+        self.open   = np.asarray(open, dtype=np.float64)
+        self.high   = np.asarray(high, dtype=np.float64)
+        self.low    = np.asarray(low, dtype=np.float64)
+        self.close  = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        return cls([], [], [], [], [], [])
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    def __getitem__(self, idx: slice) -> "Bars":
+        if not isinstance(idx, slice):
+            raise TypeError("Bars supports slicing only; index the columns for scalars")
+        return Bars(self.ts[idx], self.open[idx], self.high[idx], self.low[idx], self.close[idx], self.volume[idx])
+
+    def to_dicts(self) -> List[Candle]:
+        out: List[Candle] = []
+        for i in range(len(self)):
+            ts = datetime.fromtimestamp(int(self.ts[i]), tz=timezone.utc)
+            out.append({
+                "ts": ts.isoformat(timespec="seconds").replace("+00:00", "Z"),
+                "open": float(self.open[i]), "high": float(self.high[i]), "low": float(self.low[i]),
+                "close": float(self.close[i]), "volume": int(self.volume[i]),
+            })
+        return out
+
 class Quote(TypedDict):
     last: float
     bid: float
@@ -22,6 +64,6 @@ class Quote(TypedDict):
     ts: str
 
 def fetch_headlines(ticker: str, limit: int = 3) -> List[Headline]: ...
-def fetch_candles(ticker: str, interval: str = "1m", lookback: int = 120) -> List[Candle]: ...
+def fetch_candles(ticker: str, interval: str = "1m", lookback: int = 120) -> Bars: ...
 def fetch_quote(ticker: str) -> Quote: ...
 def fetch_earnings_date(ticker: str) -> Optional[str]: ...
@@ -1,24 +1,30 @@
 from __future__ import annotations
-import os, datetime as dt
-from typing import List
-import requests
-from .providers import Candle, Quote
+import os, time, datetime as dt
+from typing import List, Dict
+from .providers import Bars, Quote
 from .cache import ttl_cache
+from .candles import CandleStore, Row
+from . import transport
+from .governor import Throttled
+from services.common.timeutil import iso_z, to_epoch
 
 TIINGO_TOKEN = os.getenv("TIINGO_TOKEN")
-IEX_BASE = "https://api.tiingo.com/iex"
+IEX_BASE = os.getenv("TIINGO_BASE_URL", "https://api.tiingo.com").rstrip("/") + "/iex"
 
 class TiError(RuntimeError):
     def __init__(self, msg: str, status: int | None = None):
         super().__init__(msg)
         self.status = status
 
-def _get(url: str, params: dict) -> dict | list:
+def _get(url: str, params: dict, endpoint: str = "iex") -> dict | list:
     if not TIINGO_TOKEN:
         throw = TiError("TIINGO_TOKEN not set", None)
         raise throw
     params = {**params, "token": TIINGO_TOKEN}
-    r = requests.get(url, params=params, timeout=8)
+    try:
+        r = transport.get(url, params=params, timeout=8.0, provider="tiingo", endpoint=endpoint)
+    except Throttled as e:
+        raise TiError(str(e), 429) from e
     if r.status_code >= 400:
         try:
             detail = r.json()
@@ -46,79 +52,74 @@ def _i(x, default: int = 0) -> int:
     except Exception:
         return default
 
-def _parse_iso_aware(s: str) -> dt.datetime:
-    if not s:
-        return dt.datetime.now(dt.timezone.utc)
-    s2 = s.replace("Z", "+00:00")
-    try:
-        d = dt.datetime.fromisoformat(s2)
-    except Exception:
-        return dt.datetime.now(dt.timezone.utc)
-    if d.tzinfo is None:
-        d = d.replace(tzinfo=dt.timezone.utc)
-    return d.astimezone(dt.timezone.utc)
+IEX_BATCH_MAX = int(os.getenv("TIINGO_IEX_BATCH_MAX", "100"))
 
-@ttl_cache(ttl_seconds=2)
-def fetch_quote_tiingo(ticker: str) -> Quote:
-    data = _get(f"{IEX_BASE}/{ticker}", {})
-    row = data[0] if isinstance(data, list) and data else (data if isinstance(data, dict) else {})
+def _quote_from_row(row: dict) -> Quote:
     last = _f(row.get("last", row.get("close", row.get("tngoLast"))), 0.0)
     bid  = _f(row.get("bidPrice", row.get("bid")), 0.0)
     ask  = _f(row.get("askPrice", row.get("ask")), 0.0)
 
-    ts_raw = row.get("timestamp") or row.get("date") or ""
-    ts_dt  = _parse_iso_aware(ts_raw)
-    ts     = ts_dt.isoformat(timespec="seconds").replace("+00:00", "Z")
+    ts = iso_z(to_epoch(row.get("timestamp") or row.get("date"), default=int(time.time())))
 
     return {"last": last, "bid": bid, "ask": ask, "ts": ts}
 
+@ttl_cache(ttl_seconds=2)
+def fetch_quote_tiingo(ticker: str) -> Quote:
+    data = _get(f"{IEX_BASE}/{ticker}", {})
+    row = data[0] if isinstance(data, list) and data else (data if isinstance(data, dict) else {})
+    return _quote_from_row(row)
+
+def fetch_quotes_tiingo(tickers: List[str]) -> Dict[str, Quote]:
+    """
+    Multi-symbol IEX top-of-book:
+    GET https://api.tiingo.com/iex?tickers=a,b,c
+    One request per IEX_BATCH_MAX symbols; symbols missing from the reply are omitted.
+    """
+    syms = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))
+    out: Dict[str, Quote] = {}
+    for i in range(0, len(syms), IEX_BATCH_MAX):
+        chunk = syms[i:i + IEX_BATCH_MAX]
+        data = _get(IEX_BASE, {"tickers": ",".join(chunk)})
+        for row in data if isinstance(data, list) else []:
+            sym = str(row.get("ticker") or "").upper()
+            if sym:
+                out[sym] = _quote_from_row(row)
+    return out
+
+CANDLES = CandleStore("tiingo.candles")
+
+def _candle_from_row(row: dict) -> Row:
+    return (
+        to_epoch(row.get("date"), default=int(time.time())),
+        _f(row.get("open"), 0.0),
+        _f(row.get("high"), 0.0),
+        _f(row.get("low"), 0.0),
+        _f(row.get("close"), 0.0),
+        float(_i(row.get("volume"), 0)),
+    )
+
 @ttl_cache(ttl_seconds=60)
-def fetch_candles_tiingo(ticker: str, lookback_minutes: int = 120, freq: str = "1min") -> List[Candle]:
+def fetch_candles_tiingo(ticker: str, lookback_minutes: int = 120, freq: str = "1min") -> Bars:
     """
     IEX intraday minute bars:
     GET https://api.tiingo.com/iex/{ticker}/prices?startDate=YYYY-MM-DD&resampleFreq=1min&columns=open,high,low,close,volume,date
+    Returns columnar Bars. Bars are kept in CANDLES; once a ticker has history, startDate is the day of
+    its last stored bar (IEX only takes a date) and only rows newer than that bar
+    are parsed and merged. The window is then served from the store.
     Relaxed strategy: if 'recent' filtering yields too few bars (closed market),
     fall back to the latest N bars regardless of timestamp.
     """
-    start_date = (dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=1)).date().isoformat()
+    last = CANDLES.last_ts(ticker, freq)
+    if last:
+        start_date = dt.datetime.fromtimestamp(last, dt.timezone.utc).date().isoformat()
+    else:
+        start_date = (dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=1)).date().isoformat()
     params = {
         "startDate": start_date,
         "resampleFreq": freq,
         "columns": "open,high,low,close,volume,date",
     }
-    data = _get(f"{IEX_BASE}/{ticker}/prices", params)
-    if not isinstance(data, list) or not data:
-        return []
-
-    # First pass: try to keep only last ~lookback_minutes worth by UTC time
-    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=lookback_minutes + 5)
-    filtered: List[Candle] = []
-    for row in data:
-        ts_raw = row.get("date", "")
-        dt_ts = _parse_iso_aware(ts_raw)
-        if dt_ts < cutoff:
-            continue
-        iso = dt_ts.isoformat(timespec="seconds").replace("+00:00", "Z")
-        o = _f(row.get("open"), 0.0)
-        h = _f(row.get("high"), 0.0)
-        l = _f(row.get("low"), 0.0)
-        c = _f(row.get("close"), 0.0)
-        v = _i(row.get("volume"), 0)
-        filtered.append({"ts": iso, "open": o, "high": h, "low": l, "close": c, "volume": v})
-
-    # If we got too few bars (e.g., market closed), fall back to last N bars unfiltered
-    if len(filtered) < 6:
-        fallback: List[Candle] = []
-        for row in data[-max(60, lookback_minutes):]:
-            ts_raw = row.get("date", "")
-            dt_ts = _parse_iso_aware(ts_raw)
-            iso = dt_ts.isoformat(timespec="seconds").replace("+00:00", "Z")
-            o = _f(row.get("open"), 0.0)
-            h = _f(row.get("high"), 0.0)
-            l = _f(row.get("low"), 0.0)
-            c = _f(row.get("close"), 0.0)
-            v = _i(row.get("volume"), 0)
-            fallback.append({"ts": iso, "open": o, "high": h, "low": l, "close": c, "volume": v})
-        return fallback
-
-    return filtered
+    data = _get(f"{IEX_BASE}/{ticker}/prices", params, endpoint="iex/prices")
+    if isinstance(data, list) and data:
+        CANDLES.merge(ticker, freq, data, _candle_from_row)
+    return CANDLES.window(ticker, freq, lookback_minutes)
@@ -1,64 +1,68 @@
 from __future__ import annotations
-import time, re
-from typing import List, Dict, Tuple
-import requests, feedparser
+import os, threading
+from typing import List, Dict, Iterable
+from . import transport
+from .rss import parse_entries
+from .relevance import score_title
+from .dedupe import collapse
+from services.common.bounded_cache import BoundedCache
 
-TTL_S = 90.0
-_cache: dict[Tuple[str, int], Tuple[float, List[Dict[str, str]]]] = {}
+RSS_URL = os.getenv("YAHOO_RSS_URL", "https://finance.yahoo.com/rss/headline")
+TTL_S = float(os.getenv("YAHOO_TTL_S", "90"))
+# ticker -> parsed feed entries [{title, link, published, summary}]; one download
+# per ticker per TTL, shared by fetch_headlines_yahoo, news.merge_rank_headlines
+# and backend/fetch_articles.py, which filter and score locally
+_feeds = BoundedCache("yahoo.feed", max_entries=1024, ttl_s=TTL_S)
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
 
-def _aliases_for(t: str) -> list[str]:
-    t = t.upper()
-    table = {
-        "NVDA": ["NVIDIA", "Nvidia"],
-        "AMD":  ["Advanced Micro Devices", "AMD"],
-        "AAPL": ["Apple"],
-        "MSFT": ["Microsoft"],
-        "TSLA": ["Tesla"],
-        "BAC":  ["Bank of America"],
-        "QQQ":  ["Invesco QQQ", "Nasdaq-100", "Nasdaq 100"],
-        "MSTR": ["MicroStrategy"],
-        "TSMC": ["TSMC", "Taiwan Semiconductor", "Taiwan Semi"],
-        "META": ["Meta", "Facebook"],
-        "GOOGL":["Alphabet", "Google"],
-    }
-    return list(dict.fromkeys([t] + table.get(t, [])))
+def _lock_for(t: str) -> threading.Lock:
+    with _locks_guard:
+        lk = _locks.get(t)
+        if lk is None:
+            if len(_locks) > 4096:
+                _locks.clear()
+            lk = _locks[t] = threading.Lock()
+        return lk
 
-def _score(title: str, ticker: str) -> int:
-    if not title:
-        return -999
-    score = 0
-    for i, a in enumerate(_aliases_for(ticker), start=1):
-        if re.search(rf"\b{re.escape(a)}\b", title, flags=re.IGNORECASE):
-            score += 10 * (10 - i)  # earlier alias weighted a bit more
-        elif re.search(re.escape(a), title, flags=re.IGNORECASE):
-            score += 3
-    return score
-
-def fetch_headlines_yahoo(ticker: str, limit: int = 3) -> List[Dict[str, str]]:
+def feed_entries(ticker: str) -> List[Dict[str, str]]:
+    """Parsed Yahoo headline feed for `ticker`, downloaded at most once per TTL (concurrent callers wait)."""
     t = (ticker or "").upper().strip()
     if not t:
         return []
-    ck = (t, int(limit or 3))
-    now = time.time()
-    hit = _cache.get(ck)
-    if hit and now - hit[0] < TTL_S:
-        return hit[1][:ck[1]]
-
-    url = f"https://finance.yahoo.com/rss/headline?s={t}"
-    resp = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=10)
-    resp.raise_for_status()
-    feed = feedparser.parse(resp.content)
+    hit = _feeds.get(t)
+    if hit is not None:
+        return hit
+    with _lock_for(t):
+        hit = _feeds.get(t)
+        if hit is not None:
+            return hit
+        resp = transport.get(f"{RSS_URL}?s={t}", headers={"User-Agent": "Mozilla/5.0"}, timeout=10.0,
+                             provider="yahoo", endpoint="rss")
+        resp.raise_for_status()
+        entries = parse_entries(resp.content)
+        _feeds.put(t, entries)
+        return entries
 
-    items: List[Dict[str, str]] = []
-    for e in getattr(feed, "entries", []):
-        title = (e.get("title") or "").strip()
-        link  = (e.get("link")  or "").strip()
-        ts    = (e.get("published") or "").strip()
-        if not title or not link:
-            continue
-        items.append({"title": title, "publisher": "Yahoo", "ts": ts, "url": link})
-
-    items.sort(key=lambda x: _score(x["title"], t), reverse=True)
-    out = items[:ck[1]]
-    _cache[ck] = (now, out)
+def matching(entries: Iterable[Dict[str, str]], keywords: Iterable[str]) -> List[Dict[str, str]]:
+    """Entries whose title or summary contains any keyword (case-insensitive)."""
+    kws = [k.lower() for k in keywords if k]
+    if not kws:
+        return list(entries)
+    out = []
+    for e in entries:
+        text = f"{e['title']}\n{e['summary']}".lower()
+        if any(k in text for k in kws):
+            out.append(e)
     return out
+
+def fetch_headlines_yahoo(ticker: str, limit: int = 3) -> List[Dict[str, str]]:
+    t = (ticker or "").upper().strip()
+    if not t:
+        return []
+    items: List[Dict[str, str]] = [
+        {"title": e["title"], "publisher": "Yahoo", "ts": e["published"], "url": e["link"]}
+        for e in feed_entries(t) if e["title"] and e["link"]
+    ]
+    items.sort(key=lambda x: score_title(x["title"], t), reverse=True)
+    return collapse(items)[:int(limit or 3)]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+import threading
+from typing import Optional
+
+import numpy as np
+
+# --------------------------------------------------------------------
+# Per-ticker quote history for the r_1m / r_5m fallback returns.
+# Fixed memory: two preallocated arrays (int64 epoch seconds, float64 last)
+# of `capacity` slots, i.e. 16 bytes/slot -> 9,600 bytes of array data for the
+# default 600 slots, plus ~300 bytes of object/array headers. Appends
+# overwrite the oldest slot; lookbacks are a binary search over the ring.
+# --------------------------------------------------------------------
+
+CAPACITY = 600
+
+class QuoteRing:
+    __slots__ = ("ts", "px", "cap", "start", "n", "lock")
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.cap = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.px = np.zeros(capacity, dtype=np.float64)
+        self.start = 0   # physical index of the oldest sample
+        self.n = 0       # live samples
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def nbytes(self) -> int:
+        return self.ts.nbytes + self.px.nbytes
+
+    def append(self, ts: int, px: float, keep_s: Optional[int] = None) -> None:
+        """Add a sample; with keep_s, drop samples older than ts - keep_s."""
+        with self.lock:
+            i = (self.start + self.n) % self.cap
+            self.ts[i] = ts
+            self.px[i] = px
+            if self.n < self.cap:
+                self.n += 1
+            else:
+                self.start = (self.start + 1) % self.cap
+            if keep_s is not None:
+                k = self._first_after(ts - keep_s - 1)
+                self.start = (self.start + k) % self.cap
+                self.n -= k
+
+    def _first_after(self, cutoff: int) -> int:
+        """Logical index of the first sample with ts > cutoff (n if none)."""
+        lo, hi = 0, self.n
+        ts, start, cap = self.ts, self.start, self.cap
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if ts[(start + mid) % cap] <= cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def last(self) -> Optional[float]:
+        with self.lock:
+            return float(self.px[(self.start + self.n - 1) % self.cap]) if self.n else None
+
+    def ret_since(self, cutoff: int) -> float:
+        """
+        (last - base) / base where base is the newest sample at or before
+        `cutoff`, or the oldest sample when the ring does not reach back that far.
+        """
+        with self.lock:
+            if not self.n:
+                return 0.0
+            j = max(0, self._first_after(cutoff) - 1)
+            base = float(self.px[(self.start + j) % self.cap])
+            last = float(self.px[(self.start + self.n - 1) % self.cap])
+        return (last - base) / base if base else 0.0
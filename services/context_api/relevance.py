@@ -0,0 +1,87 @@
+from __future__ import annotations
+import json, os, re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# --------------------------------------------------------------------
+# Headline relevance shared by the Finnhub, Yahoo and merged-news paths.
+# Aliases come from aliases.json (override with CONTEXT_ALIASES_PATH); per
+# ticker, all aliases are compiled into one case-insensitive alternation so
+# a title is scanned once, however many aliases the ticker has.
+#
+# Score per alias i (1 = the ticker itself, then the table order), each alias
+# counted once: whole-word hit 15 * (50 - i), substring-only hit 4; plus 1
+# for headline punctuation (":", "—", "-"). Empty titles rank last.
+# --------------------------------------------------------------------
+
+ALIASES_PATH = os.getenv("CONTEXT_ALIASES_PATH", os.path.join(os.path.dirname(__file__), "aliases.json"))
+EMPTY_SCORE = -10_000
+
+def _load(path: str) -> Dict[str, List[str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return {str(k).upper(): [str(a) for a in v] for k, v in raw.items()}
+
+ALIASES: Dict[str, List[str]] = _load(ALIASES_PATH)
+
+@lru_cache(maxsize=4096)
+def aliases_for(ticker: str) -> Tuple[str, ...]:
+    """Ticker first, then its aliases; duplicates (case-insensitive) removed."""
+    t = (ticker or "").upper().strip()
+    seen, out = set(), []
+    for a in [t] + ALIASES.get(t, []):
+        k = a.casefold()
+        if a and k not in seen:
+            seen.add(k)
+            out.append(a)
+    return tuple(out)
+
+class _Matcher:
+    __slots__ = ("rx", "weight", "nested")
+
+    def __init__(self, aliases: Tuple[str, ...]):
+        # longest first so "Taiwan Semiconductor" wins over "Taiwan Semi" at the same spot
+        ordered = sorted(aliases, key=len, reverse=True)
+        self.rx = re.compile("|".join(re.escape(a) for a in ordered) or r"(?!)", re.IGNORECASE)
+        self.weight = {a.casefold(): 15 * (50 - i) for i, a in enumerate(aliases, start=1)}
+        # aliases hidden inside a longer one ("QQQ" in "Invesco QQQ"): (key, offset, length)
+        self.nested: Dict[str, List[Tuple[str, int, int]]] = {}
+        for a in aliases:
+            outer = a.casefold()
+            for b in aliases:
+                inner = b.casefold()
+                if inner != outer:
+                    self.nested.setdefault(outer, []).extend(
+                        (inner, m.start(), len(inner)) for m in re.finditer(f"(?={re.escape(inner)})", outer))
+
+    def score(self, title: str) -> int:
+        best: Dict[str, int] = {}
+        for m in self.rx.finditer(title):
+            key = m.group(0).casefold()
+            s, e = m.span()
+            hits = [(key, s, e)] + [(k, s + off, s + off + n) for k, off, n in self.nested.get(key, ())]
+            for k, hs, he in hits:
+                pts = self.weight.get(k, 4) if _bounded(title, hs, he) else 4
+                if pts > best.get(k, 0):
+                    best[k] = pts
+        return sum(best.values())
+
+def _bounded(title: str, s: int, e: int) -> bool:
+    """Same test as \\b...\\b: word-ness changes across both edges of title[s:e]."""
+    return (s > 0 and _is_word(title[s - 1])) != _is_word(title[s]) and \
+           (e < len(title) and _is_word(title[e])) != _is_word(title[e - 1])
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+@lru_cache(maxsize=4096)
+def matcher_for(ticker: str) -> _Matcher:
+    return _Matcher(aliases_for(ticker))
+
+def score_title(title: str, ticker: str) -> int:
+    if not title:
+        return EMPTY_SCORE
+    score = matcher_for((ticker or "").upper().strip()).score(title)
+    if ":" in title or "—" in title or "-" in title:
+        score += 1
+    return score
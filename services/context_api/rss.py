@@ -0,0 +1,70 @@
+from __future__ import annotations
+import xml.etree.ElementTree as ET
+from typing import Dict, List
+
+# --------------------------------------------------------------------
+# Minimal RSS 2.0 item reader for the Yahoo headline feeds. Only title,
+# link, pubDate and description are read, items are handed over as soon as
+# their closing tag is parsed and then freed, and nothing is sanitized or
+# sniffed. Anything that is not well-formed RSS (bad XML, HTML entities,
+# Atom) goes to feedparser instead, which produces the same four fields.
+# --------------------------------------------------------------------
+
+CHUNK = 16 * 1024
+_FIELDS = {"title": "title", "link": "link", "pubDate": "published", "description": "summary"}
+
+_stats = {"fast": 0, "fallback": 0}
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def parse_fast(content: bytes) -> List[Dict[str, str]]:
+    """Streaming parse of <rss><channel><item>; raises ValueError if the feed is not plain RSS."""
+    parser = ET.XMLPullParser(events=("start", "end"))
+    out: List[Dict[str, str]] = []
+    root_seen = False
+    try:
+        for i in range(0, len(content), CHUNK):
+            parser.feed(content[i:i + CHUNK])
+            for event, el in parser.read_events():
+                if not root_seen and event == "start":
+                    if _local(el.tag) != "rss":
+                        raise ValueError(f"not an RSS feed: <{_local(el.tag)}>")
+                    root_seen = True
+                elif event == "end" and el.tag == "item":
+                    e = {"title": "", "link": "", "published": "", "summary": ""}
+                    for child in el:
+                        name = _FIELDS.get(child.tag)
+                        if name:
+                            e[name] = (child.text or "").strip()
+                    out.append(e)
+                    el.clear()
+        parser.close()
+    except ET.ParseError as exc:
+        raise ValueError(f"malformed feed: {exc}") from exc
+    if not root_seen:
+        raise ValueError("empty feed")
+    return out
+
+def _parse_feedparser(content: bytes) -> List[Dict[str, str]]:
+    import feedparser
+    feed = feedparser.parse(content)
+    return [{
+        "title": (e.get("title") or "").strip(),
+        "link": (e.get("link") or "").strip(),
+        "published": (e.get("published") or "").strip(),
+        "summary": (e.get("summary") or "").strip(),
+    } for e in getattr(feed, "entries", [])]
+
+def parse_entries(content: bytes) -> List[Dict[str, str]]:
+    """Feed entries as [{title, link, published, summary}]; feedparser only when the fast path fails."""
+    try:
+        out = parse_fast(content)
+        _stats["fast"] += 1
+        return out
+    except ValueError:
+        _stats["fallback"] += 1
+        return _parse_feedparser(content)
+
+def stats() -> Dict[str, int]:
+    return dict(_stats)
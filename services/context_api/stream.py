@@ -0,0 +1,210 @@
+from __future__ import annotations
+import asyncio, json, logging, os, threading, time
+from typing import Any, Dict, Iterable, Optional
+
+from .candles import CandleStore
+from .providers_finnhub import FINNHUB_TOKEN
+from services.common.timeutil import iso_z
+
+try:  # in requirements.txt; a missing install degrades to polling with a warning (see start)
+    import websockets
+except ImportError:  # pragma: no cover - depends on the environment
+    websockets = None
+
+# --------------------------------------------------------------------
+# Streaming trade ingestion (CONTEXT_STREAM=1). One Finnhub websocket
+# connection subscribes to the watchlist plus the tickers requested since
+# startup (up to CONTEXT_STREAM_MAX_SYMBOLS); trades are folded into a
+# per-ticker last price and 1-minute OHLCV bars in a CandleStore. While a
+# ticker has traded within CONTEXT_STREAM_STALE_S, feature builds read its
+# quote (and, once CONTEXT_STREAM_MIN_BARS bars exist, its candles and the
+# rolling indicators kept with them) from here instead of polling Tiingo. The trade feed has no bid/ask, so the
+# spread is estimated as for any quote without one. Message handling
+# (handle) is independent of the connection, which needs `websockets`.
+# --------------------------------------------------------------------
+
+log = logging.getLogger("context_api.stream")
+
+ENABLED       = os.getenv("CONTEXT_STREAM", "0") == "1"
+WS_URL        = os.getenv("FINNHUB_WS_URL", "wss://ws.finnhub.io")
+MAX_SYMBOLS   = int(os.getenv("CONTEXT_STREAM_MAX_SYMBOLS", "50"))     # Finnhub free tier limit
+STALE_S       = float(os.getenv("CONTEXT_STREAM_STALE_S", "15"))       # no trade this long -> poll again
+MIN_BARS      = int(os.getenv("CONTEXT_STREAM_MIN_BARS", "21"))        # rv20 needs 21 closes
+PAYLOAD_TTL_S = float(os.getenv("CONTEXT_STREAM_PAYLOAD_TTL_S", "1"))  # payload cache TTL for streamed tickers
+
+class _Live:
+    __slots__ = ("last", "trade_ms", "recv", "bar")
+
+    def __init__(self):
+        self.last = 0.0
+        self.trade_ms = 0      # exchange time of the newest trade
+        self.recv = 0.0        # local receive time (time.time()) of the newest trade
+        self.bar: Optional[list] = None   # forming minute: [ts, open, high, low, close, volume]
+
+class TradeStream:
+    def __init__(self, url: str = WS_URL, max_symbols: int = MAX_SYMBOLS, stale_s: float = STALE_S,
+                 min_bars: int = MIN_BARS):
+        self.url = url
+        self.max_symbols = max_symbols
+        self.stale_s = stale_s
+        self.min_bars = min_bars
+        self.candles = CandleStore("stream.candles", rolling=True)
+        self._live: Dict[str, _Live] = {}
+        self._symbols: Dict[str, None] = {}   # insertion-ordered set
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"connects": 0, "disconnects": 0, "messages": 0, "trades": 0, "late_trades": 0,
+                       "dropped_symbols": 0, "connected": False}
+
+    # ----- subscriptions
+    def track(self, tickers: Iterable[str]) -> None:
+        """Add tickers to the subscription set (picked up by the open connection)."""
+        with self._lock:
+            for t in tickers:
+                t = (t or "").upper().strip()
+                if not t or t in self._symbols:
+                    continue
+                if len(self._symbols) >= self.max_symbols:
+                    self._stats["dropped_symbols"] += 1
+                    continue
+                self._symbols[t] = None
+
+    def symbols(self) -> list:
+        with self._lock:
+            return list(self._symbols)
+
+    # ----- ingestion
+    def handle(self, raw: str | bytes) -> int:
+        """Apply one websocket message; returns the number of trades taken."""
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return 0
+        self._stats["messages"] += 1
+        if not isinstance(msg, dict) or msg.get("type") != "trade":
+            return 0   # ping / error / subscription notices
+        now = time.time()
+        touched = {}
+        n = 0
+        with self._lock:
+            for tr in msg.get("data") or ():
+                try:
+                    sym = str(tr["s"]).upper()
+                    px = float(tr["p"])
+                    t_ms = int(tr["t"])
+                    vol = float(tr.get("v") or 0.0)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if px <= 0.0:
+                    continue
+                st = self._live.get(sym)
+                if st is None:
+                    st = self._live[sym] = _Live()
+                if t_ms >= st.trade_ms:
+                    st.last, st.trade_ms = px, t_ms
+                st.recv = now
+                minute = t_ms // 60_000 * 60
+                bar = st.bar
+                if bar is None or minute > bar[0]:
+                    st.bar = [minute, px, px, px, px, vol]
+                elif minute == bar[0]:
+                    bar[2] = max(bar[2], px); bar[3] = min(bar[3], px); bar[4] = px; bar[5] += vol
+                else:
+                    self._stats["late_trades"] += 1   # minute already closed; last price still counts
+                touched[sym] = tuple(st.bar)
+                n += 1
+            self._stats["trades"] += n
+        for sym, bar in touched.items():
+            self.candles.put_bar(sym, "1min", bar)
+        return n
+
+    # ----- reads (no I/O)
+    def live(self, ticker: str) -> bool:
+        st = self._live.get((ticker or "").upper().strip())
+        return st is not None and time.time() - st.recv <= self.stale_s
+
+    def inputs(self, ticker: str) -> Dict[str, Any]:
+        """Fan-out inputs served from the stream: {"quote": ...[, "candles": Bars, "indicators": ...]};
+        {} when not live. Indicators come from the store's rolling state, not a pass over the bars."""
+        t = (ticker or "").upper().strip()
+        st = self._live.get(t)
+        if st is None or time.time() - st.recv > self.stale_s:
+            return {}
+        out: Dict[str, Any] = {"quote": {"last": st.last, "bid": None, "ask": None, "ts": iso_z(st.trade_ms / 1000)}}
+        bars = self.candles.window(t, "1min", lookback_minutes=120)
+        if len(bars) >= self.min_bars:
+            out["candles"] = bars
+            inds = self.candles.indicators(t, "1min")
+            if inds is not None:
+                out["indicators"] = inds
+        return out
+
+    # ----- connection
+    async def _session(self) -> None:
+        async with websockets.connect(f"{self.url}?token={FINNHUB_TOKEN}", ping_interval=20,
+                                      close_timeout=2) as ws:
+            self._stats["connects"] += 1
+            self._stats["connected"] = True
+            sent: set = set()
+            try:
+                while not self._stop.is_set():
+                    for s in self.symbols():
+                        if s not in sent:
+                            await ws.send(json.dumps({"type": "subscribe", "symbol": s}))
+                            sent.add(s)
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        continue
+                    self.handle(raw)
+            finally:
+                self._stats["connected"] = False
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            try:
+                asyncio.run(self._session())
+            except Exception as e:
+                log.warning("finnhub stream disconnected: %r", e)
+            self._stats["disconnects"] += 1
+            if time.monotonic() - t0 > 60:
+                backoff = 1.0   # the connection was healthy for a while
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, 30.0)
+
+    def start(self, tickers: Iterable[str] = ()) -> bool:
+        """Connect in a daemon thread; False when `websockets` or the token is missing."""
+        self.track(tickers)
+        if websockets is None:
+            log.warning("CONTEXT_STREAM=1 but `websockets` is not installed (pip install -r requirements.txt); polling only")
+            return False
+        if not FINNHUB_TOKEN:
+            log.warning("CONTEXT_STREAM=1 but FINNHUB_TOKEN is missing; polling only")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ctx-stream", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            live = sum(1 for st in self._live.values() if time.time() - st.recv <= self.stale_s)
+            return {
+                **self._stats,
+                "enabled": bool(self._thread and self._thread.is_alive()),
+                "available": websockets is not None,
+                "symbols": len(self._symbols),
+                "live_symbols": live,
+                "bars": self.candles.stats(),
+            }
+
+STREAM = TradeStream()
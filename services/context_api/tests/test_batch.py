@@ -0,0 +1,146 @@
+import json, threading, time
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from services.context_api import features, cache, governor
+from services.context_api.app import app
+from services.context_api.providers import Bars
+
+class _Resp:
+    def __init__(self, data): self._data = data
+    def raise_for_status(self): pass
+    def json(self): return self._data
+
+def _patch_providers(monkeypatch, calls):
+    def quotes(tickers):
+        calls["quotes"].append(list(tickers))
+        return {t: {"last": 10.0, "bid": 9.99, "ask": 10.01, "ts": features.iso_now()} for t in tickers}
+    def heads(t):
+        return [{"title": f"{t} rallies", "publisher": "X", "ts": features.iso_now(), "url": "https://x/" + t}], None
+    def post(url, json=None, timeout=None):
+        calls["sent"].append(json["texts"])
+        return _Resp({"samples": [0.5 for _ in json["texts"]]})
+    def single_quote(t):
+        raise AssertionError("per-ticker quote fetched in batch")
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "fetch_quotes_tiingo", quotes)
+    monkeypatch.setattr(features, "fetch_quote_tiingo", single_quote)
+    monkeypatch.setattr(features, "_fetch_headlines_any", heads)
+    monkeypatch.setattr(features.transport, "post", post)
+    monkeypatch.setattr(features, "fetch_candles_tiingo", lambda t, lookback_minutes=120, freq="1min": [])
+    cache._CACHE.clear()
+
+def test_batch_shares_quote_and_sentiment_calls(monkeypatch):
+    calls = {"quotes": [], "sent": []}
+    _patch_providers(monkeypatch, calls)
+    with TestClient(app) as client:
+        r = client.post("/api/features/v2/batch", json={"tickers": ["aapl", "MSFT", "AAPL", "NVDA"]})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert sorted(x["ticker"] for x in body["results"]) == ["AAPL", "MSFT", "NVDA"]
+    assert calls["quotes"] == [["AAPL", "MSFT", "NVDA"]]
+    assert len(calls["sent"]) == 1 and len(calls["sent"][0]) == 3
+    for x in body["results"]:
+        assert x["quote"]["last"] == 10.0
+        assert x["features"]["sent_mean"] == 0.5
+
+def test_batch_stream_is_ndjson(monkeypatch):
+    calls = {"quotes": [], "sent": []}
+    _patch_providers(monkeypatch, calls)
+    with TestClient(app) as client:
+        r = client.post("/api/features/v2/batch?stream=true", json={"tickers": ["AMD", "TSLA"]})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines() if line]
+    assert sorted(x["ticker"] for x in rows) == ["AMD", "TSLA"]
+
+
+def test_context_sends_only_unseen_titles(monkeypatch):
+    features._SENT_SCORES.clear()
+    posted = []
+    class R:
+        def raise_for_status(self): pass
+        def json(self): return {"samples": [0.25] * len(posted[-1])}
+    monkeypatch.setattr(features.transport, "post", lambda url, json, timeout: posted.append(json["texts"]) or R())
+
+    h = lambda *ts: [{"title": t} for t in ts]
+    features._sent_batch({"NVDA": h("Chip rally broadens to memory makers"), "AMD": h("Chip rally broadens to memory makers")})
+    mean, std = features._sent_from_headlines(h("Chip rally broadens to memory makers", "Fab spending jumps on demand"))
+    assert posted == [["Chip rally broadens to memory makers"], ["Fab spending jumps on demand"]]
+    assert (mean, std) == (0.25, 0.0)
+
+def test_batch_stalled_news_times_out_per_ticker(monkeypatch):
+    calls = {"quotes": [], "sent": []}
+    _patch_providers(monkeypatch, calls)
+    release = threading.Event()
+    fast = features._fetch_headlines_any
+    def heads(t):
+        if t == "HANG":
+            release.wait(5)
+        return fast(t)
+    monkeypatch.setattr(features, "_fetch_headlines_any", heads)
+    monkeypatch.setitem(features.INPUT_TIMEOUTS_S, "news", 0.2)
+    try:
+        t0 = time.monotonic()
+        rows = dict(features.build_features_batch(["AAPL", "HANG"]))
+        elapsed = time.monotonic() - t0
+    finally:
+        release.set()
+    assert elapsed < 2.0
+    assert rows["AAPL"]["top_headline"]["title"] == "AAPL rallies"
+    assert rows["HANG"]["top_headline"] is None
+    assert "news: timed out" in rows["HANG"]["error"]
+    assert rows["HANG"]["quote"]["last"] == 10.0
+
+def test_batch_indicators_match_single_builds(monkeypatch):
+    calls = {"quotes": [], "sent": []}
+    _patch_providers(monkeypatch, calls)
+    rng = np.random.default_rng(3)
+    series = {}
+    for i, t in enumerate(["AAPL", "MSFT", "SHORT"]):
+        n = 8 if t == "SHORT" else 60 + i
+        c = 100 + np.cumsum(rng.normal(0, 0.3, n))
+        series[t] = Bars(range(n), c, c + rng.uniform(0, 0.5, n), c - rng.uniform(0, 0.5, n), c, [2000] * n)
+    fetched = []
+    def candles(t, lookback_minutes=120, freq="1min"):
+        fetched.append(t)
+        return series[t]
+    monkeypatch.setattr(features, "fetch_candles_tiingo", candles)
+
+    batch = dict(features.build_features_batch(list(series)))
+    assert sorted(fetched) == sorted(series)          # once per ticker, not again in the fan-out
+    monkeypatch.setattr(features, "fetch_quote_tiingo", lambda t: {"last": 10.0, "bid": 9.99, "ask": 10.01,
+                                                                   "ts": features.iso_now()})
+    for t in series:
+        cache._CACHE.clear()
+        single = features.build_features_for(t)["features"]
+        for k in ("r_1m", "r_5m", "rv20", "above_sma20"):
+            assert batch[t]["features"][k] == pytest.approx(single[k], rel=1e-12), (t, k)
+
+def test_batch_keeps_caller_priority_off_interactive_pool(monkeypatch):
+    calls = {"quotes": [], "sent": []}
+    _patch_providers(monkeypatch, calls)
+    seen = []
+    def note(name):
+        seen.append((name, governor.current_priority(), threading.current_thread().name))
+    def no_batch_quotes(tickers):
+        raise RuntimeError("iex down")   # per-ticker fan-out fetches the quote
+    def quote(t):
+        note("quote")
+        return {"last": 10.0, "bid": 9.99, "ask": 10.01, "ts": features.iso_now()}
+    def heads(t):
+        note("news")
+        return [], None
+    def candles(t, lookback_minutes=120, freq="1min"):
+        note("candles")
+        return []
+    monkeypatch.setattr(features, "fetch_quotes_tiingo", no_batch_quotes)
+    monkeypatch.setattr(features, "fetch_quote_tiingo", quote)
+    monkeypatch.setattr(features, "_fetch_headlines_any", heads)
+    monkeypatch.setattr(features, "fetch_candles_tiingo", candles)
+
+    with governor.priority(governor.PREFETCH):
+        rows = dict(features.build_features_batch(["AAPL", "MSFT"]))
+    assert rows["AAPL"]["quote"]["last"] == 10.0
+    assert {n for n, _, _ in seen} == {"quote", "news", "candles"}
+    assert all(p == governor.PREFETCH for _, p, _ in seen)
+    assert all(th.startswith("ctx-batch") for _, _, th in seen)
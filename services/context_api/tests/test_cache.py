@@ -0,0 +1,129 @@
+import threading, time
+from services.context_api import cache
+
+def test_concurrent_misses_share_one_build():
+    cache._CACHE.clear()
+    builds = []
+    gate = threading.Event()
+
+    def build():
+        builds.append(1)
+        gate.wait(1.0)
+        payload = {"features": {"x": 1}}
+        cache.put_cached("SF", payload)
+        return payload
+
+    before = cache.cache_stats()["coalesced"]
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get_or_build("sf", build))) for _ in range(8)]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads: t.join()
+
+    assert len(builds) == 1
+    assert len(out) == 8 and all(o is out[0] for o in out)
+    assert cache.cache_stats()["coalesced"] - before == 7
+    assert cache.cache_stats()["inflight"] == 0
+
+def test_entry_gone_after_fresh_check_rebuilds_single_flight(monkeypatch):
+    cache._CACHE.clear()
+    real_fresh = cache._fresh
+    raced = []
+    def fresh(key):
+        if len(raced) < 8:          # every caller first sees an entry that is gone by the read
+            raced.append(key)
+            return True
+        return real_fresh(key)
+    monkeypatch.setattr(cache, "_fresh", fresh)
+    builds = []
+    gate = threading.Event()
+    def build():
+        builds.append(1)
+        gate.wait(1.0)
+        payload = {"features": {"x": 2}}
+        cache.put_cached("RACE", payload)
+        return payload
+
+    before = cache.cache_stats()["builds"]
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get_or_build("race", build))) for _ in range(8)]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads: t.join()
+
+    assert len(builds) == 1
+    assert len(out) == 8 and all(o["features"] == {"x": 2} for o in out)
+    assert cache.cache_stats()["builds"] - before == 1
+
+def test_waiters_see_leader_exception():
+    cache._CACHE.clear()
+    gate = threading.Event()
+
+    def build():
+        gate.wait(1.0)
+        raise RuntimeError("provider down")
+
+    errs = []
+    def call():
+        try:
+            cache.get_or_build("ERR", build)
+        except RuntimeError as e:
+            errs.append(str(e))
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads: t.join()
+    assert errs == ["provider down"] * 3
+
+def test_stale_while_revalidate_serves_old_payload_and_refreshes(monkeypatch):
+    monkeypatch.setattr(cache, "TTL_S", 10.0)
+    monkeypatch.setattr(cache, "SWR_S", 30.0)
+    cache._CACHE.clear()
+    cache._CACHE.put("SWR", (time.time() - 15, {"v": "old"}))
+    done = threading.Event()
+
+    def build():
+        payload = {"v": "new"}
+        cache.put_cached("SWR", payload)
+        done.set()
+        return payload
+
+    out = cache.get_or_build("SWR", build)
+    assert out["v"] == "old"
+    assert out["_cache"]["stale"] is True and out["_cache"]["age_s"] >= 15
+    assert done.wait(1.0)
+    fresh = cache.get_or_build("SWR", build)
+    assert fresh["v"] == "new" and fresh["_cache"]["stale"] is False
+
+def test_past_hard_ttl_builds_inline(monkeypatch):
+    monkeypatch.setattr(cache, "TTL_S", 10.0)
+    monkeypatch.setattr(cache, "SWR_S", 30.0)
+    cache._CACHE.clear()
+    cache._CACHE.put("HARD", (time.time() - 45, {"v": "old"}))
+    out = cache.get_or_build("HARD", lambda: {"v": "new"})
+    assert out["v"] == "new"
+
+def test_prefetcher_refreshes_due_tickers_within_budget(monkeypatch):
+    from services.context_api import prefetch
+    cache._CACHE.clear()
+    built = []
+    def fake_refresh(t):
+        built.append(t)
+        cache.put_cached(t, {"v": t})
+        return True
+    monkeypatch.setattr(prefetch, "refresh_features", fake_refresh)
+    p = prefetch.Prefetcher(watchlist=["AAPL"], top_n=2,
+                            budget_per_min={"finnhub": 2, "tiingo": 100, "sentiment": 100})
+    for _ in range(3): p.note_request("nvda")
+    p.note_request("amd")
+    p.note_request("tsla")
+
+    assert p.targets() == ["AAPL", "NVDA", "AMD"]
+    assert p.tick() == 2                 # finnhub budget covers two builds
+    assert built == ["NVDA", "AMD"]      # all uncached: most requested first
+    assert p.stats()["skipped_budget"] == 1
+    built.clear()
+    assert p.tick() == 0 and built == []  # fresh ones are not due; budget still empty
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from services.context_api import providers_tiingo as ti
+from services.context_api.candles import CandleStore
+
+def _rows(start: datetime, n: int, close0: float = 100.0):
+    return [{"date": (start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:00.000Z"),
+             "open": close0 + i, "high": close0 + i + 1, "low": close0 + i - 1, "close": close0 + i, "volume": 100 + i}
+            for i in range(n)]
+
+def test_refresh_parses_only_new_rows_and_replaces_forming_bar():
+    store = CandleStore("test.candles")
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=30)
+    first = _rows(start, 20)
+    assert store.merge("AAPL", "1min", first, ti._candle_from_row) == 20
+
+    # same history, last bar updated, plus one new bar
+    second = _rows(start, 21)
+    second[19]["close"] = 555.0
+    parsed_before = store.stats()["rows_parsed"]
+    assert store.merge("AAPL", "1min", second, ti._candle_from_row) == 2
+    assert store.stats()["rows_parsed"] - parsed_before == 3  # 2 new/updated + 1 boundary
+
+    bars = store.window("AAPL", "1min", lookback_minutes=120)
+    assert len(bars) == 21
+    assert bars.close[19] == 555.0
+    assert (bars.ts[1:] - bars.ts[:-1] == 60).all()
+    assert bars.ts.dtype.name == "int64"
+
+def test_window_falls_back_to_latest_bars_when_market_closed():
+    store = CandleStore("test.candles.closed")
+    old = datetime.now(timezone.utc) - timedelta(days=1)
+    store.merge("MSFT", "1min", _rows(old, 200), ti._candle_from_row)
+    bars = store.window("MSFT", "1min", lookback_minutes=120)
+    assert len(bars) == 120 and bars.close[-1] == 100.0 + 199
+
+def test_rolling_store_keeps_indicators_in_step_with_merges():
+    from services.context_api import indicators as ind
+    store = CandleStore("test.candles.rolling", rolling=True)
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=40)
+    rows = _rows(start, 25)
+    store.merge("MSFT", "1min", rows[:20], ti._candle_from_row)
+    assert store.indicators("MSFT") is None                  # rv20 needs 21 bars
+    rows[19].update(close=90.0, high=125.0, low=89.0)        # forming bar rewritten
+    store.merge("MSFT", "1min", rows, ti._candle_from_row)
+    store.put_bar("MSFT", "1min", (int(store.last_ts("MSFT")), 124.0, 130.0, 120.0, 121.0, 5.0))
+
+    bars = store.window("MSFT", "1min", lookback_minutes=120)
+    got = store.indicators("MSFT")
+    assert got["rv20"] == pytest.approx(ind.atr_normalized(bars.high, bars.low, bars.close, 20), rel=1e-9)
+    assert got["r_5m"] == pytest.approx(ind.ret_pct(bars.close, 5), rel=1e-9)
+    assert got["above_sma20"] == ind.above_sma20(bars.close)
+    assert CandleStore("test.candles.plain").indicators("MSFT") is None
@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+from services.context_api import app as ctx_app
+
+def test_features_v2_etag_and_304(monkeypatch):
+    monkeypatch.delenv("LIVE_PROVIDERS", raising=False)
+    c = TestClient(ctx_app.app)
+    r = c.get("/api/features/v2", params={"ticker": "AAPL"})
+    assert r.status_code == 200 and "etag" in r.headers and "max-age=" in r.headers["cache-control"]
+    again = c.get("/api/features/v2", params={"ticker": "AAPL"})
+    assert again.headers["etag"] == r.headers["etag"]          # per-response ts is not hashed
+    r2 = c.get("/api/features/v2", params={"ticker": "AAPL"}, headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304 and not r2.content
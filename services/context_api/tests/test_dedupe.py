@@ -0,0 +1,38 @@
+from services.context_api import features, news
+from services.context_api.dedupe import collapse, normalize
+
+
+def test_normalize_drops_publisher_tag_and_punctuation():
+    assert normalize("Apple Unveils New iPhone: Lineup - Reuters") == "apple unveils new iphone lineup"
+
+
+def test_collapse_keeps_first_copy_of_each_story():
+    items = [
+        {"title": "Tesla deliveries miss forecasts as price cuts bite", "url": "fh"},
+        {"title": "Tesla Deliveries Miss Forecast As Price Cuts Bite - Yahoo Finance", "url": "ya"},
+        {"title": "Tesla deliveries beat forecasts despite price cuts", "url": "other"},
+        {"title": "Analysts raise Tesla price targets ahead of delivery report", "url": "up"},
+        {"title": "Analysts cut Tesla price targets ahead of delivery report", "url": "down"},
+    ]
+    assert [h["url"] for h in collapse(items)] == ["fh", "other", "up", "down"]
+
+
+def test_short_titles_need_exact_match():
+    assert len(collapse([{"title": "Stocks rally"}, {"title": "Stocks fall"}, {"title": "stocks rally!"}])) == 2
+
+
+def test_merge_and_sentiment_see_one_copy(monkeypatch):
+    fin = [{"title": "Nvidia rallies as data-center demand stays strong", "publisher": "Reuters", "ts": "", "url": "a"}]
+    ya = [{"title": "Nvidia rallies as data center demand stays strong | Yahoo Finance", "ts": "", "url": "b"},
+          {"title": "Nvidia unveils next-generation systems", "ts": "", "url": "c"}]
+    merged = news.merge_rank_headlines("NVDA", fin, limit=5, yahoo_items=ya)
+    assert sorted(h["url"] for h in merged) == ["a", "c"]
+
+    features._SENT_SCORES.clear()
+    sent = []
+    class R:
+        def raise_for_status(self): pass
+        def json(self): return {"samples": [0.5] * len(sent[-1])}
+    monkeypatch.setattr(features.transport, "post", lambda url, json, timeout: sent.append(json["texts"]) or R())
+    features._sent_from_headlines(fin + ya)
+    assert len(sent[-1]) == 2
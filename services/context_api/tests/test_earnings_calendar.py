@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+from services.context_api import earnings_calendar, features, cache
+from services.context_api.providers import Bars
+
+def _day(n):
+    return (datetime.now(timezone.utc).date() + timedelta(days=n)).isoformat()
+
+def test_one_download_indexes_every_symbol(monkeypatch):
+    calls = []
+    def fake(frm, to):
+        calls.append((frm, to))
+        return {"AAPL": _day(3), "NVDA": _day(25), "BAD": "n/a"}
+    monkeypatch.setattr(earnings_calendar, "fetch_earnings_calendar", fake)
+    cal = earnings_calendar.EarningsCalendar(horizon_days=30)
+
+    assert cal.refresh() == 2
+    assert calls == [(_day(0), _day(30))]
+    assert cal.days_until("aapl") == 3
+    assert cal.days_until("NVDA") == 25
+    assert cal.next_date("MSFT") is None
+    assert len(calls) == 1          # lookups never hit the provider
+    assert cal.stats()["symbols"] == 2
+
+def test_feature_build_reads_earnings_from_index(monkeypatch):
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(earnings_calendar, "fetch_earnings_calendar",
+                        lambda frm, to: {"SOON": _day(5), "LATER": _day(20)})
+    earnings_calendar.EARNINGS.refresh()
+    n = 30
+    monkeypatch.setattr(features, "_fetch_news", lambda t: {"headlines": [], "sent": (0.0, 0.05), "error": None})
+    monkeypatch.setattr(features, "fetch_quote_tiingo",
+                        lambda t: {"last": 50.0, "bid": 49.99, "ask": 50.01, "ts": features.iso_now()})
+    monkeypatch.setattr(features, "fetch_candles_tiingo",
+                        lambda t, lookback_minutes=120, freq="1min": Bars(range(n), [50.0] * n, [50.2] * n,
+                                                                         [49.8] * n, [50.0] * n, [2000] * n))
+    cache._CACHE.clear()
+
+    assert features.build_features_for("SOON")["features"]["earnings_soon"] is True
+    assert features.build_features_for("LATER")["features"]["earnings_soon"] is False
+    assert features.build_features_for("NONE")["features"]["earnings_soon"] is False
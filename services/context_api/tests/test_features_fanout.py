@@ -0,0 +1,42 @@
+import time
+from services.context_api import features, cache
+from services.context_api.providers import Bars
+
+def _quote(ticker):
+    return {"last": 50.0, "bid": 49.99, "ask": 50.01, "ts": features.iso_now()}
+
+def _candles(ticker, lookback_minutes=120, freq="1min"):
+    n = 30
+    return Bars(range(n), [50.0] * n, [50.2] * n, [49.8] * n, [50.0 + i * 0.01 for i in range(n)], [2000] * n)
+
+def _slow_news(ticker):
+    time.sleep(0.5)
+    return {"headlines": [], "sent": (0.9, 0.0), "error": None}
+
+def test_slow_input_times_out_and_payload_is_partial(monkeypatch):
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "_fetch_news", _slow_news)
+    monkeypatch.setattr(features, "fetch_quote_tiingo", _quote)
+    monkeypatch.setattr(features, "fetch_candles_tiingo", _candles)
+    monkeypatch.setitem(features.INPUT_TIMEOUTS_S, "news", 0.05)
+    cache._CACHE.clear()
+
+    t0 = time.monotonic()
+    out = features.build_features_for("FANOUT")
+    assert time.monotonic() - t0 < 0.4
+    assert "news: timed out" in out["error"]
+    assert out["features"]["sent_mean"] == 0.0
+    assert out["quote"]["last"] == 50.0 and out["quote"]["quality"] == "real"
+
+def test_quote_and_candles_down_falls_back_to_synthetic(monkeypatch):
+    def boom(*a, **k):
+        raise features.TiError("503 error: down", 503)
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "_fetch_news", lambda t: {"headlines": [], "sent": (0.0, 0.05), "error": None})
+    monkeypatch.setattr(features, "fetch_quote_tiingo", boom)
+    monkeypatch.setattr(features, "fetch_candles_tiingo", boom)
+    cache._CACHE.clear()
+
+    out = features.build_features_for("DOWN")
+    assert out["error"].startswith("tiingo: 503")
+    assert out["features"] == features._synthetic_feats()
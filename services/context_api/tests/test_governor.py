@@ -0,0 +1,59 @@
+import pytest
+
+from services.context_api import governor
+from services.context_api.governor import Governor, Throttled, PREFETCH, INTERACTIVE
+
+
+def test_prefetch_cannot_spend_interactive_reserve():
+    g = Governor(limits={"finnhub": 10}, endpoint_limits={})
+    admitted = 0
+    with governor.priority(PREFETCH):
+        for _ in range(10):
+            try:
+                g.acquire("finnhub", "/quote")
+                admitted += 1
+            except Throttled:
+                break
+    # 30% of 10 tokens held back for interactive calls
+    assert admitted == 7
+    for _ in range(3):
+        g.acquire("finnhub", "/quote")
+    with pytest.raises(Throttled):
+        g.acquire("finnhub", "/quote")
+    st = g.stats()["providers"]["finnhub"]
+    assert st[f"admitted_{PREFETCH}"] == 7 and st[f"admitted_{INTERACTIVE}"] == 3
+
+
+def test_endpoint_bucket_rejects_without_spending_provider_tokens():
+    g = Governor(limits={"finnhub": 10}, endpoint_limits={"finnhub:/calendar/earnings": 1})
+    g.acquire("finnhub", "/calendar/earnings")
+    with pytest.raises(Throttled):
+        g.acquire("finnhub", "/calendar/earnings")
+    assert g.stats()["providers"]["finnhub"]["budget_remaining"] == pytest.approx(9, abs=0.1)
+
+
+def test_breaker_opens_then_half_open_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(governor.time, "monotonic", lambda: now[0])
+    g = Governor(limits={}, endpoint_limits={})
+    for _ in range(governor.BREAKER_FAILURES):
+        g.acquire("tiingo")
+        g.record("tiingo", 503)
+    with pytest.raises(Throttled, match="circuit open"):
+        g.acquire("tiingo")
+
+    # a 429 Retry-After longer than the cooldown keeps it open for that long
+    now[0] += governor.BREAKER_COOLDOWN_S + 1
+    g.acquire("tiingo")                       # the single half-open probe
+    with pytest.raises(Throttled):
+        g.acquire("tiingo")                   # concurrent callers still rejected
+    g.record("tiingo", 429, retry_after=120)
+    now[0] += governor.BREAKER_COOLDOWN_S + 1
+    with pytest.raises(Throttled):
+        g.acquire("tiingo")
+
+    now[0] += 120
+    g.acquire("tiingo")
+    g.record("tiingo", 200)
+    g.acquire("tiingo")
+    assert g.stats()["providers"]["tiingo"]["circuit"] == "closed"
@@ -0,0 +1,86 @@
+import time
+
+from services.context_api import cache, features
+from services.context_api.hedge import Hedge
+
+
+def _sleepy(s, value):
+    def fn():
+        time.sleep(s)
+        return value
+    return fn
+
+
+def test_fast_primary_never_starts_secondary():
+    h = Hedge("t1", default_delay_s=0.2)
+    called = []
+    winner, results, errors = h.run(lambda: ["fin"], lambda: called.append(1) or ["ya"])
+    assert winner == "primary" and results == {"primary": ["fin"]} and not errors
+    assert not called
+    assert h.stats()["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_secondary_wins():
+    h = Hedge("t2", default_delay_s=0.05)
+    t0 = time.monotonic()
+    winner, results, _ = h.run(_sleepy(0.5, ["fin"]), _sleepy(0.01, ["ya"]))
+    assert time.monotonic() - t0 < 0.3
+    assert winner == "secondary" and results == {"secondary": ["ya"]}
+    st = h.stats()
+    assert st["hedged"] == 1 and st["secondary_wins"] == 1
+
+
+def test_failed_primary_falls_back_immediately():
+    def boom():
+        raise RuntimeError("down")
+    h = Hedge("t3", default_delay_s=5.0)
+    t0 = time.monotonic()
+    winner, results, errors = h.run(boom, lambda: ["ya"])
+    assert time.monotonic() - t0 < 1.0
+    assert winner == "secondary" and "primary" in errors
+    assert h.stats()["fallback"] == 1
+
+
+def test_delay_tracks_primary_percentile():
+    h = Hedge("t4", pctl=90, min_samples=10, default_delay_s=1.0)
+    for _ in range(20):
+        h.run(_sleepy(0.01, ["x"]), lambda: ["y"])
+    time.sleep(0.05)   # latency callbacks run on the worker threads
+    assert h.stats()["samples"] == 20
+    assert h.delay_s() < 0.2
+
+
+def test_hedged_headlines_are_ranked_through_merge(monkeypatch):
+    monkeypatch.setattr(features, "HEDGE", True)
+    monkeypatch.setattr(features, "HEADLINE_HEDGE", Hedge("t5", default_delay_s=0.02))
+    monkeypatch.setattr(features, "fetch_headlines", lambda t, limit=5: _sleepy(0.5, [])())
+    monkeypatch.setattr(features, "fetch_headlines_yahoo", lambda t, limit=5: [
+        {"title": "Markets drift", "publisher": "Yahoo", "ts": "", "url": "u1"},
+        {"title": "Apple beats estimates", "publisher": "Yahoo", "ts": "", "url": "u2"},
+    ])
+    heads, err = features._fetch_headlines_any("AAPL")
+    assert err is None
+    assert [h["url"] for h in heads] == ["u2", "u1"]
+
+
+def test_failed_losing_leg_is_not_a_payload_error(monkeypatch):
+    hedge = Hedge("t6", default_delay_s=0.02)
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "HEDGE", True)
+    monkeypatch.setattr(features, "HEADLINE_HEDGE", hedge)
+    monkeypatch.setattr(features, "fetch_headlines", lambda t, limit=5: _sleepy(0.1, [
+        {"title": "Apple beats estimates", "publisher": "Reuters", "ts": "2025-10-06T14:00:00Z", "url": "u1"}])())
+    def yahoo_down(t, limit=5):
+        raise RuntimeError("yahoo down")
+    monkeypatch.setattr(features, "fetch_headlines_yahoo", yahoo_down)
+    monkeypatch.setattr(features, "_sent_from_headlines", lambda h: (0.1, 0.05))
+    monkeypatch.setattr(features, "fetch_quote_tiingo",
+                        lambda t: {"last": 10.0, "bid": 9.99, "ask": 10.01, "ts": features.iso_now()})
+    monkeypatch.setattr(features, "fetch_candles_tiingo", lambda t, lookback_minutes=120, freq="1min": [])
+    cache._CACHE.clear()
+
+    out = features.build_features_for("HEDGEOK")
+    assert out["error"] is None
+    assert out["top_headline"]["url"] == "u1"
+    st = hedge.stats()
+    assert st["primary_wins"] == 1 and st["secondary_errors"] == 1
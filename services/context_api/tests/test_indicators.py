@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from services.context_api import indicators as ind
+
+def _walk(rng, n):
+    closes = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    highs = closes + rng.uniform(0, 0.5, n)
+    lows = closes - rng.uniform(0, 0.5, n)
+    return highs, lows, closes
+
+def test_atr_matches_reference_loop():
+    h, l, c = _walk(np.random.default_rng(0), 60)
+    trs = [ind.true_range(hh, ll, pc) for hh, ll, pc in zip(h[-20:], l[-20:], c[-21:-1])]
+    assert ind.atr_normalized(list(h), list(l), list(c), 20) == pytest.approx(np.mean(trs) / c[-1], rel=1e-12)
+
+def test_batch_api_matches_scalar_per_ticker():
+    rng = np.random.default_rng(1)
+    rows = [_walk(rng, 80) for _ in range(7)]
+    H = np.stack([r[0] for r in rows]); L = np.stack([r[1] for r in rows]); C = np.stack([r[2] for r in rows])
+    atr = ind.atr_normalized_batch(H, L, C, 20)
+    sma = ind.sma_batch(C, 20)
+    r1, r5 = ind.ret_pct_batch(C, 1), ind.ret_pct_batch(C, 5)
+    for i, (h, l, c) in enumerate(rows):
+        assert atr[i] == pytest.approx(ind.atr_normalized(h, l, c, 20), rel=1e-12)
+        assert sma[i] == pytest.approx(ind.sma(c, 20), rel=1e-12)
+        assert r1[i] == pytest.approx(ind.ret_pct(c, 1), rel=1e-12)
+        assert r5[i] == pytest.approx(ind.ret_pct(c, 5), rel=1e-12)
+
+def _check_rolling(roll, h, l, c):
+    n = len(c)
+    if n >= 6:
+        assert roll.ret(5) == pytest.approx(ind.ret_pct(c, 5), rel=1e-9)
+        assert roll.ret(1) == pytest.approx(ind.ret_pct(c, 1), rel=1e-9)
+    if n >= 21:
+        assert roll.sma20 == pytest.approx(ind.sma(c, 20), rel=1e-9)
+        assert roll.rv20 == pytest.approx(ind.atr_normalized(h, l, c, 20), rel=1e-9)
+        assert roll.above_sma20 == ind.above_sma20(c)
+
+def test_rolling_state_matches_scalar_with_forming_bars():
+    rng = np.random.default_rng(2)
+    roll = ind.RollingIndicators(window=20, resync=64)
+    h, l, c = [], [], []
+    for _ in range(300):
+        # a new minute opens, then its bar is rewritten a few times while forming
+        for j in range(int(rng.integers(1, 4))):
+            px = (c[-1] if c else 100.0) + rng.normal(0, 0.3)
+            hi, lo = px + rng.uniform(0, 0.5), px - rng.uniform(0, 0.5)
+            if j == 0:
+                roll.append(hi, lo, px); h.append(hi); l.append(lo); c.append(px)
+            else:
+                roll.update_last(hi, lo, px); h[-1], l[-1], c[-1] = hi, lo, px
+            assert roll.count == len(c)
+            _check_rolling(roll, np.array(h), np.array(l), np.array(c))
+
+def test_not_enough_data_raises_like_scalar():
+    roll = ind.RollingIndicators()
+    roll.append(1.0, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        roll.rv20
+    with pytest.raises(ValueError):
+        ind.atr_normalized_batch(np.ones((2, 10)), np.ones((2, 10)), np.ones((2, 10)), 20)
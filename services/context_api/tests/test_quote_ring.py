@@ -0,0 +1,29 @@
+from collections import deque
+from services.context_api.quote_ring import QuoteRing
+
+def _reference_ret(samples, cutoff):
+    base = None
+    for ts, px in reversed(samples):
+        base = px
+        if ts <= cutoff: break
+    last = samples[-1][1]
+    return (last - base) / base if base else 0.0
+
+def test_ret_since_matches_linear_scan_across_wraparound():
+    ring = QuoteRing(capacity=50)
+    ref = deque(maxlen=50)
+    for i in range(137):
+        ts, px = 1_000 + i * 7, 100.0 + (i % 11) - 5
+        ring.append(ts, px)
+        ref.append((ts, px))
+        for back in (0, 30, 60, 300, 10_000):
+            cutoff = ts - back
+            assert ring.ret_since(cutoff) == _reference_ret(list(ref), cutoff)
+    assert len(ring) == 50 and ring.nbytes() == 50 * 16
+
+def test_keep_window_drops_old_samples():
+    ring = QuoteRing(capacity=600)
+    for t in range(0, 1200, 2):
+        ring.append(t, 1.0 + t, keep_s=600)
+    assert len(ring) == 301                      # samples in [598, 1198]
+    assert ring.ret_since(-1) == (1199.0 - 599.0) / 599.0
@@ -0,0 +1,40 @@
+import re
+
+from services.context_api import relevance
+from services.context_api.relevance import aliases_for, score_title
+
+
+def _reference(title, ticker):
+    score = 0
+    for i, key in enumerate(aliases_for(ticker), start=1):
+        if re.search(rf"\b{re.escape(key)}\b", title, flags=re.IGNORECASE):
+            score += 15 * (50 - i)
+        elif re.search(re.escape(key), title, flags=re.IGNORECASE):
+            score += 4
+    return score + (1 if any(c in title for c in ":—-") else 0)
+
+
+def test_aliases_loaded_from_data_file_and_deduped():
+    assert aliases_for("nvda") == ("NVDA", "NVIDIA")
+    assert aliases_for("AMD") == ("AMD", "Advanced Micro Devices")
+    assert aliases_for("XYZ") == ("XYZ",)
+    assert "GOOGL" in relevance.ALIASES
+
+
+def test_single_scan_matches_per_alias_regexes():
+    titles = [
+        "Apple unveils iPhone", "Pineapple prices climb", "APPLE, Google and Meta: big tech rally",
+        "Metaverse push costs Facebook", "nvidia's record quarter", "AAPL-linked ETFs see inflows",
+        "Alphabet (GOOGL) beats", "Googler exits", "", "Nasdaq-100 rebalances; Invesco QQQ flows",
+    ]
+    for t in ("AAPL", "NVDA", "META", "GOOGL", "QQQ"):
+        for title in titles:
+            expected = _reference(title, t) if title else relevance.EMPTY_SCORE
+            assert score_title(title, t) == expected, (title, t)
+
+
+def test_aliases_nested_in_a_longer_hit_still_count():
+    # "Taiwan Semi" is a substring-only hit inside "Taiwan Semiconductor"
+    assert score_title("Taiwan Semiconductor sales jump", "TSMC") == 15 * 48 + 4
+    # "QQQ" is a whole word inside "Invesco QQQ"
+    assert score_title("Invesco QQQ sees inflows", "QQQ") == 15 * 49 + 15 * 48
@@ -0,0 +1,33 @@
+from services.context_api import rss
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>
+<title>Yahoo! Finance: AAPL News</title><link>https://finance.yahoo.com/</link>
+<item><title> Apple &amp; Google strike deal </title><link>https://x/1</link>
+<description>&lt;p&gt;AAPL up&lt;/p&gt;</description><media:content url="https://img"/>
+<pubDate>Mon, 06 Oct 2025 14:00:00 +0000</pubDate></item>
+<item><title>Second</title><link>https://x/2</link></item>
+</channel></rss>"""
+
+
+def test_fast_path_reads_the_four_fields():
+    got = rss.parse_fast(FEED)
+    assert got[0] == {"title": "Apple & Google strike deal", "link": "https://x/1",
+                      "published": "Mon, 06 Oct 2025 14:00:00 +0000", "summary": "<p>AAPL up</p>"}
+    assert got[1]["summary"] == "" and got[1]["published"] == ""
+
+
+def test_fast_path_agrees_with_feedparser_on_titles_links_dates():
+    fast, slow = rss.parse_fast(FEED), rss._parse_feedparser(FEED)
+    for k in ("title", "link", "published"):
+        assert [e[k] for e in fast] == [e[k] for e in slow]
+
+
+def test_malformed_or_non_rss_falls_back_to_feedparser():
+    before = rss.stats()["fallback"]
+    html_entity = FEED.replace(b"Second", b"Second&nbsp;story")
+    assert [e["link"] for e in rss.parse_entries(html_entity)] == ["https://x/1", "https://x/2"]
+    atom = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+    <entry><title>A</title><link href="https://x/a"/></entry></feed>"""
+    assert rss.parse_entries(atom)[0]["title"] == "A"
+    assert rss.stats()["fallback"] == before + 2
@@ -0,0 +1,89 @@
+import json, time
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from services.context_api import features, cache
+from services.context_api.stream import TradeStream
+from services.standin_api import app as standin
+
+def _msg(*trades):
+    return json.dumps({"type": "trade", "data": [{"s": s, "p": p, "t": t, "v": v} for s, p, t, v in trades]})
+
+def test_trades_fold_into_last_price_and_minute_bars():
+    st = TradeStream(min_bars=2)
+    m0 = (int(time.time()) // 60 - 3) * 60 * 1000
+    assert st.handle(_msg(("AAPL", 10.0, m0, 5), ("AAPL", 12.0, m0 + 1000, 1), ("AAPL", 9.0, m0 + 2000, 2))) == 3
+    st.handle(_msg(("AAPL", 11.0, m0 + 60_000, 4)))
+    st.handle(_msg(("AAPL", 50.0, m0 + 3000, 1)))      # late: older minute, older trade
+    st.handle('{"type":"ping"}')
+
+    bars = st.candles.window("AAPL")
+    assert list(bars.open) == [10.0, 11.0] and list(bars.high) == [12.0, 11.0]
+    assert list(bars.low) == [9.0, 11.0] and list(bars.close) == [9.0, 11.0]
+    assert list(bars.volume) == [8.0, 4.0]
+    ins = st.inputs("aapl")
+    assert ins["quote"]["last"] == 11.0 and len(ins["candles"]) == 2
+    assert st.stats()["late_trades"] == 1
+    assert st.inputs("MSFT") == {}
+
+def test_stale_stream_falls_back_to_polling():
+    st = TradeStream(stale_s=0.0)
+    st.handle(_msg(("AAPL", 10.0, int(time.time() * 1000), 1)))
+    time.sleep(0.01)
+    assert not st.live("AAPL") and st.inputs("AAPL") == {}
+
+def test_feature_build_reads_stream_state_without_polling(monkeypatch):
+    def no_poll(*a, **k):
+        raise AssertionError("polled Tiingo for a streamed ticker")
+    st = TradeStream(min_bars=3)
+    now_m = int(time.time()) // 60
+    for i in range(5):
+        st.handle(_msg(("STRM", 100.0 + i, (now_m - 4 + i) * 60_000, 10)))
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "STREAM", st)
+    monkeypatch.setattr(features, "_fetch_news", lambda t: {"headlines": [], "sent": (0.0, 0.05), "error": None})
+    monkeypatch.setattr(features, "fetch_quote_tiingo", no_poll)
+    monkeypatch.setattr(features, "fetch_candles_tiingo", no_poll)
+    cache._CACHE.clear()
+
+    out = features.build_features_for("STRM")
+    assert out["error"] is None
+    assert out["quote"]["last"] == 104.0 and out["quote"]["quality"] == "estimated"
+    assert round(out["features"]["r_1m"], 6) == round((104.0 - 103.0) / 103.0, 6)
+
+def test_ingests_from_the_standin_websocket(monkeypatch):
+    monkeypatch.setattr(standin, "WS_TICK_MS", 1)
+    st = TradeStream()
+    with TestClient(standin.app).websocket_connect("/finnhub/ws?token=x") as ws:
+        ws.send_text(json.dumps({"type": "subscribe", "symbol": "NVDA"}))
+        while not st.live("NVDA"):
+            st.handle(ws.receive_text())
+    assert st.inputs("NVDA")["quote"]["last"] > 0
+    assert len(st.candles.window("NVDA")) >= 1
+
+def test_rolling_indicators_follow_forming_bars(monkeypatch):
+    from services.context_api import indicators as ind
+    st = TradeStream(min_bars=21)
+    now_m = int(time.time()) // 60
+    rng = np.random.default_rng(5)
+    px = 100.0
+    for i in range(30):
+        for k in range(4):                 # several trades rewrite each minute's bar
+            px += float(rng.normal(0, 0.2))
+            st.handle(_msg(("ROLL", round(px, 4), (now_m - 29 + i) * 60_000 + k * 1000, 10)))
+    ins = st.inputs("ROLL")
+    bars = ins["candles"]
+    got = ins["indicators"]
+    assert got["r_1m"] == pytest.approx(ind.ret_pct(bars.close, 1), rel=1e-9)
+    assert got["r_5m"] == pytest.approx(ind.ret_pct(bars.close, 5), rel=1e-9)
+    assert got["rv20"] == pytest.approx(ind.atr_normalized(bars.high, bars.low, bars.close, 20), rel=1e-9)
+    assert got["above_sma20"] == ind.above_sma20(bars.close)
+
+    monkeypatch.setenv("LIVE_PROVIDERS", "1")
+    monkeypatch.setattr(features, "STREAM", st)
+    monkeypatch.setattr(features, "_fetch_news", lambda t: {"headlines": [], "sent": (0.0, 0.05), "error": None})
+    cache._CACHE.clear()
+    feats = features.build_features_for("ROLL")["features"]
+    assert feats["r_1m"] == got["r_1m"] and feats["above_sma20"] == got["above_sma20"]
+    assert feats["rv20"] == pytest.approx(min(max(got["rv20"], 0.02), 0.80))
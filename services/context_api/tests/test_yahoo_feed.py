@@ -0,0 +1,36 @@
+from services.context_api import news, providers_yahoo
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>
+<item><title>Apple beats estimates</title><link>https://x/1</link><pubDate>Mon, 06 Oct 2025 14:00:00 GMT</pubDate></item>
+<item><title>Chipmakers slide</title><link>https://x/2</link><description>AAPL suppliers fall</description></item>
+<item><title>Oil prices climb</title><link>https://x/3</link></item>
+</channel></rss>"""
+
+class _Resp:
+    content = RSS
+    def raise_for_status(self): pass
+
+def test_feed_downloaded_once_for_all_yahoo_paths(monkeypatch):
+    calls = []
+    monkeypatch.setattr(providers_yahoo.transport, "get", lambda url, **kw: calls.append(url) or _Resp())
+    providers_yahoo._feeds.clear()
+
+    merged = news.merge_rank_headlines("AAPL", [], limit=5)
+    heads = providers_yahoo.fetch_headlines_yahoo("AAPL", limit=5)
+    from backend.fetch_articles import fetch_articles
+    arts = fetch_articles("AAPL", "Apple")
+
+    assert len(calls) == 1
+    # alias filter ran locally over title + summary: the oil story is not about Apple
+    assert [h["url"] for h in merged] == ["https://x/1", "https://x/2"]
+    assert len(heads) == 3
+    assert [a["link"] for a in arts] == ["https://x/1"]
+
+def test_caller_supplied_yahoo_stamps_are_normalized(monkeypatch):
+    # same relevance score for every title: the newer story must rank first
+    monkeypatch.setattr(news, "score_title", lambda title, t: 1.0)
+    fin = [{"title": "Apple supplier update", "publisher": "Reuters", "ts": "2025-10-06T09:00:00Z", "url": "fh"}]
+    ya = [{"title": "Apple opens new store", "ts": "Mon, 06 Oct 2025 14:00:00 GMT", "url": "ya"}]
+    merged = news.merge_rank_headlines("AAPL", fin, limit=5, yahoo_items=ya)
+    assert [h["url"] for h in merged] == ["ya", "fh"]
+    assert merged[0]["ts"] == "2025-10-06T14:00:00Z"
@@ -0,0 +1,123 @@
+from __future__ import annotations
+import os, threading, importlib.util
+from typing import Dict, Optional, Any
+from urllib.parse import urlsplit
+import httpx
+
+from .governor import GOVERNOR
+
+# --------------------------------------------------------------------
+# Shared provider transport: one long-lived pooled client per upstream
+# host (scheme://host:port), so Finnhub/Tiingo/Yahoo/sentiment calls reuse
+# keep-alive connections instead of paying a TCP+TLS handshake each time.
+# --------------------------------------------------------------------
+
+MAX_CONN      = int(os.getenv("CONTEXT_HTTP_MAX_CONN", "20"))
+MAX_KEEPALIVE = int(os.getenv("CONTEXT_HTTP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_S   = float(os.getenv("CONTEXT_HTTP_KEEPALIVE_S", "60"))
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2 = os.getenv("CONTEXT_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+_clients: Dict[str, httpx.Client] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+def _origin(url: str) -> str:
+    u = urlsplit(url)
+    return f"{u.scheme}://{u.netloc}".lower()
+
+def client_for(url: str) -> httpx.Client:
+    """Return the pooled client for the upstream host of `url` (created on first use)."""
+    origin = _origin(url)
+    cli = _clients.get(origin)
+    if cli is not None:
+        return cli
+    with _lock:
+        cli = _clients.get(origin)
+        if cli is None:
+            cli = httpx.Client(
+                http2=HTTP2,
+                trust_env=False,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONN,
+                    max_keepalive_connections=MAX_KEEPALIVE,
+                    keepalive_expiry=KEEPALIVE_S,
+                ),
+            )
+            _clients[origin] = cli
+            _stats[origin] = {"requests": 0, "connections_opened": 0, "errors": 0}
+    return cli
+
+def _tracer(st: Dict[str, int]):
+    def trace(event: str, info: dict) -> None:
+        # fires only when the pool has to open a fresh connection
+        if event == "connection.connect_tcp.complete":
+            with _lock:
+                st["connections_opened"] += 1
+    return trace
+
+def _retry_after(r: httpx.Response) -> Optional[float]:
+    try:
+        return float(r.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+def request(method: str, url: str, *, timeout: Optional[float] = None,
+            provider: Optional[str] = None, endpoint: str = "", **kw: Any) -> httpx.Response:
+    """
+    Send through the pooled client for `url`'s host. With `provider`, the call
+    is admitted by the governor first (may raise governor.Throttled) and its
+    outcome feeds the provider's circuit breaker.
+    """
+    if provider:
+        GOVERNOR.acquire(provider, endpoint)
+    cli = client_for(url)
+    st = _stats[_origin(url)]
+    with _lock:
+        st["requests"] += 1
+    try:
+        r = cli.request(method, url, timeout=timeout, extensions={"trace": _tracer(st)}, **kw)
+    except Exception:
+        with _lock:
+            st["errors"] += 1
+        if provider:
+            GOVERNOR.record(provider, None)
+        raise
+    if provider:
+        GOVERNOR.record(provider, r.status_code, _retry_after(r))
+    return r
+
+def get(url: str, *, params: Optional[dict] = None, headers: Optional[dict] = None,
+        timeout: Optional[float] = 10.0, provider: Optional[str] = None, endpoint: str = "") -> httpx.Response:
+    return request("GET", url, params=params, headers=headers, timeout=timeout, provider=provider, endpoint=endpoint)
+
+def post(url: str, *, json: Any = None, timeout: Optional[float] = 10.0) -> httpx.Response:
+    return request("POST", url, json=json, timeout=timeout)
+
+def stats() -> Dict[str, Any]:
+    """Per-host request / new-connection counters; reused = requests that found a warm connection."""
+    with _lock:
+        hosts = {}
+        for origin, st in _stats.items():
+            reused = max(0, st["requests"] - st["connections_opened"])
+            hosts[origin] = {
+                **st,
+                "reused": reused,
+                "reuse_ratio": round(reused / st["requests"], 3) if st["requests"] else 0.0,
+            }
+    return {
+        "http2": HTTP2,
+        "limits": {"max_connections": MAX_CONN, "max_keepalive": MAX_KEEPALIVE, "keepalive_s": KEEPALIVE_S},
+        "hosts": hosts,
+    }
+
+def close_all() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for cli in clients:
+        try:
+            cli.close()
+        except Exception:
+            pass
@@ -1,9 +1,15 @@
 from __future__ import annotations
 from typing import Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Query
-import os, httpx, time
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+import asyncio, json, os, httpx, time
 from datetime import datetime, timezone
 
+from services.common.timeutil import to_epoch
+from services.common.bounded_cache import BoundedCache
+from services.common.http_cache import cached_json, max_age_of
+from .hub import PushHub, Subscriber
+
 CTX_URL = os.getenv("CTX_URL", "http://127.0.0.1:8012")
 REC_URL = os.getenv("REC_URL", "http://127.0.0.1:8014")
 
@@ -17,12 +23,8 @@ def iso_now() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 def _parse_iso(s: str) -> Optional[datetime]:
-    if not s:
-        return None
-    try:
-        return datetime.fromisoformat(s.replace("Z", "+00:00")).astimezone(timezone.utc)
-    except Exception:
-        return None
+    e = to_epoch(s)
+    return datetime.fromtimestamp(e, timezone.utc) if e is not None else None
 
 @app.get("/healthz")
 def healthz():
@@ -35,14 +37,17 @@ def healthz():
         "ts": iso_now(),
     }
 
-def _get_json(url: str, params: dict | None = None) -> dict:
+def _get(url: str, params: dict | None = None, headers: dict | None = None) -> httpx.Response:
+    """GET with retries; returns 2xx and 304 responses, 502s otherwise."""
     last_exc: Optional[Exception] = None
     with httpx.Client(timeout=TIMEOUT, trust_env=False) as client:
         for _ in range(RETRIES + 1):
             try:
-                r = client.get(url, params=params)
+                r = client.get(url, params=params, headers=headers)
+                if r.status_code == 304:
+                    return r
                 r.raise_for_status()
-                return r.json()
+                return r
             except Exception as e:
                 last_exc = e
                 time.sleep(DELAY)
@@ -61,10 +66,62 @@ def _post_json(url: str, payload: dict) -> dict:
                 time.sleep(DELAY)
     raise HTTPException(status_code=502, detail=f"POST {url} failed: {last_exc}")
 
+# ----- conditional context fetches
+# ticker -> (etag, fresh_until, last_modified, payload) of the last context answer.
+# Inside its max-age the payload is reused without a request; after that the
+# request carries If-None-Match and a 304 reuses it as well.
+_CTX = BoundedCache("gateway.ctx", max_entries=1024, ttl_s=600)
+# ticker -> (context etag, /api/run payload): an unchanged context skips rec + one_liner
+_RUN = BoundedCache("gateway.run", max_entries=1024, ttl_s=600)
+_STATS = {"ctx_fresh": 0, "ctx_304": 0, "ctx_200": 0, "run_reused": 0}
+
+def _ctx_entry(t: str) -> tuple:
+    key = t.upper().strip()
+    ent = _CTX.get(key)
+    if ent and time.time() < ent[1]:
+        _STATS["ctx_fresh"] += 1
+        return ent
+    headers = {"If-None-Match": ent[0]} if ent and ent[0] else None
+    r = _get(f"{CTX_URL}/api/features/v2", params={"ticker": t}, headers=headers)
+    if r.status_code == 304 and ent:
+        _STATS["ctx_304"] += 1
+        body = ent[3]
+    else:
+        _STATS["ctx_200"] += 1
+        body = r.json()
+    ent = (r.headers.get("etag"), time.time() + (max_age_of(r.headers.get("cache-control")) or 0),
+           r.headers.get("last-modified"), body)
+    _CTX.put(key, ent)
+    return ent
+
+def _fetch_ctx(t: str) -> Dict[str, Any]:
+    return _ctx_entry(t)[3]
+
+# per-response fields left out of the /api/run ETag
+_RUN_VOLATILE = ("ts_gateway", "cache_age_seconds", "ts_ctx")
+
 @app.get("/api/run")
-def run(t: str = Query(..., alias="ticker")) -> Dict[str, Any]:
-    ctx = _get_json(f"{CTX_URL}/api/features/v2", params={"ticker": t})
+def run(request: Request, t: str = Query(..., alias="ticker")):
+    """ETag + If-None-Match -> 304; max-age follows the context payload's."""
+    etag, fresh_until, last_modified, ctx = _ctx_entry(t)
+    key = t.upper().strip()
+    prev = _RUN.get(key) if etag else None
+    if prev and prev[0] == etag:
+        _STATS["run_reused"] += 1
+        payload = {**prev[1], "ticker": t, "ts_gateway": iso_now(), "cache_age_seconds": _age_s(prev[1].get("ts_ctx"))}
+    else:
+        payload = _run_payload(t, ctx)
+        if etag:
+            _RUN.put(key, (etag, payload))
+    return cached_json(request, payload, max_age=fresh_until - time.time(),
+                       last_modified=to_epoch(last_modified), exclude=_RUN_VOLATILE)
 
+def _age_s(ts_ctx: Any) -> Optional[int]:
+    t_ctx = _parse_iso(ts_ctx) if isinstance(ts_ctx, str) else None
+    return int((datetime.now(timezone.utc) - t_ctx).total_seconds()) if t_ctx else None
+
+def _run_payload(t: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Recommender + one-liner on top of a context payload; the /api/run response."""
     features: Dict[str, Any] = ctx.get("features", {}) or {}
     top_headline: Optional[Dict[str, str]] = ctx.get("top_headline")
     feature_note = ctx.get("error")
@@ -85,11 +142,6 @@ def run(t: str = Query(..., alias="ticker")) -> Dict[str, Any]:
     except HTTPException:
         one = {"text": f"{rec.get('class','NO_ACTION')} · {int(rec.get('confidence',0)*100)}% confidence"}
 
-    # cache age
-    now = datetime.now(timezone.utc)
-    t_ctx = _parse_iso(ts_ctx) if isinstance(ts_ctx, str) else None
-    age_s = int((now - t_ctx).total_seconds()) if t_ctx else None
-
     resp = {
         "ticker": t,
         "features": features,
@@ -99,10 +151,75 @@ def run(t: str = Query(..., alias="ticker")) -> Dict[str, Any]:
         "quote": quote,             # always present; bid/ask may be null
         "ts_ctx": ts_ctx,
         "ts_gateway": iso_now(),
-        "cache_age_seconds": age_s,
+        "cache_age_seconds": _age_s(ts_ctx),
     }
     if feature_note:
         resp["features_note"] = feature_note
     if top_headline:
         resp["top_headline"] = top_headline
     return resp
+
+# ----- push subscriptions (SSE)
+# One computation per ticker per change, fanned out to every subscriber.
+SUBSCRIBE_MAX = int(os.getenv("GATEWAY_SUBSCRIBE_MAX", "20"))
+HEARTBEAT_S   = float(os.getenv("GATEWAY_SSE_HEARTBEAT_S", "15"))
+
+HUB = PushHub(_fetch_ctx, _run_payload)
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/api/subscribe")
+async def subscribe(request: Request, tickers: str = Query(..., description="comma-separated, e.g. AAPL,NVDA")):
+    """
+    Server-Sent Events. `snapshot` carries a full /api/run payload (on subscribe
+    and after a resync); `update` carries {ticker, version, changes} with only
+    the fields that changed (nested dicts diffed per key; removed -> null);
+    `error` reports a failing ticker. Comment lines are heartbeats.
+    """
+    ts = list(dict.fromkeys(x.strip().upper() for x in tickers.split(",") if x.strip()))
+    if not ts:
+        raise HTTPException(status_code=422, detail="tickers is required")
+    if len(ts) > SUBSCRIBE_MAX:
+        raise HTTPException(status_code=422, detail=f"at most {SUBSCRIBE_MAX} tickers per subscription")
+    sub = Subscriber(asyncio.get_running_loop(), ts)
+    HUB.subscribe(sub)
+
+    async def events():
+        try:
+            yield ": subscribed\n\n"
+            idle = 0.0
+            while True:
+                try:
+                    name, data = await asyncio.wait_for(sub.queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    idle += 1.0
+                    if idle >= HEARTBEAT_S:
+                        idle = 0.0
+                        yield ": ping\n\n"
+                    continue
+                idle = 0.0
+                if sub.overflow:
+                    # events were dropped: replace the backlog with full payloads
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.overflow = False
+                    for name, data in HUB.snapshots(sub):
+                        yield _sse(name, data)
+                    continue
+                yield _sse(name, data)
+        finally:
+            HUB.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/stats")
+def stats():
+    return {"push": HUB.stats(), "conditional": dict(_STATS), "ts": iso_now()}
+
+@app.on_event("shutdown")
+def _stop_hub():
+    HUB.stop()
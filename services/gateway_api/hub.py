@@ -0,0 +1,194 @@
+from __future__ import annotations
+import asyncio, logging, os, threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# --------------------------------------------------------------------
+# Push hub behind GET /api/subscribe (Server-Sent Events). Each subscribed
+# ticker is one topic, however many HUDs watch it. Every
+# GATEWAY_PUSH_INTERVAL_S the hub reads each topic's Context API payload
+# (served from the context cache) and runs the recommender + one-liner only
+# when the context output changed. The new /api/run payload is diffed
+# against the previous one and just the changed fields are queued to every
+# subscriber of the ticker. New subscribers get the latest full payload.
+# --------------------------------------------------------------------
+
+log = logging.getLogger("gateway_api.hub")
+
+INTERVAL_S = float(os.getenv("GATEWAY_PUSH_INTERVAL_S", "2"))
+WORKERS    = int(os.getenv("GATEWAY_PUSH_WORKERS", "8"))
+QUEUE_MAX  = int(os.getenv("GATEWAY_PUSH_QUEUE_MAX", "64"))   # per subscriber; overflow -> full resync
+
+# context fields that decide whether a ticker needs recomputing
+_CTX_KEYS = ("features", "top_headline", "quote", "error")
+
+Event = Tuple[str, Dict[str, Any]]
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Keys of `new` that differ from `old`, recursing into nested dicts; removed keys map to None."""
+    out: Dict[str, Any] = {}
+    for k, v in new.items():
+        if k not in old:
+            out[k] = v
+        elif isinstance(v, dict) and isinstance(old[k], dict):
+            d = diff(old[k], v)
+            if d:
+                out[k] = d
+        elif v != old[k]:
+            out[k] = v
+    for k in old:
+        if k not in new:
+            out[k] = None
+    return out
+
+class Subscriber:
+    """One SSE client. Events are handed over from hub threads onto the client's event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, tickers: List[str], queue_max: int = QUEUE_MAX):
+        self.loop = loop
+        self.tickers = tickers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_max)
+        self.overflow = False   # events were dropped; the stream resends full payloads
+
+    def offer(self, event: Event) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass   # loop closed: the client is gone
+
+    def _put(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflow = True
+
+class _Topic:
+    __slots__ = ("ticker", "subs", "ctx", "result", "version", "error", "lock")
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.subs: Set[Subscriber] = set()
+        self.ctx: Optional[Dict[str, Any]] = None      # last context fields seen
+        self.result: Optional[Dict[str, Any]] = None   # last /api/run payload pushed
+        self.version = 0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+class PushHub:
+    def __init__(self, fetch_ctx: Callable[[str], Dict[str, Any]],
+                 finish: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+                 interval_s: float = INTERVAL_S, workers: int = WORKERS):
+        self.fetch_ctx = fetch_ctx   # ticker -> /api/features/v2 payload
+        self.finish = finish         # (ticker, ctx payload) -> /api/run payload
+        self.interval_s = interval_s
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gw-push")
+        self._topics: Dict[str, _Topic] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"polls": 0, "computes": 0, "unchanged": 0, "events": 0, "errors": 0}
+
+    # ----- subscriptions
+    def subscribe(self, sub: Subscriber) -> None:
+        fresh = []
+        with self._lock:
+            for t in sub.tickers:
+                tp = self._topics.get(t)
+                if tp is None:
+                    tp = self._topics[t] = _Topic(t)
+                tp.subs.add(sub)
+                if tp.result is not None:
+                    sub.offer(self._snapshot(tp))
+                else:
+                    fresh.append(tp)
+        for tp in fresh:
+            self._pool.submit(self._refresh, tp)   # first payload without waiting for the next poll
+        self.start()
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            for t in sub.tickers:
+                tp = self._topics.get(t)
+                if tp is None:
+                    continue
+                tp.subs.discard(sub)
+                if not tp.subs:
+                    del self._topics[t]
+
+    def snapshots(self, sub: Subscriber) -> List[Event]:
+        """Full payloads of `sub`'s tickers (used to resync after a queue overflow)."""
+        with self._lock:
+            tps = [self._topics.get(t) for t in sub.tickers]
+            return [self._snapshot(tp) for tp in tps if tp is not None and tp.result is not None]
+
+    @staticmethod
+    def _snapshot(tp: _Topic) -> Event:
+        return "snapshot", {**tp.result, "version": tp.version}
+
+    # ----- computation
+    def _publish(self, tp: _Topic, event: Event) -> None:
+        with self._lock:
+            subs = list(tp.subs)
+        for s in subs:
+            s.offer(event)
+        self._stats["events"] += len(subs)
+
+    def _refresh(self, tp: _Topic, blocking: bool = False) -> None:
+        if not tp.lock.acquire(blocking=blocking):
+            return   # already being refreshed
+        try:
+            try:
+                ctx = self.fetch_ctx(tp.ticker)
+                key = {k: ctx.get(k) for k in _CTX_KEYS}
+                if tp.result is not None and key == tp.ctx:
+                    self._stats["unchanged"] += 1
+                    return
+                result = self.finish(tp.ticker, ctx)
+            except Exception as e:
+                self._stats["errors"] += 1
+                detail = str(getattr(e, "detail", "") or e)
+                if detail != tp.error:
+                    tp.error = detail
+                    self._publish(tp, ("error", {"ticker": tp.ticker, "detail": detail}))
+                return
+            self._stats["computes"] += 1
+            prev, tp.result, tp.ctx, tp.error = tp.result, result, key, None
+            tp.version += 1
+            if prev is None:
+                self._publish(tp, self._snapshot(tp))
+            else:
+                changes = diff(prev, result)
+                if changes:
+                    self._publish(tp, ("update", {"ticker": tp.ticker, "version": tp.version, "changes": changes}))
+        finally:
+            tp.lock.release()
+
+    def poll(self) -> None:
+        """Refresh every subscribed ticker once (in parallel) and wait for them."""
+        with self._lock:
+            tps = list(self._topics.values())
+        self._stats["polls"] += 1
+        wait([self._pool.submit(self._refresh, tp, True) for tp in tps])
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.poll()
+            except Exception:
+                log.exception("push poll failed")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gw-push", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "topics": len(self._topics),
+                    "subscribers": len({s for tp in self._topics.values() for s in tp.subs}),
+                    "interval_s": self.interval_s}
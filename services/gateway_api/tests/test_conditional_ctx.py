@@ -0,0 +1,44 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from services.gateway_api import app as gw
+
+CTX = {"features": {"r_1m": 0.01}, "quote": {"last": 10.0, "bid": None, "ask": None}, "ts": "2026-01-01T00:00:00Z"}
+
+def test_context_etag_is_reused_and_unchanged_context_skips_rec(monkeypatch):
+    sent, posts = [], []
+
+    def fake_get(url, params=None, headers=None):
+        sent.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "max-age=0"})
+        return httpx.Response(200, json=CTX, headers={"ETag": '"v1"', "Cache-Control": "max-age=0"})
+
+    def fake_post(url, payload):
+        posts.append(url)
+        return {"class": "DEBIT_CALL", "confidence": 0.7} if url.endswith("/api/recommend") else {"text": "ok"}
+
+    monkeypatch.setattr(gw, "_get", fake_get)
+    monkeypatch.setattr(gw, "_post_json", fake_post)
+    gw._CTX.clear()
+    gw._RUN.clear()
+    c = TestClient(gw.app)
+
+    r1 = c.get("/api/run", params={"ticker": "ETAG"})
+    r2 = c.get("/api/run", params={"ticker": "ETAG"}, headers={"If-None-Match": r1.headers["etag"]})
+    assert r1.status_code == 200 and r1.json()["recommendation"]["class"] == "DEBIT_CALL"
+    assert sent == [{}, {"If-None-Match": '"v1"'}]     # second context call is conditional
+    assert r2.status_code == 304                         # same data -> same /api/run ETag
+    assert len(posts) == 2                               # rec + one_liner ran once
+
+def test_context_max_age_skips_the_request(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, headers=None):
+        calls.append(url)
+        return httpx.Response(200, json=CTX, headers={"ETag": '"v2"', "Cache-Control": "max-age=30"})
+
+    monkeypatch.setattr(gw, "_get", fake_get)
+    gw._CTX.clear()
+    assert gw._fetch_ctx("FRESH") == gw._fetch_ctx("FRESH") == CTX
+    assert len(calls) == 1
@@ -0,0 +1,67 @@
+import asyncio
+
+from services.gateway_api.hub import PushHub, Subscriber, diff
+
+def test_diff_keeps_only_changed_fields():
+    old = {"features": {"r_1m": 0.1, "rv20": 0.2}, "quote": {"last": 10.0, "bid": None}, "x": 1}
+    new = {"features": {"r_1m": 0.3, "rv20": 0.2}, "quote": {"last": 10.0, "bid": None}, "y": 2}
+    assert diff(old, new) == {"features": {"r_1m": 0.3}, "x": None, "y": 2}
+    assert diff(new, new) == {}
+
+def _drain(sub):
+    out = []
+    while not sub.queue.empty():
+        out.append(sub.queue.get_nowait())
+    return out
+
+def test_one_computation_per_change_fanned_out_to_all_subscribers():
+    ctx = {"features": {"r_1m": 0.1}, "quote": {"last": 10.0}, "ts": "t0"}
+    calls = {"ctx": 0, "finish": 0}
+
+    def fetch_ctx(t):
+        calls["ctx"] += 1
+        return {**ctx, "ts": f"t{calls['ctx']}"}   # ts alone changes on every read
+
+    def finish(t, c):
+        calls["finish"] += 1
+        return {"ticker": t, "features": dict(c["features"]), "quote": dict(c["quote"]),
+                "recommendation": {"class": "DEBIT_CALL"}}
+
+    async def main():
+        hub = PushHub(fetch_ctx, finish, interval_s=3600)
+        loop = asyncio.get_running_loop()
+        subs = [Subscriber(loop, ["AAPL"]) for _ in range(3)]
+        for s in subs:
+            hub.subscribe(s)
+        await asyncio.to_thread(hub.poll)
+        await asyncio.sleep(0)
+        first = [_drain(s) for s in subs]
+
+        await asyncio.to_thread(hub.poll)          # nothing changed: no recompute, no event
+        await asyncio.sleep(0)
+        quiet = [_drain(s) for s in subs]
+
+        ctx["features"] = {"r_1m": 0.2}
+        await asyncio.to_thread(hub.poll)
+        await asyncio.sleep(0)
+        changed = [_drain(s) for s in subs]
+
+        late = Subscriber(loop, ["AAPL"])
+        hub.subscribe(late)
+        await asyncio.sleep(0)
+        joined = _drain(late)
+        hub.unsubscribe(late)
+        for s in subs:
+            hub.unsubscribe(s)
+        hub.stop()
+        return first, quiet, changed, joined, hub.stats()
+
+    first, quiet, changed, joined, stats = asyncio.run(main())
+    assert calls["finish"] == 2
+    assert all(ev == [("snapshot", first[0][0][1])] for ev in first)
+    assert first[0][0][1]["features"] == {"r_1m": 0.1}
+    assert quiet == [[], [], []]
+    assert all(ev == [("update", {"ticker": "AAPL", "version": 2, "changes": {"features": {"r_1m": 0.2}}})]
+               for ev in changed)
+    assert joined[0][0] == "snapshot" and joined[0][1]["features"] == {"r_1m": 0.2}
+    assert stats["topics"] == 0 and stats["computes"] == 2 and stats["unchanged"] >= 1
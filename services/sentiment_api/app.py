@@ -1,9 +1,13 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timezone
-import time, math, os
+import hashlib, math, os, time
+
+from services.common.bounded_cache import BoundedCache
+from services.common.snapshot import snapshotter_for
+from services.common.http_cache import cache_headers, cached_json, etag_for
 
 # -------- Optional FinBERT (HuggingFace) import --------
 USE_TRANSFORMERS = True
@@ -38,8 +42,27 @@ def lexicon_score(s: str) -> float:
 
 # -------- API --------
 app = FastAPI(title="MIDAS Sentiment API", version="v1")
-TTL = float(os.getenv("SENT_TTL_S", "90"))
-_CACHE: Dict[Tuple[str, ...], Tuple[float, dict]] = {}
+# A text's score does not change, so entries live long; TTL only bounds staleness
+# if the engine or model is swapped.
+TTL = float(os.getenv("SENT_TTL_S", "3600"))
+_CACHE = BoundedCache(
+    "sentiment.scores",
+    max_entries=int(os.getenv("SENT_CACHE_MAX_ENTRIES", "65536")),
+    max_bytes=int(os.getenv("SENT_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    ttl_s=TTL,
+)  # (engine, sha1(normalized text)) -> signed score
+
+SNAPSHOT = snapshotter_for(["sentiment.scores"])
+
+@app.on_event("startup")
+def _restore_snapshot():
+    if SNAPSHOT:
+        SNAPSHOT.start()
+
+@app.on_event("shutdown")
+def _save_snapshot():
+    if SNAPSHOT:
+        SNAPSHOT.stop()
 
 class SentIn(BaseModel):
     texts: List[str]  # plain strings (titles/summaries)
@@ -51,57 +74,104 @@ class SentOut(BaseModel):
     std: float
     samples: List[float]
     engine: str  # "finbert" or "lexicon"
+    cached: int = 0  # samples served from the per-text cache
 
 def _iso_now() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00","Z")
 
+def _text_key(engine: str, text: str) -> Tuple[str, str]:
+    """Content address: case- and whitespace-insensitive hash of the text."""
+    norm = " ".join(text.split()).casefold()
+    return engine, hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+def _finbert_signed(out: dict) -> float:
+    label = (out["label"] or "").lower()
+    score = float(out["score"])
+    if "pos" in label:   return +score
+    if "neg" in label:   return -score
+    return 0.0
+
+def _score_texts(pipe_inst, texts: List[str]) -> List[float]:
+    """Engine scores for `texts` in one pipeline call (per text on failure)."""
+    if pipe_inst is None:
+        return [lexicon_score(t) for t in texts]
+    try:
+        return [_finbert_signed(o) for o in pipe_inst(texts, truncation=True)]
+    except Exception:
+        return [_finbert_signed_score(pipe_inst, t) for t in texts]
+
 def _finbert_signed_score(pipe, text: str) -> float:
     """+score for positive, -score for negative, 0 for neutral (FinBERT labels)."""
     try:
-        out = pipe(text, truncation=True)[0]
-        label = (out["label"] or "").lower()
-        score = float(out["score"])
-        if "pos" in label:   return +score
-        if "neg" in label:   return -score
-        return 0.0
+        return _finbert_signed(pipe(text, truncation=True)[0])
     except Exception:
         return lexicon_score(text)
 
 @app.get("/healthz")
 def healthz():
     engine = "finbert" if get_pipe() is not None else "lexicon"
-    return {"status": "ok", "service": "sentiment", "version": "v1", "ttl_s": TTL, "engine": engine}
-
-@app.post("/api/sentiment", response_model=SentOut)
-def analyze(x: SentIn):
-    if not x.texts or not isinstance(x.texts, list):
-        raise HTTPException(400, "texts required")
-    # Normalize input texts
-    key = tuple(t.strip() for t in x.texts if isinstance(t, str) and t.strip())
-    if not key:
-        raise HTTPException(400, "texts required")
-
-    now = time.time()
-    hit = _CACHE.get(key)
-    if hit and (now - hit[0]) < TTL:
-        return hit[1]
+    return {"status": "ok", "service": "sentiment", "version": "v1", "ttl_s": TTL, "engine": engine,
+            "cache": _CACHE.stats(), "snapshot": SNAPSHOT.stats() if SNAPSHOT else None}
 
+def _score(texts: List[str]) -> Tuple[dict, List[Tuple[str, str]]]:
+    """SentOut payload for the stripped, non-empty `texts`, plus the cache keys it used."""
     pipe_inst = get_pipe()
-    samples: List[float] = []
-    if pipe_inst is not None:
-        engine = "finbert"
-        for t in key:
-            samples.append(_finbert_signed_score(pipe_inst, t))
-    else:
-        engine = "lexicon"
-        for t in key:
-            samples.append(lexicon_score(t))
+    engine = "finbert" if pipe_inst is not None else "lexicon"
+
+    # per-text cache; only unseen texts (deduplicated) go to the engine
+    keys = [_text_key(engine, t) for t in texts]
+    scores: Dict[Tuple[str, str], float] = {}
+    todo: Dict[Tuple[str, str], str] = {}
+    for k, t in zip(keys, texts):
+        if k in scores or k in todo:
+            continue
+        v = _CACHE.get(k)
+        if v is None:
+            todo[k] = t
+        else:
+            scores[k] = v
+    cached = sum(1 for k in keys if k in scores)
+    if todo:
+        for k, v in zip(todo, _score_texts(pipe_inst, list(todo.values()))):
+            scores[k] = float(v)
+            _CACHE.put(k, float(v))
+    samples = [scores[k] for k in keys]
 
     n = len(samples)
     mean = sum(samples)/n if n else 0.0
     var  = sum((v-mean)**2 for v in samples)/n if n else 0.0
     std  = math.sqrt(var)
 
-    out = SentOut(ts=_iso_now(), n=n, mean=float(mean), std=float(std), samples=[float(v) for v in samples], engine=engine).dict()
-    _CACHE[key] = (now, out)
-    return out
\ No newline at end of file
+    out = SentOut(ts=_iso_now(), n=n, mean=float(mean), std=float(std), samples=[float(v) for v in samples],
+                  engine=engine, cached=cached).model_dump()
+    return out, keys
+
+def _clean(texts) -> List[str]:
+    texts = [t.strip() for t in (texts or []) if isinstance(t, str) and t.strip()]
+    if not texts:
+        raise HTTPException(400, "texts required")
+    return texts
+
+# per-response fields left out of the ETag
+_VOLATILE = ("ts", "cached")
+
+def _validators(out: dict, keys: List[Tuple[str, str]]) -> tuple[str, float, Optional[float]]:
+    """(ETag, max-age, Last-Modified epoch): scores hold until the first of their cache entries expires."""
+    left = [e for e in (_CACHE.expires_in(k) for k in keys) if e is not None]
+    ages = [a for a in (_CACHE.age(k) for k in keys) if a is not None]
+    return etag_for(out, _VOLATILE), min(left, default=0.0), (time.time() - min(ages)) if ages else None
+
+@app.post("/api/sentiment", response_model=SentOut)
+def analyze(x: SentIn, response: Response):
+    if not x.texts or not isinstance(x.texts, list):
+        raise HTTPException(400, "texts required")
+    out, keys = _score(_clean(x.texts))
+    response.headers.update(cache_headers(*_validators(out, keys)))
+    return out
+
+@app.get("/api/sentiment", response_model=SentOut)
+def analyze_get(request: Request, texts: List[str] = Query(...)):
+    """Same as POST for short lists (?texts=a&texts=b), with If-None-Match -> 304."""
+    out, keys = _score(_clean(texts))
+    _, max_age, last_modified = _validators(out, keys)
+    return cached_json(request, out, max_age=max_age, last_modified=last_modified, exclude=_VOLATILE)
@@ -0,0 +1,52 @@
+from fastapi import Response
+from services.sentiment_api import app as sent
+
+
+class _Pipe:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation=True):
+        self.calls.append(list(texts))
+        return [{"label": "positive", "score": 0.5} for _ in texts]
+
+
+def test_only_unseen_texts_are_scored(monkeypatch):
+    pipe = _Pipe()
+    monkeypatch.setattr(sent, "get_pipe", lambda: pipe)
+    sent._CACHE.clear()
+
+    a = sent.analyze(sent.SentIn(texts=["Nvidia beats", "AMD slips", "nvidia   BEATS"]), Response())
+    assert pipe.calls == [["Nvidia beats", "AMD slips"]]      # case/space variants share one score
+    assert a["n"] == 3 and a["cached"] == 0 and a["samples"] == [0.5, 0.5, 0.5]
+
+    b = sent.analyze(sent.SentIn(texts=["AMD slips", "Intel rallies"]), Response())
+    assert pipe.calls[-1] == ["Intel rallies"]
+    assert b["cached"] == 1 and b["mean"] == 0.5 and b["std"] == 0.0
+
+
+def test_engine_is_part_of_the_key(monkeypatch):
+    sent._CACHE.clear()
+    monkeypatch.setattr(sent, "get_pipe", lambda: None)
+    lex = sent.analyze(sent.SentIn(texts=["Shares surge on upgrade"]), Response())
+    assert lex["engine"] == "lexicon" and lex["samples"][0] > 0.5
+
+    pipe = _Pipe()
+    monkeypatch.setattr(sent, "get_pipe", lambda: pipe)
+    fb = sent.analyze(sent.SentIn(texts=["Shares surge on upgrade"]), Response())
+    assert fb["engine"] == "finbert" and fb["cached"] == 0 and pipe.calls
+
+
+def test_get_supports_conditional_requests(monkeypatch):
+    from fastapi.testclient import TestClient
+    sent._CACHE.clear()
+    monkeypatch.setattr(sent, "get_pipe", lambda: None)
+    c = TestClient(sent.app)
+    r = c.get("/api/sentiment", params={"texts": ["Shares surge on upgrade", "Probe widens"]})
+    assert r.status_code == 200 and r.json()["n"] == 2
+    assert 0 < int(r.headers["cache-control"].split("=")[1]) <= sent.TTL and r.headers["last-modified"]
+    r2 = c.get("/api/sentiment", params={"texts": ["Shares surge on upgrade", "Probe widens"]},
+               headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304                                 # second call is all cache hits; same ETag
+    p = c.post("/api/sentiment", json={"texts": ["Shares surge on upgrade", "Probe widens"]})
+    assert p.status_code == 200 and p.headers["etag"] == r.headers["etag"]
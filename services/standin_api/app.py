@@ -0,0 +1,262 @@
+from __future__ import annotations
+import asyncio, hashlib, json, math, os, random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# --------------------------------------------------------------------
+# Provider stand-in: serves Finnhub (/company-news, /quote,
+# /calendar/earnings, the /ws trade stream), Tiingo IEX (/iex, /iex/{t}, /iex/{t}/prices) and the
+# Yahoo headline RSS feed from fixtures, with injected latency, errors and
+# 429s, so the real live code path (transport, governor, parsing, caches)
+# can be load-tested offline. Point the context API at it with
+#   FINNHUB_BASE_URL=http://127.0.0.1:8017/finnhub/api/v1
+#   FINNHUB_WS_URL=ws://127.0.0.1:8017/finnhub/ws
+#   TIINGO_BASE_URL=http://127.0.0.1:8017/tiingo
+#   YAHOO_RSS_URL=http://127.0.0.1:8017/yahoo/rss/headline
+# and any non-empty FINNHUB_TOKEN / TIINGO_TOKEN. Tickers without a fixture
+# get deterministic synthetic data.
+# --------------------------------------------------------------------
+
+FIXTURES = os.getenv("STANDIN_FIXTURES", os.path.join(os.path.dirname(__file__), "fixtures", "providers.json"))
+
+with open(FIXTURES, "r", encoding="utf-8") as f:
+    _FX: Dict[str, dict] = json.load(f)
+
+class Fault(BaseModel):
+    latency_ms: float = 80.0      # median latency
+    latency_sigma: float = 0.5    # lognormal shape; 0 = fixed latency
+    error_rate: float = 0.0       # share of 503 responses
+    rate_429: float = 0.0         # share of 429 responses
+    retry_after_s: float = 5.0
+
+def _fault_from_env(provider: str, default_ms: float) -> Fault:
+    p = provider.upper()
+    return Fault(
+        latency_ms=float(os.getenv(f"STANDIN_{p}_LATENCY_MS", str(default_ms))),
+        latency_sigma=float(os.getenv(f"STANDIN_{p}_LATENCY_SIGMA", "0.5")),
+        error_rate=float(os.getenv(f"STANDIN_{p}_ERROR_RATE", "0")),
+        rate_429=float(os.getenv(f"STANDIN_{p}_429_RATE", "0")),
+    )
+
+FAULTS: Dict[str, Fault] = {
+    "finnhub": _fault_from_env("finnhub", 120.0),
+    "tiingo": _fault_from_env("tiingo", 60.0),
+    "yahoo": _fault_from_env("yahoo", 150.0),
+}
+_STATS: Dict[str, Dict[str, int]] = {p: {"requests": 0, "errors": 0, "throttled": 0} for p in FAULTS}
+_WS_STATS = {"sessions": 0, "messages": 0, "trades": 0}
+WS_TICK_MS = float(os.getenv("STANDIN_WS_TICK_MS", "250"))   # one trade message per subscribed symbol per tick
+_rng = random.Random(int(os.getenv("STANDIN_SEED", "7")))
+
+app = FastAPI(title="MIDAS Provider Stand-in", version="v1")
+
+async def _inject(provider: str) -> Optional[Response]:
+    """Sleep for a sampled latency, then maybe return an injected 429/503."""
+    f = FAULTS[provider]
+    st = _STATS[provider]
+    st["requests"] += 1
+    delay = f.latency_ms * (math.exp(_rng.gauss(0.0, f.latency_sigma)) if f.latency_sigma > 0 else 1.0)
+    await asyncio.sleep(delay / 1000.0)
+    roll = _rng.random()
+    if roll < f.rate_429:
+        st["throttled"] += 1
+        return JSONResponse({"error": "API limit reached"}, status_code=429,
+                            headers={"Retry-After": str(int(f.retry_after_s))})
+    if roll < f.rate_429 + f.error_rate:
+        st["errors"] += 1
+        return JSONResponse({"error": "upstream unavailable"}, status_code=503)
+    return None
+
+# ----- fixture helpers
+def _seed(*parts) -> int:
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+def _fixture(ticker: str) -> dict:
+    t = ticker.upper()
+    fx = _FX.get(t)
+    if fx is not None:
+        return fx
+    r = random.Random(_seed(t))
+    return {
+        "price": round(r.uniform(10, 500), 2),
+        "earnings_in_days": r.choice([None, 3, 9, 27, 45]),
+        "news": [{"headline": f"{t} shares move as traders weigh sector news", "source": "Stand-in", "minutes_ago": 40},
+                 {"headline": f"Analysts update {t} outlook", "source": "Stand-in", "minutes_ago": 300}],
+    }
+
+def _iso(d: datetime) -> str:
+    return d.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+def _px_at(ticker: str, minute: int) -> float:
+    """Deterministic minute-by-minute walk around the fixture price."""
+    base = _fixture(ticker)["price"]
+    r = random.Random(_seed(ticker, minute // 60))
+    drift = math.sin(minute / 37.0 + r.random()) * 0.004 + math.sin(minute / 7.0) * 0.001
+    return round(base * (1.0 + drift), 4)
+
+def _now_minute() -> int:
+    return int(datetime.now(timezone.utc).timestamp() // 60)
+
+def _iex_row(ticker: str) -> dict:
+    t = ticker.upper()
+    last = _px_at(t, _now_minute())
+    return {"ticker": t, "last": last, "tngoLast": last, "bidPrice": round(last - 0.01, 4),
+            "askPrice": round(last + 0.01, 4), "timestamp": _iso(datetime.now(timezone.utc))}
+
+def _news(ticker: str) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    out = []
+    for i, n in enumerate(_fixture(ticker)["news"]):
+        ts = now - timedelta(minutes=n["minutes_ago"])
+        slug = "-".join(n["headline"].lower().split())[:60]
+        out.append({"headline": n["headline"], "source": n["source"], "datetime": int(ts.timestamp()),
+                    "url": f"https://example.invalid/{ticker.lower()}/{i}-{slug}"})
+    return out
+
+# ----- Finnhub
+@app.get("/finnhub/api/v1/company-news")
+async def fh_company_news(symbol: str = Query(...)):
+    err = await _inject("finnhub")
+    return err or _news(symbol)
+
+@app.get("/finnhub/api/v1/quote")
+async def fh_quote(symbol: str = Query(...)):
+    err = await _inject("finnhub")
+    if err:
+        return err
+    row = _iex_row(symbol)
+    return {"c": row["last"], "pc": _px_at(symbol.upper(), _now_minute() - 1440), "t": _now_minute() * 60}
+
+@app.get("/finnhub/api/v1/calendar/earnings")
+async def fh_earnings(symbol: Optional[str] = None, from_: Optional[str] = Query(None, alias="from"),
+                      to: Optional[str] = None):
+    err = await _inject("finnhub")
+    if err:
+        return err
+    today = datetime.now(timezone.utc).date()
+    syms = [symbol.upper()] if symbol else sorted(_FX)
+    rows = []
+    for s in syms:
+        days = _fixture(s)["earnings_in_days"]
+        if days is None:
+            continue
+        d = today + timedelta(days=days)
+        if (from_ and d.isoformat() < from_) or (to and d.isoformat() > to):
+            continue
+        rows.append({"symbol": s, "date": d.isoformat(), "hour": "amc", "year": d.year})
+    return {"earningsCalendar": rows}
+
+def _trade(ticker: str) -> dict:
+    now = datetime.now(timezone.utc).timestamp()
+    px = _px_at(ticker, int(now // 60)) * (1.0 + _rng.gauss(0.0, 0.0002))
+    return {"s": ticker, "p": round(px, 4), "t": int(now * 1000), "v": float(_rng.randint(1, 500)), "c": None}
+
+@app.websocket("/finnhub/ws")
+async def fh_ws(ws: WebSocket, token: str = ""):
+    """Finnhub trade stream: {"type":"subscribe","symbol":..} in, {"type":"trade","data":[..]} out."""
+    if not token:
+        await ws.close(code=1008)
+        return
+    await ws.accept()
+    _WS_STATS["sessions"] += 1
+    subs: Dict[str, None] = {}
+
+    async def reader():
+        while True:
+            msg = json.loads(await ws.receive_text())
+            sym = str(msg.get("symbol", "")).upper()
+            if msg.get("type") == "subscribe" and sym:
+                subs[sym] = None
+            elif msg.get("type") == "unsubscribe":
+                subs.pop(sym, None)
+
+    task = asyncio.create_task(reader())
+    try:
+        while not task.done():
+            await asyncio.sleep(WS_TICK_MS / 1000.0)
+            if subs:
+                data = [_trade(t) for t in list(subs)]
+                await ws.send_text(json.dumps({"type": "trade", "data": data}))
+                _WS_STATS["trades"] += len(data)
+            else:
+                await ws.send_text('{"type":"ping"}')
+            _WS_STATS["messages"] += 1
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        task.cancel()
+
+# ----- Tiingo IEX
+@app.get("/tiingo/iex")
+async def ti_iex(tickers: str = ""):
+    err = await _inject("tiingo")
+    return err or [_iex_row(t) for t in tickers.split(",") if t.strip()]
+
+@app.get("/tiingo/iex/{ticker}")
+async def ti_iex_one(ticker: str):
+    err = await _inject("tiingo")
+    return err or [_iex_row(ticker)]
+
+@app.get("/tiingo/iex/{ticker}/prices")
+async def ti_prices(ticker: str, startDate: Optional[str] = None, resampleFreq: str = "1min"):
+    err = await _inject("tiingo")
+    if err:
+        return err
+    t = ticker.upper()
+    now_m = _now_minute()
+    try:
+        start = datetime.fromisoformat(startDate).replace(tzinfo=timezone.utc) if startDate else None
+    except ValueError:
+        return JSONResponse({"detail": "Error: startDate must be YYYY-MM-DD"}, status_code=400)
+    start_m = int(start.timestamp() // 60) if start else now_m - 240
+    start_m = max(start_m, now_m - 2 * 1440)
+    rows = []
+    for m in range(start_m, now_m):
+        o, c = _px_at(t, m - 1), _px_at(t, m)
+        rows.append({
+            "date": _iso(datetime.fromtimestamp(m * 60, timezone.utc)),
+            "open": o, "high": round(max(o, c) * 1.0005, 4), "low": round(min(o, c) * 0.9995, 4),
+            "close": c, "volume": 1000 + _seed(t, m) % 4000,
+        })
+    return rows
+
+# ----- Yahoo RSS
+@app.get("/yahoo/rss/headline")
+async def yahoo_rss(s: str = Query(...)):
+    err = await _inject("yahoo")
+    if err:
+        return err
+    items = []
+    for n in _news(s):
+        pub = format_datetime(datetime.fromtimestamp(n["datetime"], timezone.utc))
+        items.append(
+            f"<item><title>{escape(n['headline'])}</title><link>{escape(n['url'])}</link>"
+            f"<description>{escape(n['headline'])}</description><pubDate>{pub}</pubDate></item>"
+        )
+    body = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Yahoo! Finance: {escape(s.upper())} News</title>{''.join(items)}</channel></rss>")
+    return Response(body, media_type="application/rss+xml")
+
+# ----- control
+@app.get("/_standin/stats")
+def standin_stats():
+    return {"faults": {p: f.model_dump() for p, f in FAULTS.items()}, "stats": _STATS, "ws": _WS_STATS,
+            "fixtures": sorted(_FX)}
+
+@app.post("/_standin/faults/{provider}")
+def set_faults(provider: str, fault: Fault):
+    """Change one provider's latency/error profile at runtime."""
+    if provider not in FAULTS:
+        return JSONResponse({"detail": f"unknown provider {provider}"}, status_code=404)
+    FAULTS[provider] = fault
+    return {"provider": provider, **fault.model_dump()}
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok", "service": "standin", "version": "v1"}
@@ -0,0 +1,53 @@
+import feedparser
+from fastapi.testclient import TestClient
+
+from services.standin_api import app as standin
+
+client = TestClient(standin.app)
+
+
+def _fast(monkeypatch, **kw):
+    for p in standin.FAULTS:
+        monkeypatch.setitem(standin.FAULTS, p, standin.Fault(latency_ms=0, latency_sigma=0, **kw))
+
+
+def test_endpoints_match_provider_shapes(monkeypatch):
+    _fast(monkeypatch)
+    news = client.get("/finnhub/api/v1/company-news", params={"symbol": "AAPL"}).json()
+    assert news[0]["headline"].startswith("Apple") and isinstance(news[0]["datetime"], int)
+
+    cal = client.get("/finnhub/api/v1/calendar/earnings", params={"symbol": "AAPL"}).json()
+    assert cal["earningsCalendar"][0]["symbol"] == "AAPL"
+
+    quotes = client.get("/tiingo/iex", params={"tickers": "AAPL,ZZZ"}).json()
+    assert [q["ticker"] for q in quotes] == ["AAPL", "ZZZ"]
+
+    bars = client.get("/tiingo/iex/AAPL/prices", params={"startDate": "2000-01-01"}).json()
+    assert len(bars) == 2 * 1440 and bars[0]["date"] < bars[-1]["date"]
+
+    feed = feedparser.parse(client.get("/yahoo/rss/headline", params={"s": "NVDA"}).content)
+    assert feed.entries[0].title.startswith("Nvidia") and feed.entries[0].published
+
+
+def test_injected_429_carries_retry_after(monkeypatch):
+    _fast(monkeypatch, rate_429=1.0, retry_after_s=7)
+    r = client.get("/finnhub/api/v1/quote", params={"symbol": "AAPL"})
+    assert r.status_code == 429 and r.headers["retry-after"] == "7"
+
+
+def test_faults_are_adjustable_at_runtime(monkeypatch):
+    _fast(monkeypatch)
+    r = client.post("/_standin/faults/tiingo", json={"latency_ms": 0, "latency_sigma": 0, "error_rate": 1.0})
+    assert r.status_code == 200
+    assert client.get("/tiingo/iex/AAPL").status_code == 503
+
+
+def test_websocket_streams_trades_for_subscribed_symbols(monkeypatch):
+    monkeypatch.setattr(standin, "WS_TICK_MS", 1)
+    with client.websocket_connect("/finnhub/ws?token=x") as ws:
+        ws.send_json({"type": "subscribe", "symbol": "aapl"})
+        msg = ws.receive_json()
+        while msg["type"] != "trade":
+            msg = ws.receive_json()
+    tr = msg["data"][0]
+    assert tr["s"] == "AAPL" and tr["p"] > 0 and isinstance(tr["t"], int)